@@ -1,7 +1,8 @@
 from flask import Flask
-from flask_migrate import Migrate
+from flask.cli import ScriptInfo, with_appcontext
 from flask_cors import CORS
 from .models import db
+from . import movements  # registers the rollup flush listener
 
 from .routes.suppliers import suppliers_bp
 from .routes.purchases import purchases_bp
@@ -12,15 +13,77 @@ from .routes.stock_transfers import stock_transfer_bp
 from .routes.stock_transfer_items import stock_transfer_item_bp
 from .routes.business_locations import business_location_bp
 from .routes.dashboard import dashboard_bp
+from .routes.reports import reports_bp
+from .routes.alerts import alerts_bp
+from .routes.jobs import jobs_bp
+from .routes.debug import debug_bp
+from .alerts import init_alerts
+from .jobs import init_jobs, jobs_cli
+from .search import search_cli, create_search_index
+from .engine import get_profile, engine_options, apply_sqlite_pragmas
+from .replica import init_replica, REPLICA_BIND, STICKY_HEADER
+from .openapi import openapi_cli, serve_cached_spec
+from .timing import init_timing
+from .metrics import init_metrics
+from .slow_queries import init_slow_queries
+from .profiling import init_profiling
+from .seeding import seed_cli
+from .archive import archive_cli
+from .maintenance import maintenance_cli
 
 from flasgger import Swagger
+from sqlalchemy.engine import make_url
 
+import click
 import os
 
-migrate = Migrate()
+CORS_ORIGINS = [
+    "http://localhost:5173",
+    "http://127.0.0.1:5173",
+    "https://waretracker.netlify.app"
+]
+
+
+def _running_flask_cli():
+    context = click.get_current_context(silent=True)
+    return context is not None and context.find_object(ScriptInfo) is not None
+
+
+def ensure_schema():
+    """Create the tables on an empty database; an existing schema is left to migrations."""
+    from sqlalchemy import inspect
+    inspector = inspect(db.engine)
+
+    # Only create tables if 'products' (or any core table) doesn't exist
+    if not inspector.has_table("products"):
+        db.create_all()
+        with db.engine.begin() as connection:
+            create_search_index(connection)
+        print("✅ Database tables created.")
+    else:
+        print("ℹ️ Tables already exist. Skipping creation.")
+
+
+@click.command("create-tables")
+@with_appcontext
+def create_tables_command():
+    """Create the tables on an empty database (production boot skips this; run it before the workers start)."""
+    ensure_schema()
+
 
 def create_app():
     app = Flask(__name__)
+
+    # STARTUP_MODE=production keeps worker boot lean: the OpenAPI spec comes from the file
+    # `flask openapi build` wrote, the schema is left to `flask create-tables` and migrations
+    # (no inspection or create_all at boot), and Flask-Migrate (which pulls in Alembic) loads
+    # only for CLI commands
+    app.config['STARTUP_MODE'] = os.getenv('STARTUP_MODE', 'development')
+    production = app.config['STARTUP_MODE'] == 'production'
+    app.config['OPENAPI_SPEC_PATH'] = os.getenv(
+        'OPENAPI_SPEC_PATH', os.path.join(app.instance_path, 'openapi.json')
+    )
+
     app.config['SWAGGER'] = {
         'title': 'Warehouse Tracker API',
         'uiversion': 3,
@@ -36,6 +99,8 @@ def create_app():
         ]
     }
     Swagger(app)
+    if production and not _running_flask_cli():
+        serve_cached_spec(app)
 
     # Environment-aware DB config
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv(
@@ -43,27 +108,68 @@ def create_app():
     )
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Engine tuning profile: SQLite PRAGMAs / Postgres pooling (see app/engine.py)
+    app.config['DB_PROFILE'] = os.getenv('DB_PROFILE', 'default')
+    profile = get_profile(app.config['DB_PROFILE'])
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+        make_url(app.config['SQLALCHEMY_DATABASE_URI']), profile
+    )
+
+    # Optional read replica for views marked with @replica_reads (see app/replica.py)
+    replica_url = os.getenv('DATABASE_REPLICA_URL')
+    if replica_url:
+        app.config['SQLALCHEMY_BINDS'] = {
+            REPLICA_BIND: {'url': replica_url, **engine_options(make_url(replica_url), profile)}
+        }
+    app.config['REPLICA_STICKY_SECONDS'] = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+
+    # Seconds between full low-stock evaluations (0 disables the background evaluator)
+    app.config['ALERT_EVALUATOR_INTERVAL'] = int(os.getenv('ALERT_EVALUATOR_INTERVAL', 60))
+    app.config['AUTOCOMPLETE_MAX_AGE'] = int(os.getenv('AUTOCOMPLETE_MAX_AGE', 30))
+
+    # Share of requests timed for the Server-Timing header and app.timing log (see app/timing.py)
+    app.config['PERF_SAMPLE_RATE'] = float(os.getenv('PERF_SAMPLE_RATE', 0.01 if production else 1.0))
+    # Prometheus /metrics (see app/metrics.py; gunicorn.conf.py aggregates across workers)
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', '1') not in ('0', 'false', 'no')
+    # Statements slower than this are logged with their plan (0 disables; see app/slow_queries.py)
+    app.config['SLOW_QUERY_MS'] = float(os.getenv('SLOW_QUERY_MS', 200))
+    # Shared secret for the /debug endpoints, sent as X-Admin-Token (unset = /debug is disabled)
+    app.config['ADMIN_TOKEN'] = os.getenv('ADMIN_TOKEN')
+    # `?__profile=1` on any request (with X-Admin-Token) returns a cProfile report (see app/profiling.py);
+    # PROFILE_DIR also keeps each profile on disk
+    app.config['PROFILING_ENABLED'] = os.getenv('PROFILING_ENABLED', '0') in ('1', 'true', 'yes')
+    app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR')
+
+    # Background jobs (see app/jobs.py): threads per web process (0 = only `flask jobs work` runs jobs)
+    # and the cap on jobs running at once across all processes
+    app.config['JOB_WORKERS'] = int(os.getenv('JOB_WORKERS', 1))
+    app.config['JOB_MAX_RUNNING'] = int(os.getenv('JOB_MAX_RUNNING', 2))
+    app.config['JOB_STALE_SECONDS'] = int(os.getenv('JOB_STALE_SECONDS', 120))
+    app.config['JOB_RESULTS_DIR'] = os.getenv('JOB_RESULTS_DIR', os.path.join(app.instance_path, 'job_results'))
+
     db.init_app(app)
-    migrate.init_app(app, db)
+    init_timing(app)
+    init_metrics(app)
+    init_slow_queries(app)
+    init_profiling(app)
+    if not production or _running_flask_cli():
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    init_alerts(app)
+    init_jobs(app)
+    init_replica(app)
 
     # ✅ CREATE TABLES HERE
     with app.app_context():
-        from sqlalchemy import inspect
-        inspector = inspect(db.engine)
-
-        # Only create tables if 'products' (or any core table) doesn't exist
-        if not inspector.has_table("products"):
-            db.create_all()
-            print("✅ Database tables created.")
-        else:
-            print("ℹ️ Tables already exist. Skipping creation.")
-
-    # CORS settings
-    CORS(app, origins=[
-        "http://localhost:5173",
-        "http://127.0.0.1:5173",
-        "https://waretracker.netlify.app"
-    ])
+        apply_sqlite_pragmas(db.engine, profile)
+        if REPLICA_BIND in db.engines:
+            apply_sqlite_pragmas(db.engines[REPLICA_BIND], profile)
+
+        if not production:
+            ensure_schema()
+
+    # CORS settings; the frontend reads the read-your-writes header (see app/replica.py)
+    CORS(app, origins=CORS_ORIGINS, expose_headers=[STICKY_HEADER])
 
     # Register blueprints
     app.register_blueprint(suppliers_bp)
@@ -75,6 +181,18 @@ def create_app():
     app.register_blueprint(stock_transfer_item_bp)
     app.register_blueprint(business_location_bp)
     app.register_blueprint(dashboard_bp)
+    app.register_blueprint(reports_bp)
+    app.register_blueprint(alerts_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(debug_bp)
+
+    app.cli.add_command(search_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(openapi_cli)
+    app.cli.add_command(seed_cli)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(maintenance_cli)
+    app.cli.add_command(create_tables_command)
 
     @app.route("/")
     def index():
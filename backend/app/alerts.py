@@ -0,0 +1,201 @@
+"""
+Low-stock alerting.
+
+A product is LOW when its materialized stock balance is at or below its reorder
+point (product value, else category default, else DEFAULT_REORDER_POINT) and OUT
+when nothing is left. The evaluator stores the current status per product in
+`stock_alerts` and records every threshold crossing in `stock_alert_events`, so
+dashboards read alert state instead of recomputing stock for every product.
+"""
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import event, inspect, func, case, select, update
+
+from .models import db, Product, Category, StockBalance, StockAlert, StockAlertEvent, insert_on_conflict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REORDER_POINT = 5
+REORDER_FIELDS = ("reorder_point", "category_id", "is_deleted")
+
+
+def effective_reorder_point():
+    return func.coalesce(Product.reorder_point, Category.default_reorder_point, DEFAULT_REORDER_POINT)
+
+
+def effective_reorder_quantity():
+    return func.coalesce(Product.reorder_quantity, Category.default_reorder_quantity)
+
+
+def stock_status_query(product_ids=None):
+    """Stock, thresholds and status for every active product, in one query."""
+    stock = func.coalesce(StockBalance.quantity, 0)
+    reorder_point = effective_reorder_point()
+    status = case(
+        (stock <= 0, "OUT"),
+        (stock <= reorder_point, "LOW"),
+        else_="OK"
+    )
+
+    query = (
+        select(
+            Product.id.label("product_id"),
+            Product.name,
+            Product.sku,
+            Category.name.label("category"),
+            Product.abc_class,
+            stock.label("stock_level"),
+            reorder_point.label("reorder_point"),
+            effective_reorder_quantity().label("reorder_quantity"),
+            status.label("status")
+        )
+        .join(Category, Category.id == Product.category_id)
+        .outerjoin(StockBalance, StockBalance.product_id == Product.id)
+    )
+    if product_ids is not None:
+        query = query.where(Product.id.in_(product_ids))
+    return query
+
+
+def evaluate_alerts(product_ids=None):
+    """
+    Compare current stock status with the stored alert state and record crossings.
+    Pass `product_ids` to evaluate only products whose stock or thresholds changed.
+    Returns the number of crossings recorded.
+    """
+    current = {
+        row.product_id: row
+        for row in db.session.execute(stock_status_query(product_ids))
+    }
+
+    stored_query = db.session.query(StockAlert.product_id, StockAlert.status)
+    if product_ids is not None:
+        stored_query = stored_query.filter(StockAlert.product_id.in_(product_ids))
+    stored = dict(stored_query.all())
+
+    now = datetime.utcnow()
+    crossings = 0
+    alerts = StockAlert.__table__
+
+    for product_id in set(current) | set(stored):
+        row = current.get(product_id)
+        new_status = row.status if row else "OK"  # deleted products stop alerting
+        old_status = stored.get(product_id)
+        stock_level = row.stock_level if row else 0
+        reorder_point = row.reorder_point if row else 0
+
+        if old_status is None:
+            inserted = db.session.execute(
+                insert_on_conflict(db.session, alerts)
+                .values(product_id=product_id, status=new_status, stock_level=stock_level,
+                        reorder_point=reorder_point, changed_at=now)
+                .on_conflict_do_nothing(index_elements=[alerts.c.product_id])
+            )
+            if inserted.rowcount == 0:
+                # Another evaluator (every web worker runs one) stored it first: compare against its row
+                old_status = db.session.scalar(select(alerts.c.status).where(alerts.c.product_id == product_id))
+
+        if old_status is not None:
+            # Compare-and-set so concurrent evaluators record each crossing once
+            result = db.session.execute(
+                update(alerts)
+                .where(alerts.c.product_id == product_id, alerts.c.status == old_status)
+                .values(status=new_status, stock_level=stock_level, reorder_point=reorder_point,
+                        changed_at=now if new_status != old_status else alerts.c.changed_at)
+            )
+            if result.rowcount == 0:
+                continue
+
+        if new_status != (old_status or "OK"):
+            db.session.add(StockAlertEvent(
+                product_id=product_id, from_status=old_status or "OK", to_status=new_status,
+                stock_level=stock_level, reorder_point=reorder_point, created_at=now
+            ))
+            crossings += 1
+
+    db.session.commit()
+    return crossings
+
+
+class AlertEvaluator:
+    """
+    Background thread that re-evaluates products whose stock changed shortly after
+    each commit, plus a full pass every `interval` seconds to pick up threshold
+    edits on categories.
+    """
+
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self._pending = set()
+        self._full_pass = True
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="stock-alert-evaluator", daemon=True)
+            self._thread.start()
+
+    def notify(self, product_ids):
+        with self._lock:
+            self._pending.update(product_ids)
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            woken = self._wake.wait(timeout=self.interval)
+            self._wake.clear()
+            with self._lock:
+                pending, self._pending = self._pending, set()
+                full_pass, self._full_pass = self._full_pass or not woken, False
+
+            try:
+                with self.app.app_context():
+                    evaluate_alerts(None if full_pass else pending)
+            except Exception:
+                logger.exception("Stock alert evaluation failed")
+                with self._lock:
+                    self._pending.update(pending)
+
+
+_evaluator = None
+
+
+def init_alerts(app):
+    """Start the evaluator on the first request (so CLI commands never spawn it)."""
+    interval = app.config.get("ALERT_EVALUATOR_INTERVAL", 60)
+    if not interval:
+        return
+
+    @app.before_request
+    def _start_alert_evaluator():
+        global _evaluator
+        if _evaluator is None:
+            _evaluator = AlertEvaluator(app, interval)
+            _evaluator.start()
+
+
+@event.listens_for(db.session, "after_flush")
+def _track_threshold_changes(session, flush_context):
+    changed = session.info.setdefault("stock_changed_products", set())
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Product) and any(
+            inspect(obj).attrs[f].history.has_changes() for f in REORDER_FIELDS
+        ):
+            changed.add(obj.id)
+
+
+@event.listens_for(db.session, "after_commit")
+def _notify_evaluator(session):
+    changed = session.info.pop("stock_changed_products", None)
+    if changed and _evaluator is not None:
+        _evaluator.notify(changed)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("stock_changed_products", None)
@@ -0,0 +1,377 @@
+"""
+Archival of soft-deleted and closed-period rows.
+
+Soft-deleted purchases and stock transfers, and live ones dated before a closed
+period's end, are moved with their items into the `archived_*` tables (same
+columns, plus `archived_at` and `archive_reason`) in batches, one short
+transaction per batch. Soft-deleted suppliers and products follow once nothing
+in the hot tables references them.
+
+Archiving a live movement doesn't change stock: `stock_balances` and the daily
+rollups are left as they are (rollups before the archive horizon are frozen,
+see movements.rebuild_movement_rollups). The movement's net quantity is carried
+forward into `stock_balance_snapshots`, so balances recomputed from the hot
+movements (`Product.stock_level`) still add up, and the latest archived
+purchase cost keeps valuing the stock. Reads over history (spend per supplier
+or month, transfers per location, ABC consumption, the movements export) see
+the archived closed periods alongside the hot tables through `movement_history`.
+
+    flask archive run --deleted --before 2024-01-01
+    flask archive restore purchases 12 15
+    flask archive status
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, date
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, insert, update, delete, func, literal, exists, case, union_all
+
+from .models import (
+    db, Supplier, Product, Purchase, PurchaseItem, StockTransfer, StockTransferItem,
+    DailyMovementRollup, StockBalance, StockAlert, StockAlertEvent, StockBalanceSnapshot,
+    archived_suppliers, archived_products, archived_purchases, archived_purchase_items,
+    archived_stock_transfers, archived_stock_transfer_items
+)
+from .search import reindex_products
+
+BATCH_SIZE = 500
+
+# Purchases can't be edited after 30 days (see routes/purchases.py), so older periods are closed
+CLOSED_PERIOD_DAYS = 30
+
+DELETED, CLOSED = "DELETED", "CLOSED"
+
+# (hot table, archive table, item table, item archive table, item foreign key, date column)
+MOVEMENTS = {
+    "purchases": (
+        Purchase.__table__, archived_purchases, PurchaseItem.__table__, archived_purchase_items,
+        "purchase_id", "purchase_date"
+    ),
+    "stock_transfers": (
+        StockTransfer.__table__, archived_stock_transfers, StockTransferItem.__table__, archived_stock_transfer_items,
+        "stock_transfer_id", "date"
+    ),
+}
+ARCHIVES = {
+    "suppliers": (Supplier.__table__, archived_suppliers),
+    "products": (Product.__table__, archived_products),
+    "purchases": (Purchase.__table__, archived_purchases),
+    "purchase_items": (PurchaseItem.__table__, archived_purchase_items),
+    "stock_transfers": (StockTransfer.__table__, archived_stock_transfers),
+    "stock_transfer_items": (StockTransferItem.__table__, archived_stock_transfer_items),
+}
+
+
+def closed_period_end(today=None):
+    return (today or date.today()) - timedelta(days=CLOSED_PERIOD_DAYS)
+
+
+def archive_horizon(session):
+    """End of the latest archived closed period, or None when no live movement has been archived."""
+    return session.execute(select(func.max(StockBalanceSnapshot.archived_through))).scalar()
+
+
+def latest_unit_cost(hot_cost, hot_date):
+    """
+    SQL for a product's latest purchase cost, given its latest hot purchase's cost and date: the
+    archived cost from `stock_balance_snapshots` (outer-joined by the caller) wins when it is newer,
+    e.g. when only an older archived purchase has been restored.
+    """
+    snapshot = StockBalanceSnapshot.__table__.c
+    return case(
+        (hot_date >= snapshot.unit_cost_date, hot_cost),
+        else_=func.coalesce(snapshot.unit_cost, hot_cost)
+    )
+
+
+def movement_history(kind, columns, start=None, end=None, with_items=False, closed=True):
+    """
+    Live `kind` movements (purchases or stock_transfers) together with the ones
+    archived out of closed periods, dated in [start, end), as a subquery of
+    `columns(header, items)`. Reports over history read this, so archiving a
+    closed period doesn't drop it from them; `closed=False` leaves the archive out.
+    With `with_items`, headers are outer-joined to their items.
+    """
+    header, archive, items, item_archive, foreign_key, date_column = MOVEMENTS[kind]
+    sources = [(header, items, header.c.is_deleted == False)]
+    if closed:
+        sources.append((archive, item_archive, archive.c.archive_reason == CLOSED))
+
+    selects = []
+    for header_table, item_table, live in sources:
+        dates = header_table.c[date_column]
+        query = select(*columns(header_table, item_table)).where(
+            live, *([dates >= start] if start else []), *([dates < end] if end else [])
+        )
+        if with_items:
+            query = query.select_from(
+                header_table.outerjoin(item_table, item_table.c[foreign_key] == header_table.c.id)
+            )
+        selects.append(query)
+    return (union_all(*selects) if len(selects) > 1 else selects[0]).subquery()
+
+
+def supplier_names():
+    """(id, name) of every supplier, including soft-deleted and archived ones, for history reports."""
+    suppliers = Supplier.__table__
+    return union_all(
+        select(suppliers.c.id, suppliers.c.name),
+        select(archived_suppliers.c.id, archived_suppliers.c.name)
+    ).subquery()
+
+
+def _move(session, source, target, criteria, reason=None):
+    """Copy the rows matching `criteria` from `source` to `target`, then delete them from `source`."""
+    names = [c.name for c in target.columns if c.name not in ("archived_at", "archive_reason")]
+    columns = [source.c[name] for name in names]
+    if reason is not None:
+        names += ["archived_at", "archive_reason"]
+        columns += [literal(datetime.utcnow(), target.c.archived_at.type), literal(reason)]
+    session.execute(insert(target).from_select(names, select(*columns).where(*criteria)))
+    return session.execute(delete(source).where(*criteria)).rowcount
+
+
+def _net_quantities(session, kind, items, ids):
+    """Per product: net stock quantity and, for purchases, the latest (date, unit cost) of the given movements."""
+    quantities, costs = defaultdict(int), {}
+    if kind == "purchases":
+        purchases = Purchase.__table__ if items is PurchaseItem.__table__ else archived_purchases
+        rows = session.execute(
+            select(items.c.product_id, items.c.quantity, items.c.unit_cost, purchases.c.purchase_date)
+            .join(purchases, purchases.c.id == items.c.purchase_id)
+            .where(items.c.purchase_id.in_(ids))
+            .order_by(purchases.c.purchase_date, items.c.id)
+        )
+        for product_id, quantity, unit_cost, purchase_date in rows:
+            quantities[product_id] += quantity
+            costs[product_id] = (purchase_date, unit_cost)
+    else:
+        transfers = StockTransfer.__table__ if items is StockTransferItem.__table__ else archived_stock_transfers
+        signed = case((transfers.c.transfer_type == "OUT", -items.c.quantity), else_=items.c.quantity)
+        rows = session.execute(
+            select(items.c.product_id, func.sum(signed))
+            .join(transfers, transfers.c.id == items.c.stock_transfer_id)
+            .where(items.c.stock_transfer_id.in_(ids))
+            .group_by(items.c.product_id)
+        )
+        for product_id, quantity in rows:
+            quantities[product_id] += quantity
+    return quantities, costs
+
+
+def _carry_forward(session, quantities, costs, archived_through, sign):
+    table = StockBalanceSnapshot.__table__
+    for product_id, quantity in quantities.items():
+        values = {"quantity": table.c.quantity + sign * quantity}
+        if product_id in costs:
+            # Keep whichever archived cost is the most recent
+            cost_date, unit_cost = costs[product_id]
+            newer = table.c.unit_cost_date.is_(None) | (table.c.unit_cost_date <= cost_date)
+            values["unit_cost"] = case((newer, unit_cost), else_=table.c.unit_cost)
+            values["unit_cost_date"] = case((newer, cost_date), else_=table.c.unit_cost_date)
+        if archived_through is not None:
+            values["archived_through"] = case(
+                (table.c.archived_through < archived_through, archived_through), else_=table.c.archived_through
+            )
+        result = session.execute(update(table).where(table.c.product_id == product_id).values(**values))
+        if result.rowcount == 0:
+            cost_date, unit_cost = costs.get(product_id, (None, None))
+            session.execute(insert(table).values(
+                product_id=product_id, quantity=sign * quantity, unit_cost=unit_cost,
+                unit_cost_date=cost_date, archived_through=archived_through
+            ))
+
+
+def _archive_movements(session, kind, before, batch_size, log):
+    header, archive, items, item_archive, foreign_key, date_column = MOVEMENTS[kind]
+    archived = {DELETED: 0, CLOSED: 0}
+
+    for reason in (DELETED, CLOSED):
+        if reason == DELETED:
+            criteria = [header.c.is_deleted == True]
+        elif before is not None:
+            cutoff = datetime.combine(before, datetime.min.time())
+            criteria = [(header.c.is_deleted == False) | header.c.is_deleted.is_(None), header.c[date_column] < cutoff]
+        else:
+            continue
+
+        while True:
+            ids = session.execute(
+                select(header.c.id).where(*criteria).order_by(header.c[date_column], header.c.id).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            if reason == CLOSED:
+                quantities, costs = _net_quantities(session, kind, items, ids)
+                _carry_forward(session, quantities, costs, before, +1)
+            _move(session, items, item_archive, [items.c[foreign_key].in_(ids)], reason)
+            archived[reason] += _move(session, header, archive, [header.c.id.in_(ids)], reason)
+            session.commit()
+            log(f"   {kind}: {archived[reason]} {reason.lower()} archived")
+    return archived
+
+
+def _unreferenced(table, *references):
+    return [~exists().where(column == table.c.id) for column in references]
+
+
+def _archive_parties(session, batch_size, log):
+    """Soft-deleted suppliers and products that nothing in the hot tables refers to any more."""
+    suppliers, products = Supplier.__table__, Product.__table__
+    candidates = {
+        "suppliers": (suppliers, archived_suppliers, _unreferenced(suppliers, Purchase.__table__.c.supplier_id)),
+        "products": (products, archived_products, _unreferenced(
+            products, PurchaseItem.__table__.c.product_id, StockTransferItem.__table__.c.product_id,
+            DailyMovementRollup.__table__.c.product_id, StockAlertEvent.__table__.c.product_id,
+            StockBalanceSnapshot.__table__.c.product_id
+        ) + [~exists().where(StockBalance.product_id == products.c.id, StockBalance.quantity != 0)]),
+    }
+    archived = {}
+    for kind, (table, archive, criteria) in candidates.items():
+        archived[kind] = 0
+        while True:
+            ids = session.execute(
+                select(table.c.id).where(table.c.is_deleted == True, *criteria).order_by(table.c.id).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            if kind == "products":
+                session.execute(delete(StockBalance.__table__).where(StockBalance.product_id.in_(ids)))
+                session.execute(delete(StockAlert.__table__).where(StockAlert.product_id.in_(ids)))
+            archived[kind] += _move(session, table, archive, [table.c.id.in_(ids)], DELETED)
+            if kind == "products":
+                reindex_products(session.connection(), ids)
+            session.commit()
+            log(f"   {kind}: {archived[kind]} deleted archived")
+    return archived
+
+
+def archive(before=None, batch_size=BATCH_SIZE, log=print):
+    """
+    Archive every soft-deleted movement, supplier and product, and the live
+    movements dated before `before` (must be in a closed period). Returns the
+    rows archived per table and reason.
+    """
+    if before is not None and before > closed_period_end():
+        raise ValueError(f"{before} is not in a closed period; use a date on or before {closed_period_end()}")
+
+    session = db.session
+    results = {}
+    for kind in MOVEMENTS:
+        results[kind] = _archive_movements(session, kind, before, batch_size, log)
+    for kind, count in _archive_parties(session, batch_size, log).items():
+        results[kind] = {DELETED: count, CLOSED: 0}
+    return results
+
+
+def _restore_parties(session, kind, ids):
+    """Bring back archived suppliers or products among `ids`, so restored rows can reference them."""
+    table, archive = ARCHIVES[kind]
+    ids = list(ids)
+    restored = _move(session, archive, table, [archive.c.id.in_(ids)]) if ids else 0
+    if restored and kind == "products":
+        reindex_products(session.connection(), ids)
+    return restored
+
+
+def restore(kind, ids, batch_size=BATCH_SIZE):
+    """
+    Move archived rows of `kind` (purchases, stock_transfers, suppliers or
+    products) back into the hot tables, with their items and any archived
+    supplier or product they refer to. Returns the number of rows restored.
+    """
+    session = db.session
+    if kind in ("suppliers", "products"):
+        table, _ = ARCHIVES[kind]
+        existing = set(session.execute(select(table.c.id).where(table.c.id.in_(ids))).scalars())
+        if existing:
+            raise ValueError(f"{kind} {sorted(existing)} already exist in the live table")
+        restored = _restore_parties(session, kind, ids)
+        session.commit()
+        return restored
+
+    header, archive, items, item_archive, foreign_key, _ = MOVEMENTS[kind]
+    existing = set(session.execute(select(header.c.id).where(header.c.id.in_(ids))).scalars())
+    if existing:
+        raise ValueError(f"{kind} {sorted(existing)} already exist in the live table")
+
+    restored = 0
+    ids = list(ids)
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        rows = session.execute(select(archive.c.id, archive.c.archive_reason).where(archive.c.id.in_(batch))).all()
+        if not rows:
+            continue
+
+        if kind == "purchases":
+            supplier_ids = session.execute(
+                select(archive.c.supplier_id).where(archive.c.id.in_(batch)).distinct()
+            ).scalars().all()
+            _restore_parties(session, "suppliers", supplier_ids)
+        product_ids = session.execute(
+            select(item_archive.c.product_id).where(item_archive.c[foreign_key].in_(batch)).distinct()
+        ).scalars().all()
+        _restore_parties(session, "products", product_ids)
+
+        # Restored live movements are counted by the hot tables again, not by the snapshot
+        closed = [header_id for header_id, reason in rows if reason == CLOSED]
+        if closed:
+            quantities, _ = _net_quantities(session, kind, item_archive, closed)
+            _carry_forward(session, quantities, {}, None, -1)
+
+        _move(session, item_archive, items, [item_archive.c[foreign_key].in_(batch)])
+        restored += _move(session, archive, header, [archive.c.id.in_(batch)])
+        session.commit()
+    return restored
+
+
+def archive_status():
+    counts = {
+        name: db.session.execute(select(func.count()).select_from(archive)).scalar()
+        for name, (_, archive) in ARCHIVES.items()
+    }
+    return {"archived": counts, "horizon": archive_horizon(db.session)}
+
+
+archive_cli = AppGroup("archive", help="Move old and soft-deleted rows into the archive tables.")
+
+
+@archive_cli.command("run")
+@click.option("--deleted", "deleted_only", is_flag=True, help="Only archive soft-deleted rows.")
+@click.option("--before", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Also archive live movements dated before this day (a closed period).")
+@click.option("--batch-size", type=int, default=BATCH_SIZE, show_default=True)
+def run_command(deleted_only, before, batch_size):
+    """Archive soft-deleted rows and, with --before, closed-period movements."""
+    if not deleted_only and before is None:
+        raise click.UsageError("Pass --deleted, --before YYYY-MM-DD, or both.")
+    try:
+        results = archive(before.date() if before else None, batch_size)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for kind, counts in results.items():
+        print(f"📦 {kind}: {counts[DELETED]} deleted, {counts[CLOSED]} closed-period rows archived")
+    print("✅ Archive run complete.")
+
+
+@archive_cli.command("restore")
+@click.argument("kind", type=click.Choice(["purchases", "stock_transfers", "suppliers", "products"]))
+@click.argument("ids", type=int, nargs=-1, required=True)
+def restore_command(kind, ids):
+    """Move archived rows (and their items) back into the live tables."""
+    try:
+        restored = restore(kind, ids)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f"✅ Restored {restored} of {len(ids)} {kind}.")
+
+
+@archive_cli.command("status")
+def status_command():
+    """Show archived row counts and the archive horizon."""
+    status = archive_status()
+    for name, count in status["archived"].items():
+        print(f"📦 archived_{name}: {count}")
+    horizon = status["horizon"]
+    print(f"ℹ️ Movements before {horizon} are archived." if horizon else "ℹ️ No closed period archived yet.")
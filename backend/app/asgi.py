@@ -0,0 +1,271 @@
+"""
+Optional ASGI deployment mode.
+
+    uvicorn asgi:app --workers 4
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker -w 4
+
+Read endpoints listed in READ_ROUTES are served on an async SQLAlchemy engine
+(aiosqlite / asyncpg), so a slow dashboard or report query waits on the event
+loop instead of holding a whole worker. The view logic is shared with the Flask
+views: each read is a plain function taking a session, run here through
+`AsyncSession.run_sync`. The dashboard summary runs its independent sections
+concurrently with `asyncio.gather`, each on its own connection.
+
+Sampled reads get the same Server-Timing header and app.timing log line as
+Flask requests (see app/timing.py), and every read is counted in the
+Prometheus metrics under its Flask route. `?__profile` requests (app/profiling.py)
+are handed to Flask so the profile covers the whole view.
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory so /metrics aggregates them (gunicorn.conf.py does this for gunicorn).
+
+With DATABASE_REPLICA_URL set, these reads go to the replica unless the client
+sends a fresh `X-Primary-Until` header or `primary_until` cookie from a recent
+write (see app/replica.py).
+
+Every other request (writes, docs, CORS preflight, ...) is passed to the normal
+Flask app through `WsgiToAsgi`, so both modes expose the same API.
+"""
+import asyncio
+import contextvars
+import logging
+from functools import partial
+from urllib.parse import parse_qsl
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_cookie
+
+from . import create_app, CORS_ORIGINS
+from .models import (
+    db, Product, Category, Supplier, BusinessLocation, Purchase, StockTransfer, to_dict_loader_options
+)
+from .engine import get_profile, engine_options, apply_sqlite_pragmas
+from .replica import REPLICA_BIND, STICKY_COOKIE, STICKY_HEADER, recently_wrote
+from .timing import start_request_timing, current_timing, finish_request_timing
+from .metrics import begin_request, end_request, route_labels
+from .slow_queries import set_route, reset_route
+from .profiling import profile_requested
+from .routes import dashboard, reports
+
+logger = logging.getLogger(__name__)
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+INVALID_DATE = {"error": "Invalid date. Use ISO format, e.g. 2025-06-30"}
+
+
+def async_database_url(url):
+    """The async-driver equivalent of the app's (already resolved) sync database URL."""
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def _in_session(load):
+    """Run a sync `load(session, args)` view on one async session."""
+    async def handler(read, args):
+        return await read(load, args)
+    return handler
+
+
+async def _dashboard_summary(read, args):
+    # Each section gets its own session/connection so they run concurrently
+    sections = dashboard.summary_sections()
+    results = await asyncio.gather(*(read(load) for load in sections.values()))
+    return dashboard.summary_payload(dict(zip(sections, results))), 200
+
+
+def _list_view(model, order_by=None):
+    def load(session, args):
+        # Soft-deleted rows are left out by the session (see models.exclude_soft_deleted)
+        query = select(model).options(*to_dict_loader_options(model))
+        if model is Product:
+            query = query.join(Category, Category.id == Product.category_id)
+        if order_by is not None:
+            query = query.order_by(order_by)
+        return [obj.to_dict() for obj in session.scalars(query)], 200
+    return _in_session(load)
+
+
+def _date_report(report):
+    def load(session, args):
+        try:
+            start, end = reports._parse_date_range(args)
+        except ValueError:
+            return INVALID_DATE, 400
+        return report(session, start, end), 200
+    return _in_session(load)
+
+
+def _inventory_value(session, args):
+    try:
+        end = reports._parse_as_of(args)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    return reports.inventory_value_report(session, end), 200
+
+
+def _movement_series(session, args):
+    bucket = args.get("bucket", "day")
+    if bucket not in ("day", "week", "month"):
+        return {"error": "bucket must be one of 'day', 'week' or 'month'"}, 400
+    try:
+        start, end = reports._parse_date_range(args)
+    except ValueError:
+        return INVALID_DATE, 400
+    return reports.movement_series_report(
+        session, bucket, start, end,
+        product_id=args.get("product_id", type=int),
+        location_id=args.get("location_id", type=int)
+    ), 200
+
+
+def _dashboard_movements(session, args):
+    try:
+        limit, before, paged = dashboard.movement_feed_params(args)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    return dashboard.movement_feed(session, limit, before, paged), 200
+
+
+_suppliers = _list_view(Supplier)
+
+# Paths match the Flask routes exactly; anything else falls through to Flask
+READ_ROUTES = {
+    "/products": _list_view(Product),
+    "/categories": _list_view(Category),
+    "/suppliers": _suppliers,
+    "/suppliers/": _suppliers,
+    "/business_locations": _list_view(BusinessLocation),
+    "/purchases/": _list_view(Purchase, order_by=Purchase.purchase_date.desc()),
+    "/stock_transfers": _list_view(StockTransfer),
+    "/dashboard/summary": _dashboard_summary,
+    "/dashboard/movements": _in_session(_dashboard_movements),
+    "/reports/inventory_value_by_category": _in_session(_inventory_value),
+    "/reports/purchases_by_supplier": _date_report(reports.supplier_purchases_report),
+    "/reports/purchases_by_month": _date_report(reports.monthly_purchases_report),
+    "/reports/transfers_by_location": _date_report(reports.location_transfers_report),
+    "/reports/movements/series": _in_session(_movement_series),
+}
+
+
+class AsyncReadApp:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+
+        with flask_app.app_context():
+            urls = {key: async_database_url(engine.url) for key, engine in db.engines.items()}
+        profile = get_profile(flask_app.config["DB_PROFILE"])
+
+        # None is the primary; the replica bind exists only when DATABASE_REPLICA_URL is set
+        self.engines = {}
+        self.sessions = {}
+        for key, url in urls.items():
+            engine = create_async_engine(url, **engine_options(url, profile))
+            apply_sqlite_pragmas(engine.sync_engine, profile)
+            self.engines[key] = engine
+            self.sessions[key] = async_sessionmaker(engine, expire_on_commit=False)
+
+        # Metrics labels of the Flask route each async read stands in for
+        adapter = flask_app.url_map.bind("localhost")
+        self.route_labels = {}
+        for path in READ_ROUTES:
+            rule, _ = adapter.match(path, method="GET", return_rule=True)
+            self.route_labels[path] = route_labels(rule, rule.endpoint)
+
+    def sessions_for(self, scope):
+        """Replica sessions unless there is no replica or the client wrote recently."""
+        if REPLICA_BIND not in self.sessions:
+            return self.sessions[None]
+        headers = dict(scope["headers"])
+        cookies = parse_cookie(headers.get(b"cookie", b"").decode("latin-1"))
+        header = headers.get(STICKY_HEADER.lower().encode(), b"").decode("latin-1")
+        wrote = recently_wrote(header, cookies.get(STICKY_COOKIE))
+        return self.sessions[None if wrote else REPLICA_BIND]
+
+    @staticmethod
+    async def read(sessions, load, *args):
+        async with sessions() as session:
+            return await session.run_sync(load, *args)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+
+        handler = READ_ROUTES.get(scope.get("path")) if scope["type"] == "http" else None
+        if handler is None or scope["method"] != "GET":
+            await self.call_flask(scope, receive, send)
+            return
+
+        args = MultiDict(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True))
+        if self.flask_app.config.get("PROFILING_ENABLED") and profile_requested(args):
+            # cProfile follows one thread, so profile the equivalent Flask view
+            await self.call_flask(scope, receive, send)
+            return
+
+        token = start_request_timing(self.flask_app.config.get("PERF_SAMPLE_RATE", 0))
+        metrics, status = begin_request(), 500
+        route = set_route(f"GET {self.route_labels[scope['path']][1]}")
+        try:
+            try:
+                payload, status = await handler(partial(self.read, self.sessions_for(scope)), args)
+            except Exception:
+                logger.exception("Async read %s failed", scope["path"])
+                payload, status = {"error": "Internal server error"}, 500
+
+            await self.respond(scope, send, payload, status)
+        finally:
+            end_request(metrics, *self.route_labels[scope["path"]], "GET", status)
+            reset_route(route)
+            finish_request_timing(token)
+
+    async def call_flask(self, scope, receive, send):
+        async def run():
+            async with ThreadSensitiveContext():
+                await self.wsgi(scope, receive, send)
+
+        # asgiref marks the calling context while it runs a WSGI request, and uvicorn can start the next
+        # keep-alive request from inside that context, which then fails with "would deadlock". A fresh
+        # context per request avoids that, and its own thread lets Flask requests run concurrently.
+        await asyncio.create_task(run(), context=contextvars.Context())
+
+    async def respond(self, scope, send, payload, status):
+        body = (self.flask_app.json.dumps(payload) + "\n").encode()
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+
+        timing = current_timing()
+        if timing is not None:
+            server_timing = timing.emit("GET", scope["path"], f"asgi:{scope['path']}", status)
+            headers.append((b"server-timing", server_timing.encode()))
+
+        # Same CORS behaviour as flask-cors for simple GET requests
+        origin = dict(scope["headers"]).get(b"origin", b"").decode("latin-1")
+        if origin in CORS_ORIGINS:
+            headers += [(b"access-control-allow-origin", origin.encode()), (b"vary", b"Origin")]
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for engine in self.engines.values():
+                    await engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app():
+    return AsyncReadApp(create_app())
@@ -0,0 +1,130 @@
+"""
+In-memory prefix index for product pickers.
+
+Each worker process keeps sorted arrays of lowercased keys (full name, SKU and
+every word of the name) next to the matching product ids, so a prefix lookup is
+a `bisect` plus a short forward scan. Matches on the start of the name come
+first, then SKU matches, then matches on a later word of the name.
+
+A commit that touches products or categories drops this worker's index; the
+next lookup rebuilds it with a single query. Other workers cannot see that
+commit, so their copy is also rebuilt once it is older than
+AUTOCOMPLETE_MAX_AGE seconds.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app
+from sqlalchemy import event, select
+
+from .models import db, Product, Category
+from .metrics import record_cache
+
+DEFAULT_LIMIT = 10
+
+
+class PrefixIndex:
+    def __init__(self, rows):
+        """`rows` are (id, name, sku, unit) tuples for every pickable product."""
+        self.products = {row[0]: row for row in rows}
+
+        names, skus, words = [], [], []
+        for product_id, name, sku, unit in rows:
+            name = name.lower()
+            names.append((name, product_id))
+            if sku:
+                skus.append((sku.lower(), product_id))
+            for word in name.split()[1:]:
+                words.append((word, product_id))
+
+        # Parallel key/id lists per tier, in match-priority order
+        self._tiers = []
+        for entries in (names, skus, words):
+            entries.sort()
+            self._tiers.append(([key for key, _ in entries], [product_id for _, product_id in entries]))
+
+    def __len__(self):
+        return len(self.products)
+
+    def lookup(self, prefix, limit=DEFAULT_LIMIT):
+        prefix = prefix.lower()
+        found = []
+        seen = set()
+
+        for keys, ids in self._tiers:
+            i = bisect_left(keys, prefix)
+            while i < len(keys) and len(found) < limit and keys[i].startswith(prefix):
+                if ids[i] not in seen:
+                    seen.add(ids[i])
+                    found.append(self.products[ids[i]])
+                i += 1
+            if len(found) >= limit:
+                break
+
+        return found
+
+
+def _load_index():
+    rows = db.session.execute(
+        select(Product.id, Product.name, Product.sku, Product.unit)
+        .join(Category, Category.id == Product.category_id)
+    ).all()
+    return PrefixIndex([tuple(row) for row in rows])
+
+
+_index = None
+_built_at = 0.0
+_generation = 0
+_lock = threading.Lock()
+
+
+def get_index():
+    """This worker's index, rebuilt when invalidated or older than AUTOCOMPLETE_MAX_AGE."""
+    global _index, _built_at
+    max_age = current_app.config.get("AUTOCOMPLETE_MAX_AGE", 30)
+
+    index = _index
+    if index is not None and time.monotonic() - _built_at < max_age:
+        record_cache("autocomplete", hit=True)
+        return index
+
+    with _lock:
+        if _index is not None and time.monotonic() - _built_at < max_age:
+            record_cache("autocomplete", hit=True)
+            return _index
+        record_cache("autocomplete", hit=False)
+        generation = _generation
+        built_at = time.monotonic()
+        index = _load_index()
+        # Don't keep a copy loaded before a commit that invalidated it
+        if generation == _generation:
+            _index, _built_at = index, built_at
+        return index
+
+
+def invalidate():
+    global _index, _generation
+    _generation += 1
+    _index = None
+
+
+def autocomplete(prefix, limit=DEFAULT_LIMIT):
+    return get_index().lookup(prefix, limit)
+
+
+@event.listens_for(db.session, "after_flush")
+def _track_product_writes(session, flush_context):
+    if any(isinstance(obj, (Product, Category)) for obj in session.new | session.dirty | session.deleted):
+        session.info["autocomplete_stale"] = True
+
+
+@event.listens_for(db.session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("autocomplete_stale", False):
+        invalidate()
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("autocomplete_stale", None)
@@ -0,0 +1,153 @@
+"""
+ABC (Pareto) classification of products by annual consumption value.
+
+Annual consumption value is the outbound quantity over the last year times the
+latest purchase unit cost. Products are ranked by that value and classed A
+(first 80% of total value), B (next 15%) or C (the rest).
+
+The movement flush listener queues moved products in `abc_stale_products` (an
+insert that skips ids already queued, so `products` itself is never written on
+the movement path), and a run only re-aggregates movements for those products;
+ranking is then a single window-function pass over the stored values on
+`products`. A full run is still needed now and then (e.g. weekly) as old
+movements age out of the one-year window.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update, delete, case, bindparam
+
+from .models import (
+    db, Product, Purchase, PurchaseItem, StockBalanceSnapshot, AbcStaleProduct, insert_on_conflict
+)
+from .archive import latest_unit_cost, movement_history
+
+CLASS_A_SHARE = 0.80
+CLASS_B_SHARE = 0.95
+CONSUMPTION_WINDOW_DAYS = 365
+
+
+def mark_stale(session, product_ids):
+    """Queue products whose classification needs refreshing; called from the movement listener."""
+    if product_ids:
+        stale = AbcStaleProduct.__table__
+        session.connection().execute(
+            insert_on_conflict(session, stale)
+            .values([{"product_id": product_id} for product_id in sorted(product_ids)])
+            .on_conflict_do_nothing(index_elements=[stale.c.product_id])
+        )
+
+
+def _consumption_values(product_ids):
+    """Annual outbound quantity x latest unit cost for the given products (all products when None)."""
+    since = datetime.now() - timedelta(days=CONSUMPTION_WINDOW_DAYS)
+
+    # The window reaches back past the closed period, so transfers archived out of it still count
+    transfers = movement_history(
+        "stock_transfers",
+        lambda header, items: [
+            items.c.product_id.label("product_id"),
+            items.c.quantity.label("quantity"),
+            header.c.transfer_type.label("transfer_type")
+        ],
+        start=since, with_items=True
+    )
+    outbound = (
+        select(transfers.c.product_id, func.sum(transfers.c.quantity).label("quantity"))
+        .where(transfers.c.transfer_type == "OUT")
+        .group_by(transfers.c.product_id)
+    )
+    ranked_costs = (
+        select(
+            PurchaseItem.product_id.label("product_id"),
+            PurchaseItem.unit_cost.label("unit_cost"),
+            Purchase.purchase_date.label("purchase_date"),
+            func.row_number().over(
+                partition_by=PurchaseItem.product_id,
+                order_by=(Purchase.purchase_date.desc(), PurchaseItem.id.desc())
+            ).label("rank")
+        )
+        .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+    )
+    if product_ids is not None:
+        outbound = outbound.where(transfers.c.product_id.in_(product_ids))
+        ranked_costs = ranked_costs.where(PurchaseItem.product_id.in_(product_ids))
+
+    outbound = outbound.subquery()
+    ranked_costs = ranked_costs.subquery()
+
+    query = (
+        select(
+            Product.id,
+            func.coalesce(outbound.c.quantity, 0)
+            * func.coalesce(latest_unit_cost(ranked_costs.c.unit_cost, ranked_costs.c.purchase_date), 0)
+        )
+        .outerjoin(outbound, outbound.c.product_id == Product.id)
+        .outerjoin(ranked_costs, (ranked_costs.c.product_id == Product.id) & (ranked_costs.c.rank == 1))
+        .outerjoin(StockBalanceSnapshot, StockBalanceSnapshot.product_id == Product.id)
+    )
+    if product_ids is not None:
+        query = query.where(Product.id.in_(product_ids))
+    return db.session.execute(query).all()
+
+
+def classify_products(full=False):
+    """
+    Refresh consumption values for stale products (every product when `full`) and
+    re-rank all active products. Returns (products refreshed, classes changed).
+    """
+    products = Product.__table__
+    stale = AbcStaleProduct.__table__
+
+    if full:
+        refreshed = _consumption_values(None)
+        db.session.execute(delete(stale))
+    else:
+        stale_ids = db.session.execute(select(stale.c.product_id)).scalars().all()
+        refreshed = _consumption_values(stale_ids) if stale_ids else []
+        if stale_ids:
+            db.session.execute(delete(stale).where(stale.c.product_id.in_(stale_ids)))
+
+    if refreshed:
+        db.session.execute(
+            update(products)
+            .where(products.c.id == bindparam("product_id"))
+            .values(annual_consumption_value=bindparam("value")),
+            [{"product_id": product_id, "value": float(value or 0)} for product_id, value in refreshed]
+        )
+
+    # Rank by value; a product's class is decided by the share of value ranked before it
+    value = func.coalesce(products.c.annual_consumption_value, 0)
+    running_total = func.sum(value).over(order_by=(value.desc(), products.c.id))
+    grand_total = func.sum(value).over()
+    ranked = (
+        select(
+            products.c.id,
+            products.c.abc_class,
+            value.label("value"),
+            (running_total - value).label("before"),
+            grand_total.label("total")
+        )
+        .where(products.c.is_deleted == False)
+        .subquery()
+    )
+    new_class = case(
+        (ranked.c.value <= 0, "C"),
+        (ranked.c.before < ranked.c.total * CLASS_A_SHARE, "A"),
+        (ranked.c.before < ranked.c.total * CLASS_B_SHARE, "B"),
+        else_="C"
+    )
+    changes = db.session.execute(
+        select(ranked.c.id, new_class)
+        .where(func.coalesce(ranked.c.abc_class, "") != new_class)
+    ).all()
+
+    if changes:
+        db.session.execute(
+            update(products)
+            .where(products.c.id == bindparam("product_id"))
+            .values(abc_class=bindparam("new_class")),
+            [{"product_id": product_id, "new_class": abc_class} for product_id, abc_class in changes]
+        )
+
+    db.session.commit()
+    return len(refreshed), len(changes)
@@ -0,0 +1,140 @@
+"""
+Demand forecasting and reorder suggestions.
+
+Daily outbound (OUT transfer) quantities are read from the movement rollups in a
+single query and forecast for every product at once with NumPy. The history is
+kept as sparse (product, day, quantity) arrays and reduced with `np.bincount`,
+so memory stays proportional to the number of rollup rows rather than
+products x days.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import func, select
+
+from .models import db, Product, Category, DailyMovementRollup, StockBalance
+from .alerts import effective_reorder_point, effective_reorder_quantity
+
+
+def load_daily_outbound(history_days, today=None):
+    """Return (product_ids, product_index, day_index, quantity) arrays for the last `history_days` days."""
+    today = today or date.today()
+    start = today - timedelta(days=history_days - 1)
+
+    rows = db.session.execute(
+        select(
+            DailyMovementRollup.product_id,
+            DailyMovementRollup.day,
+            func.sum(DailyMovementRollup.quantity)
+        )
+        .where(
+            DailyMovementRollup.movement_type == "OUT",
+            DailyMovementRollup.day >= start,
+            DailyMovementRollup.day <= today
+        )
+        .group_by(DailyMovementRollup.product_id, DailyMovementRollup.day)
+    ).all()
+
+    if not rows:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty, np.array([], dtype=np.float64)
+
+    raw_products = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    days = np.fromiter(((r[1] - start).days for r in rows), dtype=np.int64, count=len(rows))
+    quantity = np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows))
+
+    product_ids, product_index = np.unique(raw_products, return_inverse=True)
+    return product_ids, product_index, days, quantity
+
+
+def forecast_demand(product_index, day_index, quantity, n_products, history_days, window=28, alpha=0.3):
+    """
+    Per-product daily demand estimates:
+      - moving average over the last `window` days
+      - simple exponential smoothing over the whole history (closed form:
+        level = sum(alpha * (1 - alpha) ** age * x), seeded with the history mean)
+    """
+    recent = day_index >= history_days - window
+    moving_average = np.bincount(
+        product_index[recent], weights=quantity[recent], minlength=n_products
+    ) / window
+
+    age = (history_days - 1) - day_index
+    smoothed = np.bincount(
+        product_index, weights=quantity * alpha * (1 - alpha) ** age, minlength=n_products
+    )
+    history_mean = np.bincount(product_index, weights=quantity, minlength=n_products) / history_days
+    smoothed += (1 - alpha) ** history_days * history_mean
+
+    return moving_average, smoothed
+
+
+def reorder_suggestions(history_days=365, window=28, alpha=0.3, lead_time_days=7, cover_days=30):
+    """
+    Forecast demand for every product with outbound history and suggest how much
+    to reorder so stock covers the lead time plus `cover_days` of demand.
+    """
+    product_ids, product_index, day_index, quantity = load_daily_outbound(history_days)
+    if product_ids.size == 0:
+        return []
+
+    moving_average, smoothed = forecast_demand(
+        product_index, day_index, quantity, product_ids.size, history_days, window, alpha
+    )
+    # Blend the short-term and long-term view; either alone over- or under-reacts
+    daily_demand = (moving_average + smoothed) / 2
+
+    stock_rows = db.session.execute(
+        select(
+            Product.id,
+            Product.name,
+            Product.sku,
+            func.coalesce(StockBalance.quantity, 0),
+            effective_reorder_point(),
+            effective_reorder_quantity()
+        )
+        .join(Category, Category.id == Product.category_id)
+        .outerjoin(StockBalance, StockBalance.product_id == Product.id)
+    ).all()
+    if not stock_rows:
+        return []
+
+    stock_ids = np.fromiter((r[0] for r in stock_rows), dtype=np.int64, count=len(stock_rows))
+    stock = np.fromiter((r[3] for r in stock_rows), dtype=np.float64, count=len(stock_rows))
+    pack_size = np.fromiter((r[5] or 0 for r in stock_rows), dtype=np.float64, count=len(stock_rows))
+
+    # Align forecasts with the active products (products without history forecast 0)
+    position = np.searchsorted(product_ids, stock_ids)
+    position = np.clip(position, 0, product_ids.size - 1)
+    has_history = product_ids[position] == stock_ids
+    demand = np.where(has_history, daily_demand[position], 0.0)
+    ma = np.where(has_history, moving_average[position], 0.0)
+    ses = np.where(has_history, smoothed[position], 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_of_cover = np.where(demand > 0, stock / demand, np.inf)
+
+    needed = np.ceil(np.maximum(demand * (lead_time_days + cover_days) - stock, 0))
+    # Round up to whole reorder quantities where a pack size is configured
+    packs = np.ceil(needed / np.where(pack_size > 0, pack_size, 1))
+    suggested = np.where(pack_size > 0, packs * pack_size, needed)
+
+    order = np.argsort(days_of_cover, kind="stable")
+    suggestions = []
+    for i in order:
+        if suggested[i] <= 0:
+            continue
+        row = stock_rows[i]
+        suggestions.append({
+            "product_id": row[0],
+            "name": row[1],
+            "sku": row[2],
+            "stock_level": int(stock[i]),
+            "reorder_point": row[4],
+            "moving_average": round(float(ma[i]), 3),
+            "exponential_smoothing": round(float(ses[i]), 3),
+            "daily_demand": round(float(demand[i]), 3),
+            "days_of_cover": round(float(days_of_cover[i]), 1) if np.isfinite(days_of_cover[i]) else None,
+            "suggested_quantity": int(suggested[i]),
+        })
+    return suggestions
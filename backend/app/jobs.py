@@ -0,0 +1,422 @@
+"""
+Background jobs for work too slow for a request: exports, valuation reports and
+recomputes.
+
+Jobs are rows in the `jobs` table, so every gunicorn worker (and any
+`flask jobs work` process) shares one queue. A JobRunner claims QUEUED jobs with
+a compare-and-set update, runs each in its own app context and writes the result
+under JOB_RESULTS_DIR, where GET /jobs/<id>/result serves it.
+
+Concurrency is bounded twice: JOB_WORKERS threads per web process (0 keeps jobs
+out of the web workers entirely; run `flask jobs work` instead) and
+JOB_MAX_RUNNING jobs across all processes, so exports cannot take over every
+worker or the database.
+"""
+import csv
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import select, update, func, literal, null, union_all, text
+
+from .models import (
+    db, Job, Product, BusinessLocation
+)
+from .alerts import stock_status_query
+from .classification import classify_products
+from .movements import rebuild_movement_rollups, rebuild_stock_balances
+from .archive import movement_history, supplier_names
+from .routes.reports import inventory_value_report, _parse_date_range, _parse_as_of
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH = 1000
+PROGRESS_INTERVAL = 1.0  # seconds between progress writes
+CLAIM_LOCK_KEY = 0x6A6F6273  # pg advisory lock serializing claims ("jobs")
+
+# name -> (run(ctx, params), parse_params(params) -> stored params)
+JOB_TYPES = {}
+
+
+def job_type(name, parse_params=None):
+    def register(run):
+        JOB_TYPES[name] = (run, parse_params or (lambda params: {}))
+        return run
+    return register
+
+
+def parse_job_params(name, params):
+    """Validated params to store for a new job; raises ValueError on bad input."""
+    if name not in JOB_TYPES:
+        raise ValueError(f"Unknown job type '{name}'. Choose one of: {', '.join(sorted(JOB_TYPES))}")
+    if not isinstance(params, dict):
+        raise ValueError("params must be an object")
+    return JOB_TYPES[name][1](params)
+
+
+def _date_range_params(params):
+    dates = {key: params[key] for key in ("from", "to") if params.get(key)}
+    if not all(isinstance(value, str) for value in dates.values()):
+        raise ValueError("from/to must be ISO date strings")
+    try:
+        _parse_date_range(dates)
+    except ValueError:
+        raise ValueError("Invalid date. Use ISO format, e.g. 2025-06-30")
+    return dates
+
+
+def _as_of_params(params):
+    dates = _date_range_params(params)
+    _parse_as_of(dates)
+    return dates
+
+
+def _update_job(job_id, **values):
+    with db.engine.begin() as connection:
+        connection.execute(update(Job.__table__).where(Job.__table__.c.id == job_id).values(**values))
+
+
+class JobContext:
+    """Handed to a running job for progress reports and its result file."""
+
+    def __init__(self, job_id, results_dir):
+        self.job_id = job_id
+        self.results_dir = results_dir
+        self.result_path = None
+        self._last_progress = 0.0
+
+    def progress(self, done, total, message=None):
+        now = time.monotonic()
+        if now - self._last_progress < PROGRESS_INTERVAL and done < total:
+            return
+        self._last_progress = now
+        percent = min(99, int(done * 100 / total)) if total else 0
+        try:
+            _update_job(self.job_id, progress=percent, progress_message=message, heartbeat_at=datetime.utcnow())
+        except Exception:
+            # A busy database must not fail the job itself
+            logger.warning("Could not record progress for job %s", self.job_id, exc_info=True)
+
+    def open_result(self, extension):
+        """Open the result file; it is written as .part and renamed when the job succeeds."""
+        os.makedirs(self.results_dir, exist_ok=True)
+        self.result_path = os.path.join(self.results_dir, f"job-{self.job_id}.{extension}")
+        return open(self.result_path + ".part", "w", newline="", encoding="utf-8")
+
+    def finish(self, payload):
+        if payload is not None:
+            with self.open_result("json") as f:
+                json.dump(payload, f, default=str)
+        if self.result_path:
+            os.replace(self.result_path + ".part", self.result_path)
+
+    def discard(self):
+        if self.result_path and os.path.exists(self.result_path + ".part"):
+            os.remove(self.result_path + ".part")
+
+
+def enqueue_job(name, params):
+    job = Job(job_type=name, params=parse_job_params(name, params), status="QUEUED")
+    db.session.add(job)
+    db.session.commit()
+    if _runner is not None:
+        _runner.notify()
+    return job
+
+
+def claim_next_job(worker, max_running):
+    """Move the oldest QUEUED job to RUNNING unless `max_running` jobs already run. Returns its id."""
+    jobs = Job.__table__
+    running_jobs = jobs.alias("running_jobs")
+    now = datetime.utcnow()
+
+    with db.engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CLAIM_LOCK_KEY})
+
+        job_id = connection.execute(
+            select(jobs.c.id).where(jobs.c.status == "QUEUED").order_by(jobs.c.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            return None
+
+        running = select(func.count()).select_from(running_jobs).where(running_jobs.c.status == "RUNNING")
+        claimed = connection.execute(
+            update(jobs)
+            .where(jobs.c.id == job_id, jobs.c.status == "QUEUED", running.scalar_subquery() < max_running)
+            .values(status="RUNNING", worker=worker, started_at=now, heartbeat_at=now)
+        )
+        return job_id if claimed.rowcount else None
+
+
+def fail_stale_jobs(stale_after):
+    """Fail RUNNING jobs whose worker stopped sending heartbeats (killed or restarted process)."""
+    jobs = Job.__table__
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    with db.engine.begin() as connection:
+        return connection.execute(
+            update(jobs)
+            .where(jobs.c.status == "RUNNING", jobs.c.heartbeat_at < cutoff)
+            .values(status="FAILED", error="Worker stopped responding", finished_at=datetime.utcnow())
+        ).rowcount
+
+
+def run_job(job_id, results_dir):
+    job = db.session.get(Job, job_id)
+    name, params = job.job_type, job.params
+    db.session.commit()
+
+    context = JobContext(job_id, results_dir)
+    try:
+        run, _ = JOB_TYPES[name]
+        payload = run(context, params)
+        context.finish(payload)
+    except Exception as e:
+        db.session.rollback()
+        context.discard()
+        logger.exception("Job %s (%s) failed", job_id, name)
+        _update_job(job_id, status="FAILED", error=str(e) or type(e).__name__, finished_at=datetime.utcnow())
+        return False
+    finally:
+        db.session.remove()
+
+    _update_job(
+        job_id, status="SUCCEEDED", progress=100, progress_message=None,
+        result_path=context.result_path, finished_at=datetime.utcnow()
+    )
+    return True
+
+
+class JobRunner:
+    """
+    Worker threads that claim and run jobs, plus a heartbeat thread that keeps
+    this process's RUNNING jobs fresh and fails jobs orphaned by dead workers.
+    """
+
+    def __init__(self, app, workers):
+        self.app = app
+        self.workers = workers
+        self.max_running = app.config.get("JOB_MAX_RUNNING", 2)
+        self.poll_interval = app.config.get("JOB_POLL_INTERVAL", 2)
+        self.stale_after = app.config.get("JOB_STALE_SECONDS", 120)
+        self.results_dir = app.config["JOB_RESULTS_DIR"]
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._running = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{n}", daemon=True)
+            for n in range(self.workers)
+        ]
+        self._threads.append(threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def notify(self):
+        self._wake.set()
+
+    def _work(self):
+        while True:
+            job_id = None
+            try:
+                with self.app.app_context():
+                    job_id = claim_next_job(self.name, self.max_running)
+                    if job_id is not None:
+                        with self._lock:
+                            self._running.add(job_id)
+                        run_job(job_id, self.results_dir)
+            except Exception:
+                logger.exception("Job worker failed")
+            finally:
+                with self._lock:
+                    self._running.discard(job_id)
+
+            if job_id is None:
+                self._wake.wait(timeout=self.poll_interval)
+                self._wake.clear()
+
+    def _heartbeat(self):
+        jobs = Job.__table__
+        while True:
+            time.sleep(self.stale_after / 3)
+            with self._lock:
+                running = list(self._running)
+            try:
+                with self.app.app_context():
+                    if running:
+                        with db.engine.begin() as connection:
+                            connection.execute(
+                                update(jobs).where(jobs.c.id.in_(running)).values(heartbeat_at=datetime.utcnow())
+                            )
+                    fail_stale_jobs(self.stale_after)
+            except Exception:
+                logger.exception("Job heartbeat failed")
+
+
+_runner = None
+
+
+def init_jobs(app):
+    """Start the in-process runner on the first request (so CLI commands never spawn it)."""
+    workers = app.config.get("JOB_WORKERS", 1)
+    if not workers:
+        return
+
+    @app.before_request
+    def _start_job_runner():
+        global _runner
+        if _runner is None:
+            _runner = JobRunner(app, workers)
+            _runner.start()
+
+
+# --- Job types ---
+
+@job_type("products_export")
+def export_products(ctx, params):
+    """CSV of every active product with its stock level and reorder status."""
+    total = db.session.scalar(select(func.count()).select_from(stock_status_query().subquery()))
+    rows = db.session.execute(
+        stock_status_query().order_by(Product.id).execution_options(yield_per=EXPORT_BATCH)
+    )
+
+    with ctx.open_result("csv") as f:
+        writer = csv.writer(f)
+        writer.writerow(rows.keys())
+        for n, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if n % EXPORT_BATCH == 0:
+                ctx.progress(n, total, f"{n} of {total} products")
+
+
+@job_type("movements_export", _date_range_params)
+def export_movements(ctx, params):
+    """CSV of every purchase and transfer line in the date range, oldest first."""
+    start, end = _parse_date_range(params)
+
+    # Lines archived out of closed periods are part of the history too
+    purchases = movement_history(
+        "purchases",
+        lambda header, items: [
+            header.c.purchase_date.label("date"),
+            header.c.id.label("reference_id"),
+            header.c.supplier_id.label("supplier_id"),
+            items.c.product_id.label("product_id"),
+            items.c.quantity.label("quantity"),
+            items.c.unit_cost.label("unit_cost")
+        ],
+        start, end, with_items=True
+    )
+    transfers = movement_history(
+        "stock_transfers",
+        lambda header, items: [
+            header.c.date.label("date"),
+            header.c.transfer_type.label("type"),
+            header.c.id.label("reference_id"),
+            header.c.location_id.label("location_id"),
+            items.c.product_id.label("product_id"),
+            items.c.quantity.label("quantity")
+        ],
+        start, end, with_items=True
+    )
+    suppliers = supplier_names()
+
+    purchase_lines = (
+        select(
+            purchases.c.date,
+            literal("PURCHASE").label("type"),
+            purchases.c.reference_id,
+            purchases.c.product_id,
+            Product.sku,
+            Product.name.label("product_name"),
+            purchases.c.quantity,
+            purchases.c.unit_cost,
+            suppliers.c.name.label("party")
+        )
+        .join(Product, Product.id == purchases.c.product_id)
+        .outerjoin(suppliers, suppliers.c.id == purchases.c.supplier_id)
+    )
+    transfer_lines = (
+        select(
+            transfers.c.date,
+            transfers.c.type,
+            transfers.c.reference_id,
+            transfers.c.product_id,
+            Product.sku,
+            Product.name,
+            transfers.c.quantity,
+            null(),
+            BusinessLocation.name
+        )
+        .join(Product, Product.id == transfers.c.product_id)
+        .outerjoin(BusinessLocation, BusinessLocation.id == transfers.c.location_id)
+    )
+    lines = union_all(purchase_lines, transfer_lines).subquery()
+
+    # Lines of products, suppliers and locations deleted since stay in the export
+    total = db.session.scalar(select(func.count()).select_from(lines).execution_options(include_deleted=True))
+    rows = db.session.execute(
+        select(lines).order_by(lines.c.date, lines.c.reference_id)
+        .execution_options(yield_per=EXPORT_BATCH, include_deleted=True)
+    )
+
+    with ctx.open_result("csv") as f:
+        writer = csv.writer(f)
+        writer.writerow(rows.keys())
+        for n, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if n % EXPORT_BATCH == 0:
+                ctx.progress(n, total, f"{n} of {total} lines")
+
+
+@job_type("inventory_valuation", _as_of_params)
+def inventory_valuation(ctx, params):
+    """The inventory_value_by_category report, for catalogs too large to value in a request."""
+    return inventory_value_report(db.session, _parse_as_of(params))
+
+
+def _abc_params(params):
+    return {"full": bool(params.get("full", False))}
+
+
+@job_type("abc_classification", _abc_params)
+def recompute_abc(ctx, params):
+    refreshed, reclassified = classify_products(full=params["full"])
+    return {"refreshed": refreshed, "reclassified": reclassified}
+
+
+@job_type("rebuild_rollups")
+def rebuild_rollups(ctx, params):
+    ctx.progress(0, 2, "Rebuilding daily movement rollups")
+    rows = rebuild_movement_rollups()
+    ctx.progress(1, 2, "Rebuilding stock balances")
+    balances = rebuild_stock_balances()
+    return {"rollup_rows": rows, "balances": balances}
+
+
+jobs_cli = AppGroup("jobs", help="Background job commands.")
+
+
+@jobs_cli.command("work")
+@click.option("--workers", type=int, default=None, help="Worker threads (default: JOB_WORKERS, at least 1).")
+def work_command(workers):
+    """Run jobs in this process until interrupted (keeps heavy work out of the web workers)."""
+    runner = JobRunner(current_app._get_current_object(), workers or current_app.config.get("JOB_WORKERS") or 1)
+    runner.start()
+    print(f"🔄 Job worker {runner.name} running with {runner.workers} thread(s). Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print("✅ Job worker stopped.")
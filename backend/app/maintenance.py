@@ -0,0 +1,205 @@
+"""
+Hard purge of old soft-deleted rows.
+
+Soft-deleted rows stay around for restores and history; once past the
+retention age they can go for good. `purge` deletes, in batches of one short
+transaction each so no lock is held for long:
+
+- soft-deleted purchases and stock transfers, live or archived as deleted
+  (see archive.py), with their items;
+- then soft-deleted suppliers and products that nothing references any more,
+  with their balance, alert and empty rollup rows.
+
+A row's age is its deleted_at. Rows soft-deleted before that column existed
+have it NULL and fall back to their own date (purchase_date, date, created_at)
+when live, or to archived_at when archived.
+Deleted movements never count towards stock or the rollups, so purging them
+changes no balance. VACUUM and ANALYZE run afterwards to hand the space back
+and refresh planner statistics.
+
+    flask maintenance purge --older-than 365d
+"""
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, delete, exists
+
+from .models import (
+    db, Supplier, Product, Purchase, PurchaseItem, StockTransferItem,
+    DailyMovementRollup, StockBalance, StockAlert, StockAlertEvent, StockBalanceSnapshot,
+    archived_suppliers, archived_products, archived_purchases, archived_purchase_items,
+    archived_stock_transfer_items
+)
+from .archive import BATCH_SIZE, DELETED, MOVEMENTS, _unreferenced
+from .search import reindex_products
+
+AGE_UNITS = {"d": 1, "w": 7, "y": 365}
+
+
+def parse_age(value):
+    """'365d', '8w' or '2y' as a timedelta."""
+    match = re.fullmatch(r"(\d+)([dwy])", value.strip())
+    if not match:
+        raise ValueError(f"'{value}' is not an age like 365d, 8w or 2y")
+    return timedelta(days=int(match[1]) * AGE_UNITS[match[2]])
+
+
+def database_size(connection):
+    """Bytes the database takes on disk, or None for backends we can't measure."""
+    if connection.dialect.name == "sqlite":
+        page_count = connection.exec_driver_sql("PRAGMA page_count").scalar()
+        return page_count * connection.exec_driver_sql("PRAGMA page_size").scalar()
+    if connection.dialect.name == "postgresql":
+        return connection.exec_driver_sql("SELECT pg_database_size(current_database())").scalar()
+    return None
+
+
+def _purge(session, table, criteria, children, batch_size, log, after_batch=None):
+    """Delete the rows of `table` matching `criteria`, children first, committing every batch."""
+    purged = defaultdict(int)
+    while True:
+        ids = session.execute(
+            select(table.c.id).where(*criteria).order_by(table.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        for child, foreign_key in children:
+            purged[child.name] += session.execute(delete(child).where(child.c[foreign_key].in_(ids))).rowcount
+        purged[table.name] += session.execute(delete(table).where(table.c.id.in_(ids))).rowcount
+        if after_batch is not None:
+            after_batch(ids)
+        session.commit()
+        log(f"   {table.name}: {purged[table.name]} purged")
+    return purged
+
+
+def _deleted_before(table, cutoff, fallback):
+    """Deleted before `cutoff` by deleted_at, or by `fallback` for rows deleted before deleted_at existed."""
+    return (table.c.deleted_at < cutoff) | (table.c.deleted_at.is_(None) & fallback)
+
+
+def _candidates(cutoff):
+    """(table, criteria, children) to purge, in order: movements before the parties they reference."""
+    candidates = []
+    for header, archive, items, item_archive, foreign_key, date_column in MOVEMENTS.values():
+        candidates.append((
+            header, [header.c.is_deleted == True, _deleted_before(header, cutoff, header.c[date_column] < cutoff)],
+            [(items, foreign_key)]
+        ))
+        candidates.append((
+            archive,
+            [archive.c.archive_reason == DELETED, _deleted_before(archive, cutoff, archive.c.archived_at < cutoff)],
+            [(item_archive, foreign_key)]
+        ))
+
+    # Rows from before created_at existed are older than any cutoff
+    def older(table):
+        return _deleted_before(table, cutoff, (table.c.created_at < cutoff) | table.c.created_at.is_(None))
+
+    suppliers, products = Supplier.__table__, Product.__table__
+    supplier_references = (Purchase.__table__.c.supplier_id, archived_purchases.c.supplier_id)
+    product_references = (
+        PurchaseItem.__table__.c.product_id, StockTransferItem.__table__.c.product_id,
+        archived_purchase_items.c.product_id, archived_stock_transfer_items.c.product_id
+    )
+    candidates.append((
+        suppliers, [suppliers.c.is_deleted == True, older(suppliers), *_unreferenced(suppliers, *supplier_references)],
+        []
+    ))
+    candidates.append((
+        archived_suppliers,
+        [archived_suppliers.c.archive_reason == DELETED,
+         _deleted_before(archived_suppliers, cutoff, archived_suppliers.c.archived_at < cutoff),
+         *_unreferenced(archived_suppliers, *supplier_references)],
+        []
+    ))
+    candidates.append((
+        products,
+        [products.c.is_deleted == True, older(products),
+         *_unreferenced(products, *product_references, StockBalanceSnapshot.__table__.c.product_id),
+         ~exists().where(StockBalance.product_id == products.c.id, StockBalance.quantity != 0),
+         ~exists().where(DailyMovementRollup.product_id == products.c.id, DailyMovementRollup.quantity != 0)],
+        [(StockBalance.__table__, "product_id"), (StockAlert.__table__, "product_id"),
+         (StockAlertEvent.__table__, "product_id"), (DailyMovementRollup.__table__, "product_id")]
+    ))
+    candidates.append((
+        archived_products,
+        [archived_products.c.archive_reason == DELETED,
+         _deleted_before(archived_products, cutoff, archived_products.c.archived_at < cutoff),
+         *_unreferenced(archived_products, *product_references)],
+        []
+    ))
+    return candidates
+
+
+def vacuum(tables):
+    """
+    VACUUM (outside a transaction, as it must run) to hand the space of deleted
+    rows back, then ANALYZE to refresh planner statistics. Returns the database
+    size in between, so the statistics ANALYZE writes don't count against the
+    space reclaimed.
+    """
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if connection.dialect.name == "postgresql":
+            statements = [(f'VACUUM "{table}"', f'ANALYZE "{table}"') for table in tables]
+        else:
+            statements = [("VACUUM", "ANALYZE")]
+        for vacuum_statement, _ in statements:
+            connection.exec_driver_sql(vacuum_statement)
+        size = database_size(connection)
+        for _, analyze_statement in statements:
+            connection.exec_driver_sql(analyze_statement)
+    return size
+
+
+def purge(older_than, batch_size=BATCH_SIZE, run_vacuum=True, log=print):
+    """
+    Hard-delete soft-deleted rows older than `older_than` (a timedelta) and
+    their children. Returns the rows purged per table and the bytes reclaimed
+    (None when the backend can't be measured).
+    """
+    session = db.session
+    cutoff = datetime.utcnow() - older_than
+    size_before = database_size(session.connection())
+    session.commit()
+
+    purged = defaultdict(int)
+    for table, criteria, children in _candidates(cutoff):
+        # Purged products drop out of the search index
+        after_batch = (lambda ids: reindex_products(session.connection(), ids)) if table is Product.__table__ else None
+        for name, count in _purge(session, table, criteria, children, batch_size, log, after_batch).items():
+            purged[name] += count
+
+    if run_vacuum:
+        size_after = vacuum([name for name, count in purged.items() if count])
+    else:
+        with db.engine.connect() as connection:
+            size_after = database_size(connection)
+    reclaimed = size_before - size_after if size_before is not None and size_after is not None else None
+    return {name: count for name, count in purged.items() if count}, reclaimed
+
+
+maintenance_cli = AppGroup("maintenance", help="Database housekeeping.")
+
+
+@maintenance_cli.command("purge")
+@click.option("--older-than", required=True, help="Retention age, e.g. 365d, 8w or 2y.")
+@click.option("--batch-size", type=int, default=BATCH_SIZE, show_default=True)
+@click.option("--no-vacuum", is_flag=True, help="Skip VACUUM/ANALYZE afterwards.")
+def purge_command(older_than, batch_size, no_vacuum):
+    """Hard-delete soft-deleted rows (and their children) older than --older-than."""
+    try:
+        age = parse_age(older_than)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--older-than")
+    purged, reclaimed = purge(age, batch_size, run_vacuum=not no_vacuum)
+    for name, count in sorted(purged.items()):
+        print(f"🗑️ {name}: {count} rows purged")
+    if not purged:
+        print("ℹ️ Nothing old enough to purge.")
+    if reclaimed is not None:
+        print(f"💾 {reclaimed:,} bytes reclaimed.")
+    print("✅ Purge complete.")
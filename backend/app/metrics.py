@@ -0,0 +1,166 @@
+"""
+Prometheus metrics at /metrics.
+
+Request counts and latency per blueprint and route, in-flight requests, SQL
+statements per route, connection pool usage and cache hit/miss counts (the
+SQLAlchemy compiled-statement cache and the autocomplete index).
+
+Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR (set
+up by gunicorn.conf.py) and /metrics merges them, so a scrape sees the totals of
+all workers whichever one answers it. Without that variable (flask run, a single
+uvicorn process) the in-process registry is served.
+"""
+import contextvars
+import os
+import time
+
+from flask import Response, request
+from prometheus_client import (
+    REGISTRY, CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.pool import Pool
+
+from .models import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "(unmatched)"
+BACKGROUND_ROUTE = "(background)"  # alert evaluator, job runner, CLI
+
+REQUESTS = Counter(
+    "http_requests", "HTTP requests handled", ["blueprint", "route", "method", "status"]
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["blueprint", "route", "method"],
+    buckets=LATENCY_BUCKETS
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", multiprocess_mode="livesum"
+)
+SQL_STATEMENTS = Counter(
+    "db_statements", "SQL statements executed", ["blueprint", "route"]
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections", "Connections checked out of the pool", multiprocess_mode="livesum"
+)
+POOL_SIZE = Gauge(
+    "db_pool_size", "Configured pool size, excluding overflow", multiprocess_mode="livesum"
+)
+CACHE = Counter(
+    "cache_requests", "Cache lookups", ["cache", "result"]
+)
+
+_BACKGROUND_STATEMENTS = SQL_STATEMENTS.labels("", BACKGROUND_ROUTE)
+_SQL_CACHE_HIT = CACHE.labels("sql_compiled", "hit")
+_SQL_CACHE_MISS = CACHE.labels("sql_compiled", "miss")
+
+_statements = contextvars.ContextVar("request_statements", default=None)
+_listeners_installed = False
+
+
+def record_cache(cache, hit):
+    CACHE.labels(cache, "hit" if hit else "miss").inc()
+
+
+def begin_request():
+    """Start tracking a request; pass the result to end_request()."""
+    IN_PROGRESS.inc()
+    return time.perf_counter(), _statements.set([0])
+
+
+def end_request(state, blueprint, route, method, status):
+    started, token = state
+    statements = _statements.get()[0]
+    _statements.reset(token)
+    IN_PROGRESS.dec()
+
+    REQUESTS.labels(blueprint, route, method, status).inc()
+    LATENCY.labels(blueprint, route, method).observe(time.perf_counter() - started)
+    if statements:
+        SQL_STATEMENTS.labels(blueprint, route).inc(statements)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+    else:
+        _BACKGROUND_STATEMENTS.inc()
+
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is CACHE_HIT:
+        _SQL_CACHE_HIT.inc()
+    elif cache_hit is CACHE_MISS:
+        _SQL_CACHE_MISS.inc()
+
+
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    POOL_CHECKED_OUT.inc()
+
+
+def _checkin(dbapi_connection, connection_record):
+    POOL_CHECKED_OUT.dec()
+
+
+def install_listeners():
+    """Count statements and pool checkouts on every engine (sync, async and replica) once per process."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    _listeners_installed = True
+
+    event.listen(Engine, "after_cursor_execute", _count_statement)
+    event.listen(Pool, "checkout", _checkout)
+    event.listen(Pool, "checkin", _checkin)
+
+
+def metrics_view():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def route_labels(url_rule, endpoint):
+    """(blueprint, route) labels; the route is the URL rule, so /purchases/7 counts as /purchases/<int:id>."""
+    if url_rule is None:
+        return "", UNMATCHED_ROUTE
+    blueprint = endpoint.rsplit(".", 1)[0] if "." in endpoint else ""
+    return blueprint, url_rule.rule
+
+
+def init_metrics(app):
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    install_listeners()
+
+    with app.app_context():
+        POOL_SIZE.set(sum(
+            engine.pool.size() for engine in db.engines.values() if hasattr(engine.pool, "size")
+        ))
+
+    app.add_url_rule("/metrics", "metrics", metrics_view)
+
+    @app.before_request
+    def _begin_metrics():
+        request.environ["app.metrics"] = begin_request()
+
+    @app.after_request
+    def _record_metrics(response):
+        state = request.environ.pop("app.metrics", None)
+        if state is not None:
+            blueprint, route = route_labels(request.url_rule, request.endpoint)
+            end_request(state, blueprint, route, request.method, response.status_code)
+        return response
+
+    @app.teardown_request
+    def _abandon_metrics(exc):
+        # after_request is skipped when a response could not be produced at all
+        state = request.environ.pop("app.metrics", None)
+        if state is not None:
+            blueprint, route = route_labels(request.url_rule, request.endpoint)
+            end_request(state, blueprint, route, request.method, 500)
@@ -1,11 +1,17 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy_serializer import SerializerMixin
-from sqlalchemy.orm import relationship
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import (
+    MANYTOONE, Session, relationship, joinedload, selectinload, configure_mappers, with_loader_criteria
+)
 from datetime import datetime
 from sqlalchemy.ext.hybrid import hybrid_property
 from zoneinfo import ZoneInfo
 
-db = SQLAlchemy()
+from .replica import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 EAT = ZoneInfo("Africa/Nairobi")
 
 
@@ -17,6 +23,10 @@ class Category(db.Model, SerializerMixin):
     description = db.Column(db.Text)
     is_deleted = db.Column(db.Boolean, default=False)
 
+    # Reorder defaults for products that don't set their own
+    default_reorder_point = db.Column(db.Integer)
+    default_reorder_quantity = db.Column(db.Integer)
+
     products = db.relationship(
         "Product", backref="category", cascade="all, delete-orphan")
 
@@ -27,6 +37,8 @@ class Category(db.Model, SerializerMixin):
             "id": self.id,
             "name": self.name,
             "description": self.description,
+            "default_reorder_point": self.default_reorder_point,
+            "default_reorder_quantity": self.default_reorder_quantity,
             "is_deleted": self.is_deleted,
         }
 
@@ -42,6 +54,8 @@ class Supplier(db.Model, SerializerMixin):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     is_deleted = db.Column(db.Boolean, default=False)
+    # Set when is_deleted is; NULL on rows soft-deleted before this column existed
+    deleted_at = db.Column(db.DateTime)
 
     serialize_rules = ("-purchases",)
 
@@ -56,6 +70,15 @@ class Product(db.Model, SerializerMixin):
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_deleted = db.Column(db.Boolean, default=False)
+    deleted_at = db.Column(db.DateTime)
+
+    # Per-product reorder thresholds; NULL falls back to the category default
+    reorder_point = db.Column(db.Integer)
+    reorder_quantity = db.Column(db.Integer)
+
+    # ABC class by annual consumption value; products with new movements are queued in abc_stale_products
+    abc_class = db.Column(db.String(1), index=True)
+    annual_consumption_value = db.Column(db.Float)
 
     category_id = db.Column(
         db.Integer,
@@ -67,6 +90,7 @@ class Product(db.Model, SerializerMixin):
         "PurchaseItem", backref="product", cascade="all, delete-orphan")
     stock_transfer_items = db.relationship(
         "StockTransferItem", backref="product", cascade="all, delete-orphan")
+    balance_snapshot = db.relationship("StockBalanceSnapshot", uselist=False, viewonly=True)
 
     serialize_rules = (
         '-category.products',
@@ -76,6 +100,8 @@ class Product(db.Model, SerializerMixin):
 
     @hybrid_property
     def stock_level(self):
+        # Items of soft-deleted purchases and transfers usually load without their header (see
+        # exclude_soft_deleted), but a header already in the identity map skips the criteria
         total_purchased = sum(
             item.quantity for item in self.purchase_items
             if item.purchase and not item.purchase.is_deleted
@@ -93,7 +119,9 @@ class Product(db.Model, SerializerMixin):
             and item.stock_transfer.transfer_type == "OUT"
         )
 
-        return total_purchased + total_in - total_out
+        carried_forward = self.balance_snapshot.quantity if self.balance_snapshot else 0
+
+        return carried_forward + total_purchased + total_in - total_out
 
     def to_dict(self):
         return {
@@ -105,6 +133,9 @@ class Product(db.Model, SerializerMixin):
             "category_id": self.category_id,
             "category": self.category.to_dict() if self.category else None,
             "stock_level": self.stock_level,
+            "reorder_point": self.reorder_point,
+            "reorder_quantity": self.reorder_quantity,
+            "abc_class": self.abc_class,
             "is_deleted": self.is_deleted,
         }
 
@@ -124,6 +155,7 @@ class Purchase(db.Model, SerializerMixin):
     notes = db.Column(db.Text)
 
     is_deleted = db.Column(db.Boolean, default=False)
+    deleted_at = db.Column(db.DateTime)
 
     supplier = relationship("Supplier", backref="purchases")
 
@@ -157,12 +189,14 @@ class PurchaseItem(db.Model, SerializerMixin):
     purchase_id = db.Column(
         db.Integer,
         db.ForeignKey("purchases.id", name="fk_purchase_items_purchase_id"),
-        nullable=False
+        nullable=False,
+        index=True
     )
     product_id = db.Column(
         db.Integer,
         db.ForeignKey("products.id", name="fk_purchase_items_product_id"),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     quantity = db.Column(db.Integer, nullable=False, default=1)
@@ -235,6 +269,7 @@ class StockTransfer(db.Model, SerializerMixin):
 
     notes = db.Column(db.Text)
     is_deleted = db.Column(db.Boolean, default=False)
+    deleted_at = db.Column(db.DateTime)
 
     items = db.relationship(
         "StockTransferItem",
@@ -267,13 +302,15 @@ class StockTransferItem(db.Model, SerializerMixin):
         db.Integer,
         db.ForeignKey("stock_transfers.id",
                       name="fk_stock_transfer_items_transfer_id", ondelete="CASCADE"),
-        nullable=False
+        nullable=False,
+        index=True
     )
     product_id = db.Column(
         db.Integer,
         db.ForeignKey(
             "products.id", name="fk_stock_transfer_items_product_id"),
-        nullable=False
+        nullable=False,
+        index=True
     )
     quantity = db.Column(db.Integer, nullable=False, default=0)
 
@@ -290,3 +327,272 @@ class StockTransferItem(db.Model, SerializerMixin):
             "quantity": self.quantity,
             "product": self.product.to_dict() if self.product else None
         }
+
+
+class DailyMovementRollup(db.Model):
+    __tablename__ = "daily_movement_rollups"
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    product_id = db.Column(
+        db.Integer,
+        db.ForeignKey("products.id", name="fk_daily_movement_rollups_product_id"),
+        nullable=False
+    )
+    # Purchases have no location, so their rows carry NULL here
+    location_id = db.Column(
+        db.Integer,
+        db.ForeignKey("business_locations.id", name="fk_daily_movement_rollups_location_id"),
+        nullable=True
+    )
+    movement_type = db.Column(db.String(10), nullable=False)  # PURCHASE, IN or OUT
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    value = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        # NULLs never collide in a plain unique key, so the purchase rows' NULL location is
+        # folded to 0 here; the flush listener's ON CONFLICT targets this same expression
+        db.Index(
+            "uq_daily_movement_rollups_key",
+            "day", "product_id", db.func.coalesce(location_id, 0), "movement_type",
+            unique=True
+        ),
+        db.Index("ix_daily_movement_rollups_day_type", "day", "movement_type"),
+    )
+
+    def to_dict(self):
+        return {
+            "day": self.day.isoformat(),
+            "product_id": self.product_id,
+            "location_id": self.location_id,
+            "movement_type": self.movement_type,
+            "quantity": self.quantity,
+            "value": round(self.value, 2),
+        }
+
+
+class StockBalance(db.Model):
+    __tablename__ = "stock_balances"
+
+    # Materialized on-hand quantity, kept in step with movements on every flush
+    product_id = db.Column(
+        db.Integer,
+        db.ForeignKey("products.id", name="fk_stock_balances_product_id"),
+        primary_key=True
+    )
+    quantity = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+
+class StockBalanceSnapshot(db.Model):
+    __tablename__ = "stock_balance_snapshots"
+
+    # Net quantity of the live movements archived out of closed periods (see app/archive.py),
+    # carried forward so balances recomputed from the hot movement tables stay correct
+    product_id = db.Column(
+        db.Integer,
+        db.ForeignKey("products.id", name="fk_stock_balance_snapshots_product_id"),
+        primary_key=True
+    )
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    # Latest archived purchase cost and that purchase's date, for valuing stock once no newer hot purchase is left
+    unit_cost = db.Column(db.Float)
+    unit_cost_date = db.Column(db.DateTime)
+    archived_through = db.Column(db.Date, nullable=False)
+
+
+def _archive_table(model, *indexes):
+    """Same columns as `model`'s table, without its constraints, plus when and why each row was archived."""
+    columns = [
+        db.Column(c.name, c.type, primary_key=c.primary_key, autoincrement=False, nullable=c.nullable)
+        for c in model.__table__.columns
+    ]
+    return db.Table(
+        f"archived_{model.__tablename__}", *columns,
+        db.Column("archived_at", db.DateTime, nullable=False, default=datetime.utcnow),
+        db.Column("archive_reason", db.String(10), nullable=False),  # DELETED or CLOSED
+        *(db.Index(f"ix_archived_{model.__tablename__}_{column}", column) for column in indexes)
+    )
+
+
+archived_suppliers = _archive_table(Supplier)
+archived_products = _archive_table(Product)
+archived_purchases = _archive_table(Purchase, "purchase_date")
+archived_purchase_items = _archive_table(PurchaseItem, "purchase_id", "product_id")
+archived_stock_transfers = _archive_table(StockTransfer, "date")
+archived_stock_transfer_items = _archive_table(StockTransferItem, "stock_transfer_id", "product_id")
+
+
+class StockAlert(db.Model):
+    __tablename__ = "stock_alerts"
+
+    # Current alert state per product, written by the alert evaluator
+    product_id = db.Column(
+        db.Integer,
+        db.ForeignKey("products.id", name="fk_stock_alerts_product_id"),
+        primary_key=True
+    )
+    status = db.Column(db.String(10), nullable=False, default="OK", index=True)  # OK, LOW or OUT
+    stock_level = db.Column(db.Integer, nullable=False, default=0)
+    reorder_point = db.Column(db.Integer, nullable=False, default=0)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    product = db.relationship("Product")
+
+
+class StockAlertEvent(db.Model):
+    __tablename__ = "stock_alert_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(
+        db.Integer,
+        db.ForeignKey("products.id", name="fk_stock_alert_events_product_id"),
+        nullable=False,
+        index=True
+    )
+    from_status = db.Column(db.String(10), nullable=False)
+    to_status = db.Column(db.String(10), nullable=False)
+    stock_level = db.Column(db.Integer, nullable=False)
+    reorder_point = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    product = db.relationship("Product")
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "product_id": self.product_id,
+            "product_name": self.product.name if self.product else None,
+            "from_status": self.from_status,
+            "to_status": self.to_status,
+            "stock_level": self.stock_level,
+            "reorder_point": self.reorder_point,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class AbcStaleProduct(db.Model):
+    __tablename__ = "abc_stale_products"
+
+    # Products moved since their last ABC classification, queued by the movement listener so
+    # flushes never update `products`. No foreign key: ids of products archived or purged
+    # meanwhile are simply dropped by the next run.
+    product_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+
+class Job(db.Model):
+    """A queued background job (export, report, recompute); see app/jobs.py."""
+    __tablename__ = "jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(10), nullable=False, default="QUEUED", index=True)  # QUEUED, RUNNING, SUCCEEDED, FAILED
+    progress = db.Column(db.Integer, nullable=False, default=0)  # percent
+    progress_message = db.Column(db.String(255))
+    result_path = db.Column(db.String(500))
+    error = db.Column(db.Text)
+    worker = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "type": self.job_type,
+            "params": self.params,
+            "status": self.status,
+            "progress": self.progress,
+            "progress_message": self.progress_message,
+            "result_url": f"/jobs/{self.id}/result" if self.status == "SUCCEEDED" and self.result_path else None,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+# Soft-deleted rows are left out of every ORM query run on a session (Model.query, session.get,
+# select(...) through session.execute, relationship loads) unless the statement opts out with
+# .execution_options(include_deleted=True). Core statements on tables and raw SQL are not filtered.
+INCLUDE_DELETED = "include_deleted"
+
+# An item of a deleted purchase or transfer loads without its header
+DOCUMENT_CRITERIA = tuple(
+    with_loader_criteria(model, model.is_deleted == False, include_aliases=True)
+    for model in (Purchase, StockTransfer)
+)
+# Master data is left out of queries and collections, but rows that still reference a deleted
+# category, supplier, product or location (purchase history, transfer items) keep loading it
+MASTER_DATA_CRITERIA = tuple(
+    with_loader_criteria(model, model.is_deleted == False, include_aliases=True, propagate_to_loaders=False)
+    for model in (Category, Supplier, Product, BusinessLocation)
+)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def exclude_soft_deleted(execute_state):
+    # Refreshing a row already in the session (expired attributes) must find it even if it was just deleted
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.execution_options.get(INCLUDE_DELETED, False)
+    ):
+        return
+    if execute_state.is_relationship_load:
+        # Document criteria propagate from the query that loaded the parent
+        if execute_state.loader_strategy_path[-1].direction is MANYTOONE:
+            return
+        criteria = MASTER_DATA_CRITERIA
+    else:
+        criteria = DOCUMENT_CRITERIA + MASTER_DATA_CRITERIA
+    execute_state.statement = execute_state.statement.options(*criteria)
+
+
+def _live_index(attribute):
+    """Partial index over the live rows only, so the soft-delete criterion above is answered by the index."""
+    live = attribute.class_.is_deleted == False
+    table = attribute.class_.__tablename__
+    return db.Index(f"ix_{table}_live_{attribute.key}", attribute, sqlite_where=live, postgresql_where=live)
+
+
+_live_index(Product.category_id)
+_live_index(Purchase.purchase_date)
+_live_index(Purchase.supplier_id)
+_live_index(StockTransfer.date)
+_live_index(StockTransfer.location_id)
+
+
+def insert_on_conflict(session, table):
+    """INSERT into `table` supporting ON CONFLICT (`on_conflict_do_nothing/_do_update`) on SQLite and Postgres."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def to_dict_loader_options(model):
+    """
+    Eager-load options covering every relationship `model.to_dict()` reads, so
+    serializing a list costs a fixed number of queries instead of lazy loads per row.
+    """
+    configure_mappers()  # backrefs such as Product.category exist only once mappers are configured
+    product = (
+        joinedload(Product.category),
+        joinedload(Product.balance_snapshot),
+        selectinload(Product.purchase_items).joinedload(PurchaseItem.purchase),
+        selectinload(Product.stock_transfer_items).joinedload(StockTransferItem.stock_transfer),
+    )
+    if model is Product:
+        return product
+    if model is Purchase:
+        return (
+            joinedload(Purchase.supplier),
+            selectinload(Purchase.items).joinedload(PurchaseItem.product).options(*product),
+        )
+    if model is StockTransfer:
+        return (
+            joinedload(StockTransfer.location),
+            selectinload(StockTransfer.items).joinedload(StockTransferItem.product).options(*product),
+        )
+    return ()
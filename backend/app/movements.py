@@ -0,0 +1,354 @@
+"""
+Incremental maintenance of the daily movement rollups and stock balances.
+
+Every flush that touches purchases, stock transfers or their items is turned
+into quantity/value deltas keyed by (day, product, location, movement type) and
+applied to `daily_movement_rollups` and `stock_balances` in the same
+transaction, so reports and stock lookups never need to scan the movement
+history.
+
+Transfers are valued at the purchase cost as of their date, so a purchase that
+is added, edited, re-dated or deleted re-prices the later transfers of its
+products: their rollup values are recomputed from that purchase's day on, and
+stay equal to what `rebuild_movement_rollups` would give.
+"""
+from collections import defaultdict
+from datetime import datetime, time
+
+from sqlalchemy import event, inspect, func, select, insert, update, literal, literal_column, null, delete, case
+
+from .models import (
+    db, DailyMovementRollup, Purchase, PurchaseItem,
+    StockTransfer, StockTransferItem, StockBalance, StockBalanceSnapshot, INCLUDE_DELETED, insert_on_conflict
+)
+from .classification import mark_stale
+from .archive import archive_horizon
+
+# Header columns that change how a header's items are counted
+PURCHASE_FIELDS = ("is_deleted", "purchase_date")
+TRANSFER_FIELDS = ("is_deleted", "date", "location_id", "transfer_type")
+PURCHASE_ITEM_FIELDS = ("purchase_id", "product_id", "quantity", "unit_cost")
+TRANSFER_ITEM_FIELDS = ("stock_transfer_id", "product_id", "quantity")
+
+# Headers are looked up whether deleted or not; their old and new is_deleted decide what counts
+WITH_DELETED = {INCLUDE_DELETED: True}
+
+# Conflict target of the rollups' unique index, which counts the purchases' NULL location as 0
+_rollups = DailyMovementRollup.__table__
+ROLLUP_KEY = [
+    _rollups.c.day, _rollups.c.product_id,
+    func.coalesce(_rollups.c.location_id, literal_column("0")), _rollups.c.movement_type
+]
+
+
+def _value(obj, key, old):
+    """Current value of an attribute, or the value it had before this flush when `old` is set."""
+    if old:
+        history = inspect(obj).attrs[key].history
+        if history.deleted:
+            return history.deleted[0]
+    return getattr(obj, key)
+
+
+def _changed(obj, fields):
+    state = inspect(obj)
+    return any(state.attrs[f].history.has_changes() for f in fields)
+
+
+class _RollupDeltas:
+    def __init__(self, session):
+        self.session = session
+        self.deltas = defaultdict(lambda: [0, 0.0])
+        self.repriced = {}  # product_id -> earliest purchase date changed
+        self._unit_costs = {}
+
+    def add(self, key, quantity, value, sign):
+        delta = self.deltas[key]
+        delta[0] += sign * quantity
+        delta[1] += sign * value
+
+    def unit_cost_as_of(self, product_id, when):
+        """
+        Latest non-deleted purchase unit cost on or before `when`, used to value transfers;
+        the archived cost carried in `stock_balance_snapshots` counts when it is the latest.
+        """
+        cache_key = (product_id, when)
+        if cache_key not in self._unit_costs:
+            candidates = [
+                self.session.execute(
+                    select(Purchase.purchase_date, PurchaseItem.unit_cost)
+                    .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+                    .where(
+                        PurchaseItem.product_id == product_id,
+                        Purchase.is_deleted == False,
+                        Purchase.purchase_date <= when
+                    )
+                    .order_by(Purchase.purchase_date.desc(), PurchaseItem.id.desc())
+                    .limit(1)
+                ).first(),
+                self.session.execute(
+                    select(StockBalanceSnapshot.unit_cost_date, StockBalanceSnapshot.unit_cost)
+                    .where(StockBalanceSnapshot.product_id == product_id, StockBalanceSnapshot.unit_cost_date <= when)
+                ).first(),
+            ]
+            latest = max((c for c in candidates if c is not None), default=None, key=lambda c: c[0])
+            self._unit_costs[cache_key] = (latest[1] if latest else None) or 0.0
+        return self._unit_costs[cache_key]
+
+    def purchase_item(self, item, sign, old_item=False, old_header=False):
+        purchase = self.session.get(Purchase, _value(item, "purchase_id", old_item), execution_options=WITH_DELETED)
+        if purchase is None or _value(purchase, "is_deleted", old_header):
+            return
+        purchase_date = _value(purchase, "purchase_date", old_header)
+        quantity = _value(item, "quantity", old_item) or 0
+        unit_cost = _value(item, "unit_cost", old_item) or 0.0
+        product_id = _value(item, "product_id", old_item)
+        self.add((purchase_date.date(), product_id, None, "PURCHASE"), quantity, quantity * unit_cost, sign)
+        if product_id not in self.repriced or purchase_date < self.repriced[product_id]:
+            self.repriced[product_id] = purchase_date
+
+    def transfer_item(self, item, sign, old_item=False, old_header=False):
+        transfer = self.session.get(
+            StockTransfer, _value(item, "stock_transfer_id", old_item), execution_options=WITH_DELETED
+        )
+        if transfer is None or _value(transfer, "is_deleted", old_header):
+            return
+        transfer_date = _value(transfer, "date", old_header)
+        product_id = _value(item, "product_id", old_item)
+        quantity = _value(item, "quantity", old_item) or 0
+        key = (
+            transfer_date.date(),
+            product_id,
+            _value(transfer, "location_id", old_header),
+            _value(transfer, "transfer_type", old_header),
+        )
+        self.add(key, quantity, quantity * self.unit_cost_as_of(product_id, transfer_date), sign)
+
+    def balance_deltas(self):
+        balances = defaultdict(int)
+        for (_day, product_id, _location_id, movement_type), (quantity, _value) in self.deltas.items():
+            balances[product_id] += -quantity if movement_type == "OUT" else quantity
+        return {product_id: quantity for product_id, quantity in balances.items() if quantity}
+
+    def apply_balances(self, connection):
+        table = StockBalance.__table__
+        for product_id, quantity in self.balance_deltas().items():
+            stmt = insert_on_conflict(self.session, table).values(product_id=product_id, quantity=quantity)
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.product_id],
+                set_={"quantity": table.c.quantity + stmt.excluded.quantity}
+            ))
+
+    def apply(self, connection):
+        # One upsert per key, so two flushes adding to the same new day never race to insert it
+        table = DailyMovementRollup.__table__
+        for (day, product_id, location_id, movement_type), (quantity, value) in self.deltas.items():
+            if quantity == 0 and value == 0:
+                continue
+
+            stmt = insert_on_conflict(self.session, table).values(
+                day=day,
+                product_id=product_id,
+                location_id=location_id,
+                movement_type=movement_type,
+                quantity=quantity,
+                value=value
+            )
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=ROLLUP_KEY,
+                set_={"quantity": table.c.quantity + stmt.excluded.quantity, "value": table.c.value + stmt.excluded.value}
+            ))
+
+    def revalue_transfers(self, connection):
+        """Recompute the transfer rollup values of re-priced products, from the earliest changed purchase's day on."""
+        table = DailyMovementRollup.__table__
+        horizon = archive_horizon(self.session)
+        columns = ["day", "product_id", "location_id", "movement_type", "quantity", "value"]
+        for product_id, since in self.repriced.items():
+            # Rollups before the archive horizon are frozen (see rebuild_movement_rollups)
+            first_day = max(since.date(), horizon) if horizon else since.date()
+            connection.execute(
+                update(table)
+                .where(
+                    table.c.product_id == product_id,
+                    table.c.movement_type.in_(("IN", "OUT")),
+                    table.c.day >= first_day
+                )
+                .values(value=0.0)
+            )
+            rows = connection.execute(transfer_rollups(horizon, [
+                StockTransferItem.product_id == product_id,
+                StockTransfer.date >= datetime.combine(first_day, time.min)
+            ])).all()
+            if rows:
+                stmt = insert_on_conflict(self.session, table)
+                connection.execute(
+                    stmt.on_conflict_do_update(index_elements=ROLLUP_KEY, set_={"value": stmt.excluded.value}),
+                    [dict(zip(columns, row)) for row in rows]
+                )
+
+
+@event.listens_for(db.session, "after_flush")
+def record_movements(session, flush_context):
+    rollups = _RollupDeltas(session)
+    touched_items = set()
+
+    for obj in session.new:
+        if isinstance(obj, PurchaseItem):
+            rollups.purchase_item(obj, +1)
+        elif isinstance(obj, StockTransferItem):
+            rollups.transfer_item(obj, +1)
+        touched_items.add(obj)
+
+    for obj in session.deleted:
+        if isinstance(obj, PurchaseItem):
+            rollups.purchase_item(obj, -1, old_item=True, old_header=True)
+        elif isinstance(obj, StockTransferItem):
+            rollups.transfer_item(obj, -1, old_item=True, old_header=True)
+        touched_items.add(obj)
+
+    for obj in session.dirty:
+        if isinstance(obj, PurchaseItem) and _changed(obj, PURCHASE_ITEM_FIELDS):
+            rollups.purchase_item(obj, -1, old_item=True, old_header=True)
+            rollups.purchase_item(obj, +1)
+            touched_items.add(obj)
+        elif isinstance(obj, StockTransferItem) and _changed(obj, TRANSFER_ITEM_FIELDS):
+            rollups.transfer_item(obj, -1, old_item=True, old_header=True)
+            rollups.transfer_item(obj, +1)
+            touched_items.add(obj)
+
+    # Header changes (soft deletes, re-dating, re-typing) move every untouched item
+    for obj in session.dirty:
+        if isinstance(obj, Purchase) and _changed(obj, PURCHASE_FIELDS):
+            items = session.query(PurchaseItem).filter(PurchaseItem.purchase_id == obj.id).all()
+            for item in items:
+                if item not in touched_items:
+                    rollups.purchase_item(item, -1, old_header=True)
+                    rollups.purchase_item(item, +1)
+        elif isinstance(obj, StockTransfer) and _changed(obj, TRANSFER_FIELDS):
+            items = session.query(StockTransferItem).filter(StockTransferItem.stock_transfer_id == obj.id).all()
+            for item in items:
+                if item not in touched_items:
+                    rollups.transfer_item(item, -1, old_header=True)
+                    rollups.transfer_item(item, +1)
+
+    if rollups.deltas:
+        connection = session.connection()
+        rollups.apply(connection)
+        rollups.revalue_transfers(connection)
+        rollups.apply_balances(connection)
+        mark_stale(session, {product_id for (_day, product_id, _loc, _type) in rollups.deltas})
+
+        # Picked up after commit by the stock alert evaluator
+        changed = session.info.setdefault("stock_changed_products", set())
+        changed.update(rollups.balance_deltas())
+
+
+def transfer_rollups(horizon, criteria):
+    """
+    Rollup rows (day, product_id, location_id, movement_type, quantity, value) of
+    the live transfers matching `criteria`, each valued like `unit_cost_as_of`:
+    at the latest purchase cost as of the transfer date, or the archived cost
+    when that is newer.
+    """
+    costing_purchase = db.aliased(Purchase)
+    costing_item = db.aliased(PurchaseItem)
+
+    def latest_costing(column):
+        return (
+            select(column)
+            .select_from(costing_item)
+            .join(costing_purchase, costing_purchase.id == costing_item.purchase_id)
+            .where(
+                costing_item.product_id == StockTransferItem.product_id,
+                costing_purchase.is_deleted == False,
+                costing_purchase.purchase_date <= StockTransfer.date
+            )
+            .order_by(costing_purchase.purchase_date.desc(), costing_item.id.desc())
+            .limit(1)
+            .correlate(StockTransferItem, StockTransfer)
+            .scalar_subquery()
+        )
+
+    unit_cost = latest_costing(costing_item.unit_cost)
+    if horizon:
+        # The archived cost counts when it is newer than the latest hot purchase as of the transfer
+        hot_date = latest_costing(costing_purchase.purchase_date)
+        archived_is_latest = (StockBalanceSnapshot.unit_cost_date <= StockTransfer.date) & (
+            hot_date.is_(None) | (hot_date < StockBalanceSnapshot.unit_cost_date)
+        )
+        unit_cost = case((archived_is_latest, StockBalanceSnapshot.unit_cost), else_=unit_cost)
+
+    day = func.date(StockTransfer.date, type_=db.Date)
+    return (
+        select(
+            day,
+            StockTransferItem.product_id,
+            StockTransfer.location_id,
+            StockTransfer.transfer_type,
+            func.sum(StockTransferItem.quantity),
+            func.sum(StockTransferItem.quantity * func.coalesce(unit_cost, 0.0))
+        )
+        .join(StockTransfer, StockTransfer.id == StockTransferItem.stock_transfer_id)
+        .outerjoin(StockBalanceSnapshot, StockBalanceSnapshot.product_id == StockTransferItem.product_id)
+        .where(StockTransfer.is_deleted == False, *criteria)
+        .group_by(day, StockTransferItem.product_id, StockTransfer.location_id, StockTransfer.transfer_type)
+    )
+
+
+def rebuild_movement_rollups():
+    """
+    Recompute `daily_movement_rollups` from the movement history.
+    Used to backfill existing databases and to correct any drift.
+
+    Days before the archive horizon are left alone: their movements may be in
+    the archive tables now (see app/archive.py), so their rollups are frozen.
+    """
+    table = DailyMovementRollup.__table__
+    columns = ["day", "product_id", "location_id", "movement_type", "quantity", "value"]
+    horizon = archive_horizon(db.session)
+    since = datetime.combine(horizon, datetime.min.time()) if horizon else None
+    purchase_window = [Purchase.purchase_date >= since] if since else []
+    transfer_window = [StockTransfer.date >= since] if since else []
+
+    purchases = (
+        select(
+            func.date(Purchase.purchase_date),
+            PurchaseItem.product_id,
+            null(),
+            literal("PURCHASE"),
+            func.sum(PurchaseItem.quantity),
+            func.sum(PurchaseItem.quantity * PurchaseItem.unit_cost)
+        )
+        .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+        .where(Purchase.is_deleted == False, *purchase_window)
+        .group_by(func.date(Purchase.purchase_date), PurchaseItem.product_id)
+    )
+
+    transfers = transfer_rollups(horizon, transfer_window)
+
+    db.session.execute(delete(table).where(table.c.day >= horizon) if horizon else delete(table))
+    db.session.execute(insert(table).from_select(columns, purchases))
+    db.session.execute(insert(table).from_select(columns, transfers))
+    db.session.commit()
+
+    return db.session.query(func.count(table.c.id)).scalar()
+
+
+def rebuild_stock_balances():
+    """Recompute `stock_balances` from the daily movement rollups."""
+    table = StockBalance.__table__
+    rollups = DailyMovementRollup.__table__
+    net_quantity = func.sum(case(
+        (rollups.c.movement_type == "OUT", -rollups.c.quantity),
+        else_=rollups.c.quantity
+    ))
+
+    db.session.execute(delete(table))
+    db.session.execute(insert(table).from_select(
+        ["product_id", "quantity"],
+        select(rollups.c.product_id, net_quantity).group_by(rollups.c.product_id)
+    ))
+    db.session.commit()
+
+    return db.session.query(func.count(table.c.product_id)).scalar()
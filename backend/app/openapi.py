@@ -0,0 +1,53 @@
+"""
+Prebuilt OpenAPI spec.
+
+flasgger assembles the spec from every route's @swag_from dict the first time
+each worker serves /apispec_1.json. `flask openapi build` does that once at
+build time and writes OPENAPI_SPEC_PATH; with STARTUP_MODE=production the spec
+route serves that file instead.
+"""
+import logging
+import os
+
+import click
+from flask import current_app, send_file
+from flask.cli import AppGroup
+
+logger = logging.getLogger(__name__)
+
+SPEC_ENDPOINT = "apispec_1"
+
+
+def build_spec(app):
+    with app.test_request_context():
+        return app.swag.get_apispecs(SPEC_ENDPOINT)
+
+
+def serve_cached_spec(app):
+    """Point the flasgger spec route at the prebuilt file, if there is one."""
+    path = app.config["OPENAPI_SPEC_PATH"]
+    if not os.path.exists(path):
+        logger.warning("%s not found; the OpenAPI spec will be generated on request. "
+                       "Run `flask openapi build` at build time.", path)
+        return
+
+    def cached_spec():
+        return send_file(path, mimetype="application/json")
+
+    app.view_functions[f"flasgger.{SPEC_ENDPOINT}"] = cached_spec
+
+
+openapi_cli = AppGroup("openapi", help="OpenAPI spec commands.")
+
+
+@openapi_cli.command("build")
+@click.option("--output", default=None, help="Where to write the spec (default: OPENAPI_SPEC_PATH).")
+def build_spec_command(output):
+    """Generate the OpenAPI spec once, for STARTUP_MODE=production to serve."""
+    path = output or current_app.config["OPENAPI_SPEC_PATH"]
+    spec = build_spec(current_app)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(current_app.json.dumps(spec, separators=(",", ":")))  # compact, like jsonify
+    print(f"✅ OpenAPI spec written to {path} ({len(spec.get('paths', {}))} paths).")
@@ -0,0 +1,122 @@
+"""
+On-demand profiling of a single request.
+
+With PROFILING_ENABLED set, any request carrying `?__profile=<format>` and the
+X-Admin-Token header is run under cProfile and answered with the profile
+instead of its normal body:
+
+    curl -H "X-Admin-Token: $ADMIN_TOKEN" "localhost:5000/products?__profile=1"
+    curl -H "X-Admin-Token: $ADMIN_TOKEN" "localhost:5000/products?__profile=prof" -o products.prof
+
+`1` / `text` returns the top functions as plain text (sort with
+`__profile_sort=cumulative|tottime|calls`); `prof` returns the raw pstats file
+for snakeviz, `python -m pstats` or a flamegraph tool. The original status is
+kept in the X-Profiled-Status header. With PROFILE_DIR set, every profile is
+also saved there as `<time>-<method>-<endpoint>.prof` for later comparison.
+
+Python's profiler is process-wide, so one request is profiled at a time and a
+second profiling request gets 409. Under the ASGI server, profiled requests go
+through the Flask views (see app/asgi.py).
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import threading
+import time
+
+from flask import Response, jsonify, request
+
+from .routes.debug import has_admin_token
+
+PROFILE_PARAM = "__profile"
+FORMATS = ("1", "text", "prof")
+SORT_KEYS = ("cumulative", "tottime", "calls")
+TOP_FUNCTIONS = 60
+
+_active = threading.Lock()
+
+
+def profile_requested(query_args):
+    return bool(query_args.get(PROFILE_PARAM))
+
+
+def _profile_name():
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    endpoint = (request.endpoint or "unmatched").replace(".", "-")
+    return f"{stamp}-{request.method}-{endpoint}-{os.getpid()}.prof"
+
+
+def _text_report(stats, elapsed, status, sort):
+    out = io.StringIO()
+    out.write(f"{request.method} {request.full_path.rstrip('?')} -> {status} in {elapsed * 1000:.1f} ms\n\n")
+    stats.stream = out
+    stats.strip_dirs().sort_stats(sort).print_stats(TOP_FUNCTIONS)
+    return out.getvalue()
+
+
+def profile_response(profiler, elapsed, response, fmt, sort, profile_dir=None):
+    """Replace `response` with the report for `profiler`, saving it under `profile_dir` if given."""
+    stats = pstats.Stats(profiler)
+    saved_path = None
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        saved_path = os.path.join(profile_dir, _profile_name())
+        stats.dump_stats(saved_path)
+
+    if fmt == "prof":
+        # Same format as Stats.dump_stats(), which only writes to a path
+        report = Response(marshal.dumps(stats.stats), mimetype="application/octet-stream")
+        report.headers["Content-Disposition"] = f'attachment; filename="{_profile_name()}"'
+    else:
+        report = Response(_text_report(stats, elapsed, response.status_code, sort), mimetype="text/plain")
+
+    report.headers["X-Profiled-Status"] = str(response.status_code)
+    if saved_path:
+        report.headers["X-Profile-Path"] = saved_path
+    return report
+
+
+def init_profiling(app):
+    if not app.config.get("PROFILING_ENABLED"):
+        return
+    profile_dir = app.config.get("PROFILE_DIR")
+
+    @app.before_request
+    def _start_profile():
+        fmt = request.args.get(PROFILE_PARAM)
+        if not fmt:
+            return None
+        if not has_admin_token():
+            return jsonify({"error": "Profiling requires a valid X-Admin-Token"}), 403
+        if fmt not in FORMATS:
+            return jsonify({"error": f"{PROFILE_PARAM} must be one of {', '.join(FORMATS)}"}), 400
+        sort = request.args.get("__profile_sort", "cumulative")
+        if sort not in SORT_KEYS:
+            return jsonify({"error": f"__profile_sort must be one of {', '.join(SORT_KEYS)}"}), 400
+        if not _active.acquire(blocking=False):
+            return jsonify({"error": "Another request is being profiled, try again"}), 409
+
+        profiler = cProfile.Profile()
+        request.environ["app.profile"] = (profiler, time.perf_counter(), fmt, sort)
+        profiler.enable()
+        return None
+
+    @app.after_request
+    def _profile_report(response):
+        state = request.environ.pop("app.profile", None)
+        if state is None:
+            return response
+        profiler, started, fmt, sort = state
+        profiler.disable()
+        _active.release()
+        return profile_response(profiler, time.perf_counter() - started, response, fmt, sort, profile_dir)
+
+    @app.teardown_request
+    def _abandon_profile(exc):
+        # after_request is skipped when a response could not be produced at all
+        state = request.environ.pop("app.profile", None)
+        if state is not None:
+            state[0].disable()
+            _active.release()
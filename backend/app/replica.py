@@ -0,0 +1,107 @@
+"""
+Read-replica routing.
+
+When DATABASE_REPLICA_URL is set it becomes the "replica" bind, and GET/HEAD
+requests handled by blueprints or views marked with `replica_reads` run their
+queries there. Everything else uses the primary. Within a request, any flush
+pins the rest of the request to the primary.
+
+Read-your-writes: a request that commits answers with the time until which
+the client should read from the primary (now + REPLICA_STICKY_SECONDS, which
+covers replication lag), both as an `X-Primary-Until` header and as a
+`primary_until` cookie. Requests carrying a fresh value in either one are
+served from the primary. The frontend is on another site and doesn't send
+cookies, so it echoes the header back (frontend/src/lib/queryClient.js,
+`apiFetch`); the cookie covers same-site clients.
+"""
+import time
+from functools import wraps
+
+from flask import Blueprint, current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND = "replica"
+STICKY_COOKIE = "primary_until"
+STICKY_HEADER = "X-Primary-Until"
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica():
+            return current_app.extensions["sqlalchemy"].engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_replica(self):
+        return (
+            has_request_context()
+            and g.get("replica_reads", False)
+            and not g.get("wrote_to_primary", False)
+            and not self.info.get("wrote")
+            and not (self._flushing or self.new or self.dirty or self.deleted)
+        )
+
+
+def recently_wrote(header, cookie):
+    """Whether a `primary_until` value from the request header or cookie is still in the future."""
+    now = time.time()
+    for value in (header, cookie):
+        try:
+            if value and float(value) > now:
+                return True
+        except ValueError:
+            pass
+    return False
+
+
+def _recently_wrote():
+    return recently_wrote(request.headers.get(STICKY_HEADER), request.cookies.get(STICKY_COOKIE))
+
+
+def _mark_replica_request():
+    if (
+        request.method in ("GET", "HEAD")
+        and REPLICA_BIND in current_app.config.get("SQLALCHEMY_BINDS", {})
+        and not _recently_wrote()
+    ):
+        g.replica_reads = True
+
+
+def replica_reads(target):
+    """Serve GET/HEAD requests of a blueprint or a single view from the read replica."""
+    if isinstance(target, Blueprint):
+        target.before_request(_mark_replica_request)
+        return target
+
+    @wraps(target)
+    def view(*args, **kwargs):
+        _mark_replica_request()
+        return target(*args, **kwargs)
+    return view
+
+
+def init_replica(app):
+    @app.after_request
+    def _stick_to_primary(response):
+        if g.get("wrote_to_primary") and REPLICA_BIND in app.config.get("SQLALCHEMY_BINDS", {}):
+            seconds = app.config.get("REPLICA_STICKY_SECONDS", 5)
+            primary_until = f"{time.time() + seconds:.3f}"
+            response.headers[STICKY_HEADER] = primary_until
+            response.set_cookie(STICKY_COOKIE, primary_until, max_age=seconds, httponly=True, samesite="Lax")
+        return response
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_to_primary(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_write(session):
+    if session.info.pop("wrote", False) and has_request_context():
+        g.wrote_to_primary = True
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
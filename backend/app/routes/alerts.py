@@ -0,0 +1,133 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy.orm import joinedload
+from ..models import db, StockAlertEvent
+from ..alerts import stock_status_query, evaluate_alerts
+from flasgger import swag_from
+
+alerts_bp = Blueprint("alerts", __name__, url_prefix="/alerts")
+
+
+@alerts_bp.route("/low_stock", methods=["GET"])
+@swag_from({
+    'tags': ['Alerts'],
+    'summary': 'Get products at or below their reorder point',
+    'description': 'Evaluated live against the materialized stock balances. A product is LOW when its stock is at '
+                   'or below its reorder point (or its category default) and OUT when no stock is left.',
+    'parameters': [
+        {
+            'name': 'status',
+            'in': 'query',
+            'required': False,
+            'description': 'Only return LOW or OUT products',
+            'schema': {'type': 'string', 'enum': ['LOW', 'OUT']}
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Products needing a reorder',
+            'content': {
+                'application/json': {
+                    'example': [
+                        {
+                            "product_id": 3,
+                            "name": "Detergent",
+                            "sku": "CLN-321",
+                            "category": "Cleaning Supplies",
+                            "abc_class": "A",
+                            "stock_level": 2,
+                            "reorder_point": 10,
+                            "reorder_quantity": 50,
+                            "status": "LOW"
+                        }
+                    ]
+                }
+            }
+        },
+        400: {'description': 'Invalid status filter'}
+    }
+})
+def get_low_stock():
+    status = request.args.get("status")
+    if status and status not in ("LOW", "OUT"):
+        return jsonify({"error": "status must be 'LOW' or 'OUT'"}), 400
+
+    query = stock_status_query().subquery()
+    statuses = [status] if status else ["LOW", "OUT"]
+    rows = db.session.execute(
+        db.select(query)
+        .where(query.c.status.in_(statuses))
+        .order_by(query.c.stock_level, query.c.name)
+    ).all()
+
+    return jsonify([
+        {
+            "product_id": r.product_id,
+            "name": r.name,
+            "sku": r.sku,
+            "category": r.category,
+            "abc_class": r.abc_class,
+            "stock_level": r.stock_level,
+            "reorder_point": r.reorder_point,
+            "reorder_quantity": r.reorder_quantity,
+            "status": r.status
+        } for r in rows
+    ]), 200
+
+
+@alerts_bp.route("/events", methods=["GET"])
+@swag_from({
+    'tags': ['Alerts'],
+    'summary': 'Get recent stock threshold crossings',
+    'description': 'Crossings recorded by the background alert evaluator, most recent first.',
+    'parameters': [
+        {
+            'name': 'limit',
+            'in': 'query',
+            'required': False,
+            'description': 'Number of events to return (1-200, default 50)',
+            'schema': {'type': 'integer'}
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'List of alert events',
+            'content': {
+                'application/json': {
+                    'example': [
+                        {
+                            "id": 7,
+                            "product_id": 3,
+                            "product_name": "Detergent",
+                            "from_status": "OK",
+                            "to_status": "LOW",
+                            "stock_level": 4,
+                            "reorder_point": 5,
+                            "created_at": "2025-06-28T11:30:00"
+                        }
+                    ]
+                }
+            }
+        },
+        400: {'description': 'Invalid limit'}
+    }
+})
+def get_alert_events():
+    limit = request.args.get("limit", 50, type=int)
+    if not 1 <= limit <= 200:
+        return jsonify({"error": "limit must be between 1 and 200"}), 400
+
+    events = (
+        StockAlertEvent.query
+        .options(joinedload(StockAlertEvent.product))
+        .order_by(StockAlertEvent.created_at.desc(), StockAlertEvent.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return jsonify([e.to_dict() for e in events]), 200
+
+
+@alerts_bp.cli.command("evaluate")
+def evaluate_alerts_command():
+    """Evaluate stock alerts for every product and record threshold crossings."""
+    crossings = evaluate_alerts()
+    print(f"✅ Stock alerts evaluated ({crossings} threshold crossings recorded).")
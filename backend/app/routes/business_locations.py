@@ -33,7 +33,7 @@ business_location_bp = Blueprint("business_location_bp", __name__)
     }
 })
 def get_business_locations():
-    locations = BusinessLocation.query.filter_by(is_deleted=False).all()
+    locations = BusinessLocation.query.all()
     return jsonify([location.to_dict() for location in locations]), 200
 
 
@@ -118,7 +118,8 @@ def create_business_location():
         phone = data.get("phone")
         notes = data.get("notes")
 
-        if BusinessLocation.query.filter_by(name=name).first():
+        # Names are unique across deleted locations too
+        if BusinessLocation.query.execution_options(include_deleted=True).filter_by(name=name).first():
             return jsonify({"error": "A business location with this name already exists"}), 400
 
         location = BusinessLocation(
@@ -28,7 +28,7 @@ category_bp = Blueprint("category_bp", __name__)
 })
 def get_categories():
     # Retrieve all categories that have not been soft-deleted
-    categories = Category.query.filter_by(is_deleted=False).all()
+    categories = Category.query.all()
     return jsonify([cat.to_dict() for cat in categories]), 200
 
 
@@ -65,7 +65,7 @@ def get_categories():
 })
 def get_category(id):
     # Fetch a category by ID only if it's not soft-deleted
-    category = Category.query.filter_by(id=id, is_deleted=False).first()
+    category = Category.query.filter_by(id=id).first()
     if not category:
         return jsonify({"error": "Category not found or has been deleted"}), 404
     return jsonify(category.to_dict()), 200
@@ -81,7 +81,9 @@ def get_category(id):
             'application/json': {
                 'example': {
                     "name": "Snacks",
-                    "description": "Quick bites"
+                    "description": "Quick bites",
+                    "default_reorder_point": 20,
+                    "default_reorder_quantity": 100
                 }
             }
         }
@@ -98,11 +100,14 @@ def create_category():
     try:
         name = data.get("name")
         description = data.get("description", "")
+        default_reorder_point = data.get("default_reorder_point")
+        default_reorder_quantity = data.get("default_reorder_quantity")
 
         if not name:
             return jsonify({"error": "Category name is required"}), 400
 
-        existing_category = Category.query.filter_by(name=name).first()
+        # Deleted categories included, so one with this name is restored instead of violating the unique name
+        existing_category = Category.query.execution_options(include_deleted=True).filter_by(name=name).first()
 
         # Prevent duplicate active category names
         if existing_category and not existing_category.is_deleted:
@@ -112,11 +117,18 @@ def create_category():
         if existing_category and existing_category.is_deleted:
             existing_category.is_deleted = False
             existing_category.description = description
+            existing_category.default_reorder_point = default_reorder_point
+            existing_category.default_reorder_quantity = default_reorder_quantity
             db.session.commit()
             return jsonify(existing_category.to_dict()), 200
 
         # Create a completely new category
-        new_category = Category(name=name, description=description)
+        new_category = Category(
+            name=name,
+            description=description,
+            default_reorder_point=default_reorder_point,
+            default_reorder_quantity=default_reorder_quantity
+        )
         db.session.add(new_category)
         db.session.commit()
         return jsonify(new_category.to_dict()), 201
@@ -144,7 +156,8 @@ def create_category():
             'application/json': {
                 'example': {
                     "name": "New Category Name",
-                    "description": "Updated description"
+                    "description": "Updated description",
+                    "default_reorder_point": 15
                 }
             }
         }
@@ -158,7 +171,7 @@ def create_category():
 })
 def update_category(id):
     # Ensure the category exists and hasn't been soft-deleted
-    category = Category.query.filter_by(id=id, is_deleted=False).first()
+    category = Category.query.filter_by(id=id).first()
     if not category:
         return jsonify({"error": "Category not found or has been deleted"}), 404
 
@@ -167,13 +180,14 @@ def update_category(id):
     # Check for name conflicts with other categories
     if "name" in data:
         new_name = data["name"]
-        if Category.query.filter(Category.name == new_name, Category.id != id, Category.is_deleted == False).first():
+        if Category.query.filter(Category.name == new_name, Category.id != id).first():
             return jsonify({"error": "Another non-deleted category with this name already exists"}), 409
         category.name = new_name
 
-    # Update description if provided
-    if "description" in data:
-        category.description = data["description"]
+    # Update description and reorder defaults if provided
+    for field in ["description", "default_reorder_point", "default_reorder_quantity"]:
+        if field in data:
+            setattr(category, field, data[field])
 
     try:
         db.session.commit()
@@ -203,7 +217,7 @@ def update_category(id):
 })
 def delete_category(id):
     # Find the category if it's active (not already deleted)
-    category = Category.query.filter_by(id=id, is_deleted=False).first()
+    category = Category.query.filter_by(id=id).first()
     if not category:
         return jsonify({"error": "Category not found or already deleted"}), 404
 
@@ -1,16 +1,175 @@
-from flask import Blueprint, jsonify
-from ..models import db, Product, Purchase, StockTransfer, Supplier
+from flask import Blueprint, request, jsonify
+from ..models import (
+    db, Product, Purchase, PurchaseItem, StockTransfer,
+    StockTransferItem, Supplier, BusinessLocation, StockAlert, StockBalance, StockBalanceSnapshot,
+    to_dict_loader_options
+)
+import base64
+import json
 from datetime import datetime, timedelta
+from functools import partial
 from zoneinfo import ZoneInfo
-from sqlalchemy import func
+from sqlalchemy import func, select, literal, union_all, tuple_
+from sqlalchemy.orm import joinedload
 from flasgger import swag_from
+from ..replica import replica_reads
+from ..archive import latest_unit_cost, movement_history, supplier_names
 
-dashboard_bp = Blueprint("dashboard_routes", __name__)
+dashboard_bp = replica_reads(Blueprint("dashboard_routes", __name__))
 
 # Define East Africa Timezone
 EAT = ZoneInfo("Africa/Nairobi")
 
 
+def inventory_totals(session):
+    """Product count, total stock and stock valued at each product's latest (possibly archived) purchase cost."""
+    ranked_costs = (
+        select(
+            PurchaseItem.product_id.label("product_id"),
+            PurchaseItem.unit_cost.label("unit_cost"),
+            Purchase.purchase_date.label("purchase_date"),
+            func.row_number().over(
+                partition_by=PurchaseItem.product_id,
+                order_by=(Purchase.purchase_date.desc(), PurchaseItem.id.desc())
+            ).label("rank")
+        )
+        .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+        .subquery()
+    )
+    stock = func.coalesce(StockBalance.quantity, 0)
+    unit_cost = latest_unit_cost(ranked_costs.c.unit_cost, ranked_costs.c.purchase_date)
+
+    row = session.execute(
+        select(
+            func.count(Product.id),
+            func.coalesce(func.sum(stock), 0),
+            func.coalesce(func.sum(stock * unit_cost), 0)
+        )
+        .outerjoin(StockBalance, StockBalance.product_id == Product.id)
+        .outerjoin(ranked_costs, (ranked_costs.c.product_id == Product.id) & (ranked_costs.c.rank == 1))
+        .outerjoin(StockBalanceSnapshot, StockBalanceSnapshot.product_id == Product.id)
+    ).one()
+    return {"total_items": row[0], "total_stock": int(row[1]), "inventory_value": float(row[2])}
+
+
+def stock_alert_items(session):
+    # Low/out-of-stock lists come from the precomputed alert state
+    alerts = session.scalars(
+        select(StockAlert)
+        .options(joinedload(StockAlert.product).joinedload(Product.category))
+        .where(StockAlert.status.in_(["LOW", "OUT"]))
+        .order_by(StockAlert.stock_level)
+    ).all()
+    items = {"LOW": [], "OUT": []}
+    for a in alerts:
+        items[a.status].append({
+            "id": a.product_id,
+            "name": a.product.name,
+            "stock_level": a.stock_level,
+            "reorder_point": a.reorder_point,
+            "category": a.product.category.name if a.product.category else None
+        })
+    return items
+
+
+def recent_purchases(session, since):
+    purchases = session.scalars(
+        select(Purchase)
+        .options(*to_dict_loader_options(Purchase))
+        .where(Purchase.purchase_date >= since)
+        .order_by(Purchase.purchase_date.desc())
+        .limit(5)
+    ).all()
+    return [
+        {
+            **p.to_dict(),
+            "purchase_date": p.purchase_date.replace(tzinfo=EAT).isoformat()
+        } for p in purchases
+    ]
+
+
+def recent_transfers(session, since):
+    transfers = session.scalars(
+        select(StockTransfer)
+        .options(*to_dict_loader_options(StockTransfer))
+        .where(StockTransfer.date >= since)
+        .order_by(StockTransfer.date.desc())
+        .limit(5)
+    ).all()
+    return [
+        {
+            **t.to_dict(),
+            "date": t.date.replace(tzinfo=EAT).isoformat()
+        } for t in transfers
+    ]
+
+
+def total_purchase_value(session):
+    # Total value of all non-deleted purchases, archived closed periods included
+    purchases = movement_history("purchases", lambda header, items: [header.c.total_cost])
+    return session.scalar(select(func.sum(purchases.c.total_cost))) or 0.0
+
+
+def supplier_spending_trends(session):
+    # Suppliers deleted or archived since still rank by what was bought from them
+    purchases = movement_history("purchases", lambda header, items: [header.c.supplier_id, header.c.total_cost])
+    suppliers = supplier_names()
+    supplier_spending = session.execute(
+        select(
+            suppliers.c.id,
+            suppliers.c.name,
+            func.sum(purchases.c.total_cost).label('total_spent')
+        )
+        .join(purchases, suppliers.c.id == purchases.c.supplier_id)
+        .group_by(suppliers.c.id, suppliers.c.name)
+        .order_by(func.sum(purchases.c.total_cost).desc())
+        .limit(5)
+    ).all()
+    return [
+        {
+            "supplier_id": s.id,
+            "supplier_name": s.name,
+            "total_spent": float(s.total_spent)
+        } for s in supplier_spending
+    ]
+
+
+def summary_sections():
+    """
+    The independent queries behind the summary, keyed by name. Each takes a
+    session, so the ASGI read path can run them concurrently.
+    """
+    seven_days_ago = datetime.now(EAT) - timedelta(days=7)
+    return {
+        "totals": inventory_totals,
+        "alerts": stock_alert_items,
+        "recent_purchases": partial(recent_purchases, since=seven_days_ago),
+        "recent_transfers": partial(recent_transfers, since=seven_days_ago),
+        "total_purchase_value": total_purchase_value,
+        "supplier_spending_trends": supplier_spending_trends,
+    }
+
+
+def summary_payload(sections):
+    totals = sections["totals"]
+    low_stock_items = sections["alerts"]["LOW"]
+    out_of_stock_items = sections["alerts"]["OUT"]
+
+    return {
+        "total_items": totals["total_items"],
+        "total_stock": totals["total_stock"],
+        "low_stock_count": len(low_stock_items),
+        "out_of_stock_count": len(out_of_stock_items),
+        "inventory_value": round(totals["inventory_value"], 2),
+        "total_purchase_value": round(sections["total_purchase_value"], 2),
+        "low_stock_items": low_stock_items,
+        "out_of_stock_items": out_of_stock_items,
+        "recent_purchases": sections["recent_purchases"],
+        "recent_transfers": sections["recent_transfers"],
+        "supplier_spending_trends": sections["supplier_spending_trends"]
+    }
+
+
 @dashboard_bp.route("/dashboard/summary", methods=["GET"])
 @swag_from({
     'tags': ['Dashboard'],
@@ -28,11 +187,11 @@ EAT = ZoneInfo("Africa/Nairobi")
                         "out_of_stock_count": 1,
                         "inventory_value": 4523.75,
                         "total_purchase_value": 12000.0,
-                        "low_stock_items": [...],
-                        "out_of_stock_items": [...],
-                        "recent_purchases": [...],
-                        "recent_transfers": [...],
-                        "supplier_spending_trends": [...]
+                        "low_stock_items": [],
+                        "out_of_stock_items": [],
+                        "recent_purchases": [],
+                        "recent_transfers": [],
+                        "supplier_spending_trends": []
                     }
                 }
             }
@@ -40,186 +199,192 @@ EAT = ZoneInfo("Africa/Nairobi")
     }
 })
 def dashboard_summary():
-    products = Product.query.all()
-
-    total_items = len(products)
-    total_stock = sum(p.stock_level for p in products)
-
-    # Identify products with low or no stock
-    low_stock_items = [p for p in products if 0 < p.stock_level <= 5]
-    out_of_stock_items = [p for p in products if p.stock_level == 0]
-
-    now = datetime.now(EAT)
-    seven_days_ago = now - timedelta(days=7)
-
-    # Get recent purchases and transfers (last 7 days)
-    purchases = Purchase.query.filter(
-        Purchase.purchase_date >= seven_days_ago,
-        Purchase.is_deleted == False
-    ).order_by(Purchase.purchase_date.desc()).limit(5).all()
-
-    transfers = StockTransfer.query.filter(
-        StockTransfer.date >= seven_days_ago,
-        StockTransfer.is_deleted == False
-    ).order_by(StockTransfer.date.desc()).limit(5).all()
-
-    # Calculate current inventory value based on latest non-deleted purchase
-    inventory_value = 0.0
-    for product in products:
-        latest_purchase_item = None
-        for pi in sorted(
-            product.purchase_items,
-            key=lambda x: x.purchase.purchase_date if x.purchase else datetime.min,
-            reverse=True
-        ):
-            if pi.purchase and not pi.purchase.is_deleted:
-                latest_purchase_item = pi
-                break
-        if latest_purchase_item:
-            inventory_value += product.stock_level * latest_purchase_item.unit_cost
-
-    # Get total value of all non-deleted purchases
-    total_purchase_value = db.session.query(
-        db.func.sum(Purchase.total_cost)
-    ).filter(Purchase.is_deleted == False).scalar() or 0.0
-
-    # Aggregate supplier spending
-    supplier_spending = (
-        db.session.query(
-            Supplier.id,
-            Supplier.name,
-            func.sum(Purchase.total_cost).label('total_spent')
+    sections = {name: load(db.session) for name, load in summary_sections().items()}
+    return jsonify(summary_payload(sections)), 200
+
+
+def _feed_cursor(movement):
+    """Opaque `next_before` token for the (date, type, id) key of the last movement on a page."""
+    key = json.dumps([movement.date.isoformat(), movement.type, movement.id])
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def _parse_feed_cursor(token):
+    date, movement_type, movement_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+    return datetime.fromisoformat(date), str(movement_type), int(movement_id)
+
+
+def movement_feed_params(args):
+    """
+    Validated (limit, before, paged) for the movements feed; raises ValueError with the message to return.
+    Without `limit` or `before` the feed is the original dashboard list, so `paged` is False.
+    """
+    paged = "limit" in args or "before" in args
+    limit = args.get("limit", 10, type=int)
+    if not 1 <= limit <= 100:
+        raise ValueError("limit must be between 1 and 100")
+
+    before = args.get("before")
+    try:
+        before = _parse_feed_cursor(before) if before else None
+    except (ValueError, TypeError):
+        raise ValueError("before must be the next_before token of a previous page")
+    return limit, before, paged
+
+
+def movement_feed(session, limit, before, paged):
+    """
+    Movements newest first, ordered by (date, type, id) so movements sharing a
+    timestamp are neither skipped nor repeated across pages.
+
+    Unpaged, this is the dashboard's list of the latest `limit` movements of the
+    past 7 days. Paged, every page reaches back through all history, starting
+    below `before` (the decoded key of the previous page's last movement), and
+    comes with the `next_before` token of the following page, or None when no
+    older movements exist.
+    """
+    if before:
+        # Coarse per-branch bound so each side can use its date index; the exact key is compared below
+        purchase_window = [Purchase.purchase_date <= before[0]]
+        transfer_window = [StockTransfer.date <= before[0]]
+    elif paged:
+        purchase_window, transfer_window = [], []
+    else:
+        seven_days_ago = datetime.now(EAT) - timedelta(days=7)
+        purchase_window = [Purchase.purchase_date >= seven_days_ago]
+        transfer_window = [StockTransfer.date >= seven_days_ago]
+
+    # Purchases and transfers are merged, sorted and limited in a single query
+    purchase_movements = (
+        select(
+            Purchase.id.label("id"),
+            Purchase.purchase_date.label("date"),
+            literal("PURCHASE").label("type"),
+            func.coalesce(func.sum(PurchaseItem.quantity), 0).label("quantity"),
+            Purchase.notes.label("notes"),
+            Supplier.name.label("party_name")
         )
-        .join(Purchase, Supplier.id == Purchase.supplier_id)
-        .filter(Purchase.is_deleted == False)
-        .group_by(Supplier.id)
-        .order_by(func.sum(Purchase.total_cost).desc())
-        .limit(5)
-        .all()
+        .outerjoin(Supplier, Supplier.id == Purchase.supplier_id)
+        .outerjoin(PurchaseItem, PurchaseItem.purchase_id == Purchase.id)
+        .where(Purchase.is_deleted == False, *purchase_window)
+        .group_by(Purchase.id, Purchase.purchase_date, Purchase.notes, Supplier.name)
     )
 
-    supplier_spending_trends = [
-        {
-            "supplier_id": s.id,
-            "supplier_name": s.name,
-            "total_spent": float(s.total_spent)
-        } for s in supplier_spending
-    ]
+    transfer_movements = (
+        select(
+            StockTransfer.id.label("id"),
+            StockTransfer.date.label("date"),
+            StockTransfer.transfer_type.label("type"),
+            func.coalesce(func.sum(StockTransferItem.quantity), 0).label("quantity"),
+            StockTransfer.notes.label("notes"),
+            BusinessLocation.name.label("party_name")
+        )
+        .outerjoin(BusinessLocation, BusinessLocation.id == StockTransfer.location_id)
+        .outerjoin(StockTransferItem, StockTransferItem.stock_transfer_id == StockTransfer.id)
+        .where(StockTransfer.is_deleted == False, *transfer_window)
+        .group_by(
+            StockTransfer.id, StockTransfer.date, StockTransfer.transfer_type,
+            StockTransfer.notes, BusinessLocation.name
+        )
+    )
 
-    return jsonify({
-        "total_items": total_items,
-        "total_stock": total_stock,
-        "low_stock_count": len(low_stock_items),
-        "out_of_stock_count": len(out_of_stock_items),
-        "inventory_value": round(inventory_value, 2),
-        "total_purchase_value": round(total_purchase_value, 2),
-        "low_stock_items": [
-            {
-                "id": p.id,
-                "name": p.name,
-                "stock_level": p.stock_level,
-                "category": p.category.name if p.category else None
-            } for p in low_stock_items
-        ],
-        "out_of_stock_items": [
-            {
-                "id": p.id,
-                "name": p.name,
-                "stock_level": p.stock_level,
-                "category": p.category.name if p.category else None
-            } for p in out_of_stock_items
-        ],
-        "recent_purchases": [
-            {
-                **p.to_dict(),
-                "purchase_date": p.purchase_date.replace(tzinfo=EAT).isoformat()
-            } for p in purchases
-        ],
-        "recent_transfers": [
-            {
-                **t.to_dict(),
-                "date": t.date.replace(tzinfo=EAT).isoformat()
-            } for t in transfers
-        ],
-        "supplier_spending_trends": supplier_spending_trends
-    }), 200
+    # Deleted suppliers and locations still name the movements they took part in
+    movements = union_all(purchase_movements, transfer_movements).subquery()
+    key = tuple_(movements.c.date, movements.c.type, movements.c.id)
+    rows = session.execute(
+        select(movements)
+        .where(*([key < tuple_(*before)] if before else []))
+        .order_by(movements.c.date.desc(), movements.c.type.desc(), movements.c.id.desc())
+        .limit(limit + 1 if paged else limit)
+        .execution_options(include_deleted=True)
+    ).all()
+    # The extra row fetched when paged only tells whether older movements exist
+    more = len(rows) > limit
+    rows = rows[:limit]
+
+    movement_data = []
+    for m in rows:
+        if m.type == "PURCHASE":
+            label = m.party_name or "Unknown Supplier"
+        else:
+            label = f"{'To' if m.type == 'IN' else 'From'} {m.party_name}" if m.party_name else "No location"
+
+        movement_data.append({
+            "id": m.id,
+            "date": m.date.replace(tzinfo=EAT).isoformat(),
+            "type": m.type,
+            "quantity": int(m.quantity),
+            "notes": m.notes or "",
+            "source_or_destination": label
+        })
+
+    if not paged:
+        return movement_data
+    return {"movements": movement_data, "next_before": _feed_cursor(rows[-1]) if more else None}
 
 
 @dashboard_bp.route("/dashboard/movements", methods=["GET"])
 @swag_from({
     'tags': ['Dashboard'],
     'summary': 'Get recent inventory movements (purchases and transfers)',
-    'description': 'Returns a list of inventory movement activities in the past 7 days',
+    'description': 'Returns the most recent inventory movement activities.\n\n'
+                   'Without `limit` or `before`, the response is a list of the 10 latest movements of the past '
+                   '7 days, as it has always been.\n\n'
+                   'Passing `limit` and/or `before` pages through all history instead. The response is then an object '
+                   '`{"movements": [...], "next_before": "..."}`; pass `next_before` as `before` to fetch the next '
+                   '(older) page. It is null when no older movements exist.',
+    'parameters': [
+        {
+            'name': 'limit',
+            'in': 'query',
+            'required': False,
+            'description': 'Number of movements to return (1-100, default 10)',
+            'schema': {'type': 'integer'}
+        },
+        {
+            'name': 'before',
+            'in': 'query',
+            'required': False,
+            'description': 'Opaque `next_before` token from the previous page',
+            'schema': {'type': 'string'}
+        }
+    ],
     'responses': {
         200: {
-            'description': 'List of movements',
+            'description': 'Movements: a list when unpaged, a page object (shown) when `limit` or `before` is passed',
             'content': {
                 'application/json': {
-                    'example': [
-                        {
-                            "id": 12,
-                            "date": "2025-06-28T14:30:00+03:00",
-                            "type": "PURCHASE",
-                            "quantity": 150,
-                            "notes": "Weekly restock",
-                            "source_or_destination": "Fresh Market"
-                        },
-                        {
-                            "id": 9,
-                            "date": "2025-06-27T10:00:00+03:00",
-                            "type": "OUT",
-                            "quantity": 45,
-                            "notes": "",
-                            "source_or_destination": "From Warehouse B"
-                        }
-                    ]
+                    'example': {
+                        "movements": [
+                            {
+                                "id": 12,
+                                "date": "2025-06-28T14:30:00+03:00",
+                                "type": "PURCHASE",
+                                "quantity": 150,
+                                "notes": "Weekly restock",
+                                "source_or_destination": "Fresh Market"
+                            },
+                            {
+                                "id": 9,
+                                "date": "2025-06-27T10:00:00+03:00",
+                                "type": "OUT",
+                                "quantity": 45,
+                                "notes": "",
+                                "source_or_destination": "From Warehouse B"
+                            }
+                        ],
+                        "next_before": "WyIyMDI1LTA2LTI3VDEwOjAwOjAwIiwgIk9VVCIsIDld"
+                    }
                 }
             }
-        }
+        },
+        400: {'description': 'Invalid limit or before parameter'}
     }
 })
 def dashboard_movements():
-    now = datetime.now(EAT)
-    seven_days_ago = now - timedelta(days=7)
-
-    # Get all recent purchases and transfers
-    recent_purchases = Purchase.query.filter(
-        Purchase.purchase_date >= seven_days_ago,
-        Purchase.is_deleted == False
-    ).order_by(Purchase.purchase_date.desc()).all()
-
-    recent_transfers = StockTransfer.query.filter(
-        StockTransfer.date >= seven_days_ago,
-        StockTransfer.is_deleted == False
-    ).order_by(StockTransfer.date.desc()).all()
-
-    movement_data = []
-
-    # Format purchase data into movement records
-    for p in recent_purchases:
-        total_quantity = sum(i.quantity for i in p.items)
-        movement_data.append({
-            "id": p.id,
-            "date": p.purchase_date.replace(tzinfo=EAT).isoformat(),
-            "type": "PURCHASE",
-            "quantity": total_quantity,
-            "notes": p.notes or "",
-            "source_or_destination": p.supplier.name if p.supplier else "Unknown Supplier"
-        })
-
-    # Format transfer data into movement records
-    for t in recent_transfers:
-        total_quantity = sum(i.quantity for i in t.items)
-        label = f"{'To' if t.transfer_type == 'IN' else 'From'} {t.location.name}" if t.location else "No location"
-        movement_data.append({
-            "id": t.id,
-            "date": t.date.replace(tzinfo=EAT).isoformat(),
-            "type": t.transfer_type,
-            "quantity": total_quantity,
-            "notes": t.notes or "",
-            "source_or_destination": label
-        })
+    try:
+        limit, before, paged = movement_feed_params(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    # Return the 10 most recent movement events
-    movement_data.sort(key=lambda x: x["date"], reverse=True)
-    return jsonify(movement_data[:10]), 200
+    return jsonify(movement_feed(db.session, limit, before, paged)), 200
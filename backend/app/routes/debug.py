@@ -0,0 +1,114 @@
+import hmac
+
+from flask import Blueprint, request, jsonify, current_app
+from ..slow_queries import slow_query_summary, reset_slow_queries
+from flasgger import swag_from
+
+debug_bp = Blueprint("debug", __name__, url_prefix="/debug")
+
+ADMIN_TOKEN_HEADER = {
+    'name': 'X-Admin-Token',
+    'in': 'header',
+    'required': True,
+    'description': 'The ADMIN_TOKEN configured on the server',
+    'schema': {'type': 'string'}
+}
+
+
+def has_admin_token():
+    token = current_app.config.get("ADMIN_TOKEN")
+    supplied = request.headers.get("X-Admin-Token", "")
+    return bool(token) and hmac.compare_digest(supplied, token)
+
+
+@debug_bp.before_request
+def _require_admin_token():
+    # Debug endpoints don't exist unless an ADMIN_TOKEN is configured
+    if not current_app.config.get("ADMIN_TOKEN"):
+        return jsonify({"error": "Not found"}), 404
+    if not has_admin_token():
+        return jsonify({"error": "Invalid or missing X-Admin-Token"}), 403
+
+
+@debug_bp.route("/slow_queries", methods=["GET"])
+@swag_from({
+    'tags': ['Debug'],
+    'summary': 'Get the slowest SQL statements seen by this worker',
+    'description': 'Statements slower than SLOW_QUERY_MS, grouped by statement text, with the routes that issued '
+                   'them, the parameters of the slowest run and the captured query plan. Each worker keeps its own '
+                   'summary; the `app.slow_queries` log has every occurrence.',
+    'parameters': [
+        ADMIN_TOKEN_HEADER,
+        {
+            'name': 'sort',
+            'in': 'query',
+            'required': False,
+            'description': 'Order by total time (default), max time or count',
+            'schema': {'type': 'string', 'enum': ['total', 'max', 'count']}
+        },
+        {
+            'name': 'limit',
+            'in': 'query',
+            'required': False,
+            'description': 'Number of statements to return (1-200, default 50)',
+            'schema': {'type': 'integer'}
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Slow statements',
+            'content': {
+                'application/json': {
+                    'example': {
+                        "threshold_ms": 200.0,
+                        "worker_pid": 4121,
+                        "statements": 1,
+                        "queries": [
+                            {
+                                "statement": "SELECT suppliers.name, sum(purchases.total_cost) AS total_spent FROM "
+                                             "purchases JOIN suppliers ON suppliers.id = purchases.supplier_id ...",
+                                "count": 12,
+                                "total_ms": 3120.4,
+                                "avg_ms": 260.03,
+                                "max_ms": 412.9,
+                                "routes": {"GET /dashboard/summary": 12},
+                                "slowest_params": [0, 5],
+                                "plan": ["SCAN purchases", "SEARCH suppliers USING INTEGER PRIMARY KEY (rowid=?)",
+                                         "USE TEMP B-TREE FOR GROUP BY"],
+                                "last_seen": "2025-06-30T09:12:00Z"
+                            }
+                        ]
+                    }
+                }
+            }
+        },
+        400: {'description': 'Invalid sort or limit'},
+        403: {'description': 'Invalid or missing admin token'},
+        404: {'description': 'No ADMIN_TOKEN configured'}
+    }
+})
+def get_slow_queries():
+    sort = request.args.get("sort", "total")
+    limit = request.args.get("limit", 50, type=int)
+    if sort not in ("total", "max", "count"):
+        return jsonify({"error": "sort must be one of 'total', 'max' or 'count'"}), 400
+    if not 1 <= limit <= 200:
+        return jsonify({"error": "limit must be between 1 and 200"}), 400
+
+    return jsonify(slow_query_summary(sort, limit)), 200
+
+
+@debug_bp.route("/slow_queries", methods=["DELETE"])
+@swag_from({
+    'tags': ['Debug'],
+    'summary': "Clear this worker's slow-query summary",
+    'parameters': [ADMIN_TOKEN_HEADER],
+    'responses': {
+        200: {'description': 'Summary cleared'},
+        403: {'description': 'Invalid or missing admin token'},
+        404: {'description': 'No ADMIN_TOKEN configured'}
+    }
+})
+def clear_slow_queries():
+    reset_slow_queries()
+    return jsonify({"message": "Slow-query summary cleared"}), 200
@@ -0,0 +1,145 @@
+import os
+
+from flask import Blueprint, request, jsonify, send_file
+from ..models import db, Job
+from ..jobs import JOB_TYPES, enqueue_job
+from flasgger import swag_from
+
+jobs_bp = Blueprint("jobs", __name__)
+
+JOB_EXAMPLE = {
+    "id": 14,
+    "type": "movements_export",
+    "params": {"from": "2025-01-01", "to": "2025-06-30"},
+    "status": "RUNNING",
+    "progress": 40,
+    "progress_message": "4000 of 10000 lines",
+    "result_url": None,
+    "error": None,
+    "created_at": "2025-06-30T09:12:00",
+    "started_at": "2025-06-30T09:12:01",
+    "finished_at": None
+}
+
+
+@jobs_bp.route("/jobs", methods=["POST"])
+@swag_from({
+    'tags': ['Jobs'],
+    'summary': 'Queue a background job',
+    'description': 'Runs exports, long reports and recomputes off the request path. Poll `GET /jobs/{id}` for '
+                   'progress and download the result from `result_url` once the job has SUCCEEDED.\n\n'
+                   'Job types:\n'
+                   '- `products_export`: CSV of active products with stock and reorder status\n'
+                   '- `movements_export`: CSV of purchase and transfer lines (params `from`, `to`)\n'
+                   '- `inventory_valuation`: inventory value by category as JSON, as of param `to`\n'
+                   '- `abc_classification`: recompute ABC classes (param `full`)\n'
+                   '- `rebuild_rollups`: rebuild daily movement rollups and stock balances',
+    'requestBody': {
+        'required': True,
+        'content': {
+            'application/json': {
+                'schema': {
+                    'type': 'object',
+                    'properties': {
+                        'type': {'type': 'string', 'example': 'movements_export'},
+                        'params': {
+                            'type': 'object',
+                            'example': {'from': '2025-01-01', 'to': '2025-06-30'}
+                        }
+                    },
+                    'required': ['type']
+                }
+            }
+        }
+    },
+    'responses': {
+        202: {
+            'description': 'Job queued',
+            'content': {
+                'application/json': {
+                    'example': {**JOB_EXAMPLE, "status": "QUEUED", "progress": 0,
+                                "progress_message": None, "started_at": None}
+                }
+            }
+        },
+        400: {'description': 'Unknown job type or invalid params'}
+    }
+})
+def create_job():
+    data = request.get_json(silent=True) or {}
+    job_type = data.get("type")
+    if not job_type:
+        return jsonify({"error": f"type is required. Choose one of: {', '.join(sorted(JOB_TYPES))}"}), 400
+
+    try:
+        job = enqueue_job(job_type, data.get("params") or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify(job.to_dict())
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return response, 202
+
+
+@jobs_bp.route("/jobs/<int:id>", methods=["GET"])
+@swag_from({
+    'tags': ['Jobs'],
+    'summary': 'Get a background job',
+    'description': 'Status is QUEUED, RUNNING, SUCCEEDED or FAILED; `progress` is a percentage.',
+    'parameters': [
+        {
+            'name': 'id',
+            'in': 'path',
+            'required': True,
+            'description': 'Job ID',
+            'schema': {'type': 'integer'}
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Job status',
+            'content': {
+                'application/json': {
+                    'example': JOB_EXAMPLE
+                }
+            }
+        },
+        404: {'description': 'Job not found'}
+    }
+})
+def get_job(id):
+    job = db.session.get(Job, id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@jobs_bp.route("/jobs/<int:id>/result", methods=["GET"])
+@swag_from({
+    'tags': ['Jobs'],
+    'summary': 'Download the result of a finished job',
+    'parameters': [
+        {
+            'name': 'id',
+            'in': 'path',
+            'required': True,
+            'description': 'Job ID',
+            'schema': {'type': 'integer'}
+        }
+    ],
+    'responses': {
+        200: {'description': 'The result file (CSV or JSON)'},
+        404: {'description': 'Job or result file not found'},
+        409: {'description': 'Job has not succeeded (yet)'}
+    }
+})
+def get_job_result(id):
+    job = db.session.get(Job, id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    if job.status != "SUCCEEDED":
+        return jsonify({"error": f"Job is {job.status}", "status": job.status}), 409
+    if not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({"error": "Result file not found"}), 404
+
+    return send_file(job.result_path, as_attachment=True, download_name=os.path.basename(job.result_path))
@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
-from ..models import db, Product, Category
+from datetime import datetime
+from ..models import db, Product, Category, StockBalance, to_dict_loader_options
+from ..search import search_products
+from ..autocomplete import autocomplete, DEFAULT_LIMIT
 from sqlalchemy.exc import IntegrityError
 from flasgger import swag_from
+from ..replica import replica_reads
 
 product_bp = Blueprint("product_routes", __name__)
 
@@ -31,18 +35,278 @@ product_bp = Blueprint("product_routes", __name__)
         }
     }
 })
+@replica_reads
 def get_products():
-    # Fetch only products that are not deleted AND belong to non-deleted categories
+    # Soft-deleted products and categories are filtered by the session (see models.exclude_soft_deleted),
+    # so the join leaves out products of deleted categories
     products = (
         Product.query
-        .filter(Product.is_deleted == False)
+        .options(*to_dict_loader_options(Product))
         .join(Product.category)
-        .filter(Category.is_deleted == False)
         .all()
     )
     return jsonify([p.to_dict() for p in products]), 200
 
 
+@product_bp.route("/products/autocomplete", methods=["GET"])
+@swag_from({
+    'tags': ['Products'],
+    'summary': 'Autocomplete products by name or SKU prefix',
+    'description': 'Lightweight lookup for product pickers, served from an in-memory index. Matches on the start '
+                   'of the name come first, then SKU matches, then matches on a later word of the name.',
+    'parameters': [
+        {
+            'name': 'prefix',
+            'in': 'query',
+            'required': True,
+            'description': 'Start of a product name, SKU or word in the name (case-insensitive)',
+            'schema': {'type': 'string'}
+        },
+        {
+            'name': 'limit',
+            'in': 'query',
+            'required': False,
+            'description': 'Maximum number of matches (1-50, default 10)',
+            'schema': {'type': 'integer'}
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Matching products',
+            'content': {
+                'application/json': {
+                    'example': [
+                        {
+                            "id": 1,
+                            "name": "Sugar",
+                            "sku": "SG-001",
+                            "unit": "kg"
+                        }
+                    ]
+                }
+            }
+        },
+        400: {'description': 'Missing prefix or invalid limit'}
+    }
+})
+def autocomplete_products():
+    prefix = request.args.get("prefix", "").strip()
+    limit = request.args.get("limit", DEFAULT_LIMIT, type=int)
+
+    if not prefix:
+        return jsonify({"error": "Query parameter 'prefix' is required"}), 400
+    if not 1 <= limit <= 50:
+        return jsonify({"error": "limit must be between 1 and 50"}), 400
+
+    return jsonify([
+        {"id": product_id, "name": name, "sku": sku, "unit": unit}
+        for product_id, name, sku, unit in autocomplete(prefix, limit)
+    ]), 200
+
+
+@product_bp.route("/products/search", methods=["GET"])
+@swag_from({
+    'tags': ['Products'],
+    'summary': 'Search products',
+    'description': 'Ranked full-text search over product name, SKU, description and category name. '
+                   'Each word is matched as a prefix; on Postgres misspellings also match via trigrams.',
+    'parameters': [
+        {
+            'name': 'q',
+            'in': 'query',
+            'required': True,
+            'description': 'Search text',
+            'schema': {'type': 'string'}
+        },
+        {
+            'name': 'page',
+            'in': 'query',
+            'required': False,
+            'description': 'Page number (default 1)',
+            'schema': {'type': 'integer'}
+        },
+        {
+            'name': 'per_page',
+            'in': 'query',
+            'required': False,
+            'description': 'Results per page (1-100, default 20)',
+            'schema': {'type': 'integer'}
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Ranked search results',
+            'content': {
+                'application/json': {
+                    'example': {
+                        "page": 1,
+                        "per_page": 20,
+                        "has_more": False,
+                        "results": [
+                            {
+                                "id": 1,
+                                "name": "Sugar",
+                                "sku": "SG-001",
+                                "unit": "kg",
+                                "category_id": 2,
+                                "category": "Groceries",
+                                "stock_level": 40,
+                                "score": 7.42
+                            }
+                        ]
+                    }
+                }
+            }
+        },
+        400: {'description': 'Missing query or invalid paging'}
+    }
+})
+def search_products_route():
+    q = request.args.get("q", "").strip()
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 20, type=int)
+
+    if not q:
+        return jsonify({"error": "Query parameter 'q' is required"}), 400
+    if page < 1 or not 1 <= per_page <= 100:
+        return jsonify({"error": "page must be >= 1 and per_page between 1 and 100"}), 400
+
+    # Fetch one extra row to know whether another page exists
+    rows = search_products(q, limit=per_page + 1, offset=(page - 1) * per_page)
+
+    return jsonify({
+        "page": page,
+        "per_page": per_page,
+        "has_more": len(rows) > per_page,
+        "results": [
+            {
+                "id": r.id,
+                "name": r.name,
+                "sku": r.sku,
+                "unit": r.unit,
+                "category_id": r.category_id,
+                "category": r.category,
+                "stock_level": r.stock_level,
+                "score": round(float(r.score), 4)
+            } for r in rows[:per_page]
+        ]
+    }), 200
+
+
+MAX_SCAN_BATCH = 500
+
+
+def _scan_lookup(skus):
+    """Active products for the given SKUs with their materialized stock, keyed by SKU."""
+    rows = db.session.execute(
+        db.select(
+            Product.id,
+            Product.name,
+            Product.sku,
+            Product.unit,
+            db.func.coalesce(StockBalance.quantity, 0).label("stock_level")
+        )
+        .join(Category, Category.id == Product.category_id)
+        .outerjoin(StockBalance, StockBalance.product_id == Product.id)
+        .where(Product.sku.in_(skus))
+    ).all()
+    return {
+        r.sku: {"id": r.id, "name": r.name, "sku": r.sku, "unit": r.unit, "stock_level": r.stock_level}
+        for r in rows
+    }
+
+
+@product_bp.route("/products/by_sku/<path:sku>", methods=["GET"])
+@swag_from({
+    'tags': ['Products'],
+    'summary': 'Look up a scanned product by SKU',
+    'description': 'Exact SKU match for barcode scanners. Uses the unique SKU index and the materialized '
+                   'stock balance, so the cost does not grow with movement history.',
+    'parameters': [
+        {
+            'name': 'sku',
+            'in': 'path',
+            'required': True,
+            'description': 'Product SKU (exact, case-sensitive)',
+            'schema': {'type': 'string'}
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Product with current stock',
+            'content': {
+                'application/json': {
+                    'example': {
+                        "id": 1,
+                        "name": "Sugar",
+                        "sku": "SG-001",
+                        "unit": "kg",
+                        "stock_level": 120
+                    }
+                }
+            }
+        },
+        404: {'description': 'No active product with this SKU'}
+    }
+})
+def get_product_by_sku(sku):
+    product = _scan_lookup([sku]).get(sku)
+    if not product:
+        return jsonify({"error": "Product not found"}), 404
+    return jsonify(product), 200
+
+
+@product_bp.route("/products/by_sku", methods=["POST"])
+@swag_from({
+    'tags': ['Products'],
+    'summary': 'Look up several scanned products by SKU',
+    'description': f'Batch variant of the SKU lookup for up to {MAX_SCAN_BATCH} scans in one query. '
+                   'Results follow the order of the request; unknown SKUs are listed under "missing".',
+    'requestBody': {
+        'required': True,
+        'content': {
+            'application/json': {
+                'example': {"skus": ["SG-001", "CLN-321", "UNKNOWN-1"]}
+            }
+        }
+    },
+    'responses': {
+        200: {
+            'description': 'Products found and SKUs not found',
+            'content': {
+                'application/json': {
+                    'example': {
+                        "products": [
+                            {"id": 1, "name": "Sugar", "sku": "SG-001", "unit": "kg", "stock_level": 120},
+                            {"id": 3, "name": "Detergent", "sku": "CLN-321", "unit": "pcs", "stock_level": 2}
+                        ],
+                        "missing": ["UNKNOWN-1"]
+                    }
+                }
+            }
+        },
+        400: {'description': 'skus missing, not a list of strings, or too many'}
+    }
+})
+def get_products_by_sku():
+    data = request.get_json(silent=True)
+    skus = data.get("skus") if isinstance(data, dict) else None
+
+    if not isinstance(skus, list) or not all(isinstance(s, str) for s in skus):
+        return jsonify({"error": "skus must be a list of strings"}), 400
+    if len(skus) > MAX_SCAN_BATCH:
+        return jsonify({"error": f"At most {MAX_SCAN_BATCH} skus per request"}), 400
+
+    # Keep scan order but look each SKU up once
+    skus = list(dict.fromkeys(skus))
+    found = _scan_lookup(skus) if skus else {}
+
+    return jsonify({
+        "products": [found[s] for s in skus if s in found],
+        "missing": [s for s in skus if s not in found]
+    }), 200
+
+
 @product_bp.route("/products/<int:id>", methods=["GET"])
 @swag_from({
     'tags': ['Products'],
@@ -80,7 +344,7 @@ def get_products():
 })
 def get_product(id):
     # Return 404 if product doesn't exist or if its category was soft-deleted
-    product = Product.query.filter_by(id=id, is_deleted=False).first()
+    product = Product.query.filter_by(id=id).first()
     if not product or (product.category and product.category.is_deleted):
         return jsonify({"error": "Product not found or category is deleted"}), 404
     return jsonify(product.to_dict()), 200
@@ -103,7 +367,9 @@ def get_product(id):
                         'sku': {'type': 'string'},
                         'unit': {'type': 'string'},
                         'description': {'type': 'string'},
-                        'category_id': {'type': 'integer'}
+                        'category_id': {'type': 'integer'},
+                        'reorder_point': {'type': 'integer'},
+                        'reorder_quantity': {'type': 'integer'}
                     },
                     'required': ['name', 'category_id']
                 },
@@ -112,7 +378,9 @@ def get_product(id):
                     "sku": "SL-001",
                     "unit": "kg",
                     "description": "Table salt",
-                    "category_id": 1
+                    "category_id": 1,
+                    "reorder_point": 10,
+                    "reorder_quantity": 50
                 }
             }
         }
@@ -134,11 +402,13 @@ def create_product():
             unit=data.get("unit"),
             description=data.get("description"),
             category_id=data["category_id"],
+            reorder_point=data.get("reorder_point"),
+            reorder_quantity=data.get("reorder_quantity"),
             is_deleted=False
         )
 
         # Ensure the assigned category exists and hasn't been soft-deleted
-        category = Category.query.filter_by(id=new_product.category_id, is_deleted=False).first()
+        category = Category.query.filter_by(id=new_product.category_id).first()
         if not category:
             return jsonify({"error": "Invalid or deleted category"}), 400
 
@@ -181,7 +451,9 @@ def create_product():
                         'sku': {'type': 'string'},
                         'unit': {'type': 'string'},
                         'description': {'type': 'string'},
-                        'category_id': {'type': 'integer'}
+                        'category_id': {'type': 'integer'},
+                        'reorder_point': {'type': 'integer'},
+                        'reorder_quantity': {'type': 'integer'}
                     }
                 },
                 'example': {
@@ -201,20 +473,20 @@ def create_product():
     }
 })
 def update_product(id):
-    product = Product.query.filter_by(id=id, is_deleted=False).first()
+    product = Product.query.filter_by(id=id).first()
     if not product:
         return jsonify({"error": "Product not found"}), 404
 
     data = request.get_json()
 
     # Dynamically update only the fields provided in the request
-    for field in ["name", "sku", "unit", "description", "category_id"]:
+    for field in ["name", "sku", "unit", "description", "category_id", "reorder_point", "reorder_quantity"]:
         if field in data:
             setattr(product, field, data[field])
 
     # If category is being changed, validate the new category
     if "category_id" in data:
-        new_category = Category.query.filter_by(id=data["category_id"], is_deleted=False).first()
+        new_category = Category.query.filter_by(id=data["category_id"]).first()
         if not new_category:
             return jsonify({"error": "Invalid or deleted category"}), 400
 
@@ -243,11 +515,12 @@ def update_product(id):
 })
 def delete_product(id):
     # Fetch the product only if it hasn't been deleted yet
-    product = Product.query.filter_by(id=id, is_deleted=False).first()
+    product = Product.query.filter_by(id=id).first()
     if not product:
         return jsonify({"error": "Product not found or already deleted"}), 404
 
     # Perform a soft delete by setting the flag instead of removing from DB
     product.is_deleted = True
+    product.deleted_at = datetime.utcnow()
     db.session.commit()
     return jsonify({"message": f"Product #{id} soft-deleted"}), 200
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from ..models import db, PurchaseItem, Product, Purchase
 from flasgger import swag_from
+from ..replica import replica_reads
 
 purchase_item_bp = Blueprint("purchase_item_bp", __name__)
 
@@ -29,6 +30,7 @@ purchase_item_bp = Blueprint("purchase_item_bp", __name__)
         }
     }
 })
+@replica_reads
 def get_purchase_items():
     items = PurchaseItem.query.all()
     return jsonify([item.to_dict() for item in items]), 200
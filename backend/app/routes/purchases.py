@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
-from ..models import db, Purchase, PurchaseItem, Product
+from ..models import db, Purchase, PurchaseItem, Product, to_dict_loader_options
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from flasgger import swag_from
+from ..replica import replica_reads
 
 purchases_bp = Blueprint("purchases", __name__, url_prefix="/purchases")
 
@@ -35,10 +36,11 @@ EAT = ZoneInfo("Africa/Nairobi")
         }
     }
 })
+@replica_reads
 def get_purchases():
     purchases = (
         Purchase.query
-        .filter(Purchase.is_deleted == False)
+        .options(*to_dict_loader_options(Purchase))
         .order_by(Purchase.purchase_date.desc())
         .all()
     )
@@ -80,7 +82,7 @@ def get_purchases():
     }
 })
 def get_single_purchase(id):
-    purchase = Purchase.query.filter_by(id=id, is_deleted=False).first()
+    purchase = Purchase.query.filter_by(id=id).first()
     if not purchase:
         return jsonify({"error": "Purchase not found or has been deleted"}), 404
     return jsonify(purchase.to_dict()), 200
@@ -146,7 +148,7 @@ def create_purchase():
             unit_cost = float(item_data["unit_cost"])
 
             product = Product.query.get(product_id)
-            if not product or product.is_deleted:
+            if not product:
                 db.session.rollback()
                 return jsonify({"error": f"Product ID {product_id} is invalid or deleted."}), 400
 
@@ -207,7 +209,7 @@ def create_purchase():
     }
 })
 def update_purchase(id):
-    purchase = Purchase.query.filter_by(id=id, is_deleted=False).first()
+    purchase = Purchase.query.filter_by(id=id).first()
     if not purchase:
         return jsonify({"error": "Purchase not found or already deleted."}), 404
 
@@ -264,12 +266,13 @@ def update_purchase(id):
     }
 })
 def delete_purchase(id):
-    purchase = Purchase.query.filter_by(id=id, is_deleted=False).first()
+    purchase = Purchase.query.filter_by(id=id).first()
     if not purchase:
         return jsonify({"error": "Purchase not found or already deleted"}), 404
 
     try:
         purchase.is_deleted = True
+        purchase.deleted_at = datetime.utcnow()
         db.session.commit()
         return jsonify({"message": "Purchase soft-deleted successfully."}), 200
 
@@ -0,0 +1,717 @@
+from flask import Blueprint, request, jsonify
+from ..models import db, Category, Product, BusinessLocation, DailyMovementRollup, StockBalanceSnapshot
+from ..movements import rebuild_movement_rollups, rebuild_stock_balances
+from ..classification import classify_products
+import click
+from datetime import datetime, time, timedelta
+from collections import defaultdict
+from sqlalchemy import func, case, select
+from flasgger import swag_from
+from ..replica import replica_reads
+from ..archive import archive_horizon, latest_unit_cost, movement_history, supplier_names
+
+# GET reports read from the replica; the recompute POST still goes to the primary
+reports_bp = replica_reads(Blueprint("reports", __name__, url_prefix="/reports"))
+
+DATE_FILTER_PARAMETERS = [
+    {
+        'name': 'from',
+        'in': 'query',
+        'required': False,
+        'description': 'Start date (inclusive), ISO format e.g. 2025-06-01',
+        'schema': {'type': 'string', 'format': 'date'}
+    },
+    {
+        'name': 'to',
+        'in': 'query',
+        'required': False,
+        'description': 'End date (inclusive), ISO format e.g. 2025-06-30',
+        'schema': {'type': 'string', 'format': 'date'}
+    }
+]
+
+
+def _parse_date_range(args):
+    """
+    Read the optional `from` / `to` query params.
+    A date-only `to` covers the whole day, so it is returned as the next midnight
+    and callers compare with `<`.
+    """
+    start = args.get("from")
+    end = args.get("to")
+
+    start_dt = datetime.fromisoformat(start) if start else None
+    end_dt = None
+    if end:
+        end_dt = datetime.fromisoformat(end)
+        if len(end) == 10:
+            end_dt += timedelta(days=1)
+
+    return start_dt, end_dt
+
+
+def _parse_as_of(args):
+    """
+    `to` for point-in-time reports, as the exclusive end like _parse_date_range.
+    They have no start, so a `from` raises ValueError rather than being silently dropped.
+    """
+    if args.get("from"):
+        raise ValueError("This report is stock as of a date; pass `to` only, not `from`")
+    try:
+        return _parse_date_range(args)[1]
+    except ValueError:
+        raise ValueError("Invalid date. Use ISO format, e.g. 2025-06-30")
+
+
+def _month_bucket(session, column):
+    # SQLite has no date_trunc, so bucket with strftime there
+    if session.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+
+def _period_start(session, column, bucket):
+    """ISO date string of the day, week (Monday) or month a date column falls in."""
+    if session.get_bind().dialect.name == "sqlite":
+        if bucket == "week":
+            return func.date(column, "-6 days", "weekday 1")
+        if bucket == "month":
+            return func.strftime("%Y-%m-01", column)
+        return func.date(column)
+    if bucket == "day":
+        return func.to_char(column, "YYYY-MM-DD")
+    return func.to_char(func.date_trunc(bucket, column), "YYYY-MM-DD")
+
+
+def inventory_value_report(session, end=None):
+    """
+    Stock and value per category as of `end` (exclusive; now when None), valued at
+    each product's latest purchase cost before `end`.
+    """
+    # Movements archived out of closed periods are carried forward in the snapshots,
+    # which hold as of the archive horizon; before it, the archived rows are summed instead
+    horizon = archive_horizon(session)
+    from_snapshot = end is None or horizon is None or end >= datetime.combine(horizon, datetime.min.time())
+
+    purchase_lines = movement_history(
+        "purchases",
+        lambda header, items: [items.c.id, items.c.product_id, items.c.quantity, items.c.unit_cost, header.c.purchase_date],
+        end=end, with_items=True, closed=not from_snapshot
+    )
+    # IN adds, OUT removes
+    transfer_lines = movement_history(
+        "stock_transfers",
+        lambda header, items: [
+            items.c.product_id,
+            case(
+                (header.c.transfer_type == "IN", items.c.quantity),
+                (header.c.transfer_type == "OUT", -items.c.quantity),
+                else_=0
+            ).label("quantity")
+        ],
+        end=end, with_items=True, closed=not from_snapshot
+    )
+
+    purchased = (
+        select(purchase_lines.c.product_id, func.sum(purchase_lines.c.quantity).label("quantity"))
+        .group_by(purchase_lines.c.product_id)
+        .subquery()
+    )
+    transferred = (
+        select(transfer_lines.c.product_id, func.sum(transfer_lines.c.quantity).label("quantity"))
+        .group_by(transfer_lines.c.product_id)
+        .subquery()
+    )
+
+    # Latest non-deleted purchase unit cost per product
+    ranked_costs = (
+        select(
+            purchase_lines.c.product_id,
+            purchase_lines.c.unit_cost,
+            purchase_lines.c.purchase_date,
+            func.row_number().over(
+                partition_by=purchase_lines.c.product_id,
+                order_by=(purchase_lines.c.purchase_date.desc(), purchase_lines.c.id.desc())
+            ).label("rank")
+        )
+        .subquery()
+    )
+
+    stock = func.coalesce(purchased.c.quantity, 0) + func.coalesce(transferred.c.quantity, 0)
+    unit_cost = ranked_costs.c.unit_cost
+    if from_snapshot:
+        stock = stock + func.coalesce(StockBalanceSnapshot.quantity, 0)
+        unit_cost = latest_unit_cost(ranked_costs.c.unit_cost, ranked_costs.c.purchase_date)
+    value = stock * func.coalesce(unit_cost, 0)
+
+    query = (
+        select(
+            Category.id,
+            Category.name,
+            func.count(Product.id).label("product_count"),
+            func.sum(stock).label("total_stock"),
+            func.sum(value).label("inventory_value")
+        )
+        .join(Product, Product.category_id == Category.id)
+        .outerjoin(purchased, purchased.c.product_id == Product.id)
+        .outerjoin(transferred, transferred.c.product_id == Product.id)
+        .outerjoin(ranked_costs, (ranked_costs.c.product_id == Product.id) & (ranked_costs.c.rank == 1))
+        .group_by(Category.id, Category.name)
+        .order_by(func.sum(value).desc())
+    )
+    if from_snapshot:
+        query = query.outerjoin(StockBalanceSnapshot, StockBalanceSnapshot.product_id == Product.id)
+    rows = session.execute(query).all()
+
+    categories = [
+        {
+            "category_id": r.id,
+            "category_name": r.name,
+            "product_count": r.product_count,
+            "total_stock": int(r.total_stock or 0),
+            "inventory_value": round(float(r.inventory_value or 0), 2)
+        } for r in rows
+    ]
+
+    return {
+        "total_value": round(sum(c["inventory_value"] for c in categories), 2),
+        "total_stock": sum(c["total_stock"] for c in categories),
+        "categories": categories
+    }
+
+
+@reports_bp.route("/inventory_value_by_category", methods=["GET"])
+@swag_from({
+    'tags': ['Reports'],
+    'summary': 'Inventory value grouped by category',
+    'description': 'Stock on hand per category valued at the latest non-deleted purchase unit cost. '
+                   'Use `to` to value the inventory as of a past date; `from` is rejected, as stock '
+                   'is a balance, not a sum over a range.',
+    'parameters': [DATE_FILTER_PARAMETERS[1]],
+    'responses': {
+        200: {
+            'description': 'Inventory value per category',
+            'content': {
+                'application/json': {
+                    'example': {
+                        "total_value": 4523.75,
+                        "total_stock": 265,
+                        "categories": [
+                            {
+                                "category_id": 1,
+                                "category_name": "Groceries",
+                                "product_count": 4,
+                                "total_stock": 120,
+                                "inventory_value": 2300.0
+                            }
+                        ]
+                    }
+                }
+            }
+        },
+        400: {'description': 'Invalid date, or a `from` filter'}
+    }
+})
+def inventory_value_by_category():
+    try:
+        end = _parse_as_of(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(inventory_value_report(db.session, end)), 200
+
+
+def supplier_purchases_report(session, start, end):
+    """Purchase count and spend per supplier, archived closed periods included."""
+    # Spend with suppliers deleted or archived since still counts; only deleted purchases are left out
+    purchases = movement_history(
+        "purchases", lambda header, items: [header.c.id, header.c.supplier_id, header.c.total_cost], start, end
+    )
+    suppliers = supplier_names()
+    rows = session.execute(
+        select(
+            suppliers.c.id,
+            suppliers.c.name,
+            func.count(purchases.c.id).label("purchase_count"),
+            func.sum(purchases.c.total_cost).label("total_spent")
+        )
+        .join(purchases, suppliers.c.id == purchases.c.supplier_id)
+        .group_by(suppliers.c.id, suppliers.c.name)
+        .order_by(func.sum(purchases.c.total_cost).desc())
+    ).all()
+
+    suppliers = [
+        {
+            "supplier_id": r.id,
+            "supplier_name": r.name,
+            "purchase_count": r.purchase_count,
+            "total_spent": round(float(r.total_spent or 0), 2)
+        } for r in rows
+    ]
+
+    return {
+        "total_spent": round(sum(s["total_spent"] for s in suppliers), 2),
+        "purchase_count": sum(s["purchase_count"] for s in suppliers),
+        "suppliers": suppliers
+    }
+
+
+@reports_bp.route("/purchases_by_supplier", methods=["GET"])
+@swag_from({
+    'tags': ['Reports'],
+    'summary': 'Purchase totals grouped by supplier',
+    'parameters': DATE_FILTER_PARAMETERS,
+    'responses': {
+        200: {
+            'description': 'Purchase count and spend per supplier',
+            'content': {
+                'application/json': {
+                    'example': {
+                        "total_spent": 12000.0,
+                        "purchase_count": 14,
+                        "suppliers": [
+                            {
+                                "supplier_id": 1,
+                                "supplier_name": "Fresh Market",
+                                "purchase_count": 9,
+                                "total_spent": 8000.0
+                            }
+                        ]
+                    }
+                }
+            }
+        },
+        400: {'description': 'Invalid date filter'}
+    }
+})
+def purchases_by_supplier():
+    try:
+        start, end = _parse_date_range(request.args)
+    except ValueError:
+        return jsonify({"error": "Invalid date. Use ISO format, e.g. 2025-06-30"}), 400
+
+    return jsonify(supplier_purchases_report(db.session, start, end)), 200
+
+
+def monthly_purchases_report(session, start, end):
+    """Purchase count and spend per calendar month, archived closed periods included."""
+    purchases = movement_history(
+        "purchases", lambda header, items: [header.c.id, header.c.total_cost, header.c.purchase_date], start, end
+    )
+    month = _month_bucket(session, purchases.c.purchase_date).label("month")
+    rows = session.execute(
+        select(
+            month,
+            func.count(purchases.c.id).label("purchase_count"),
+            func.sum(purchases.c.total_cost).label("total_spent")
+        )
+        .group_by(month)
+        .order_by(month)
+    ).all()
+
+    return [
+        {
+            "month": r.month,
+            "purchase_count": r.purchase_count,
+            "total_spent": round(float(r.total_spent or 0), 2)
+        } for r in rows
+    ]
+
+
+@reports_bp.route("/purchases_by_month", methods=["GET"])
+@swag_from({
+    'tags': ['Reports'],
+    'summary': 'Purchase totals grouped by month',
+    'parameters': DATE_FILTER_PARAMETERS,
+    'responses': {
+        200: {
+            'description': 'Purchase count and spend per calendar month',
+            'content': {
+                'application/json': {
+                    'example': [
+                        {"month": "2025-05", "purchase_count": 6, "total_spent": 4200.0},
+                        {"month": "2025-06", "purchase_count": 8, "total_spent": 7800.0}
+                    ]
+                }
+            }
+        },
+        400: {'description': 'Invalid date filter'}
+    }
+})
+def purchases_by_month():
+    try:
+        start, end = _parse_date_range(request.args)
+    except ValueError:
+        return jsonify({"error": "Invalid date. Use ISO format, e.g. 2025-06-30"}), 400
+
+    return jsonify(monthly_purchases_report(db.session, start, end)), 200
+
+
+def location_transfers_report(session, start, end):
+    """Transfer count and quantity per location and direction, archived closed periods included."""
+    lines = movement_history(
+        "stock_transfers",
+        lambda header, items: [header.c.id, header.c.location_id, header.c.transfer_type, items.c.quantity],
+        start, end, with_items=True
+    )
+    # Locations deleted since keep their name here; only deleted transfers are left out
+    rows = session.execute(
+        select(
+            lines.c.location_id,
+            BusinessLocation.name.label("location_name"),
+            lines.c.transfer_type,
+            func.count(func.distinct(lines.c.id)).label("transfer_count"),
+            func.coalesce(func.sum(lines.c.quantity), 0).label("quantity")
+        )
+        .select_from(lines)
+        .outerjoin(BusinessLocation, BusinessLocation.id == lines.c.location_id)
+        .group_by(lines.c.location_id, BusinessLocation.name, lines.c.transfer_type)
+        .order_by(BusinessLocation.name, lines.c.transfer_type)
+        .execution_options(include_deleted=True)
+    ).all()
+
+    return [
+        {
+            "location_id": r.location_id,
+            "location_name": r.location_name or "No location",
+            "transfer_type": r.transfer_type,
+            "transfer_count": r.transfer_count,
+            "quantity": int(r.quantity)
+        } for r in rows
+    ]
+
+
+@reports_bp.route("/transfers_by_location", methods=["GET"])
+@swag_from({
+    'tags': ['Reports'],
+    'summary': 'Stock transfer totals grouped by location and transfer type',
+    'parameters': DATE_FILTER_PARAMETERS,
+    'responses': {
+        200: {
+            'description': 'Transfer count and item quantity per location and type',
+            'content': {
+                'application/json': {
+                    'example': [
+                        {
+                            "location_id": 2,
+                            "location_name": "Warehouse B",
+                            "transfer_type": "OUT",
+                            "transfer_count": 5,
+                            "quantity": 230
+                        }
+                    ]
+                }
+            }
+        },
+        400: {'description': 'Invalid date filter'}
+    }
+})
+def transfers_by_location():
+    try:
+        start, end = _parse_date_range(request.args)
+    except ValueError:
+        return jsonify({"error": "Invalid date. Use ISO format, e.g. 2025-06-30"}), 400
+
+    return jsonify(location_transfers_report(db.session, start, end)), 200
+
+
+def movement_series_report(session, bucket, start, end, product_id=None, location_id=None):
+    """Movement quantity and value per period and movement type, from the daily rollups."""
+    filters = []
+    if start:
+        filters.append(DailyMovementRollup.day >= start.date())
+    if end:
+        # Rollups are whole days, so a `to` with a time still takes in the day it falls on
+        end_day = end.date() if end.time() == time.min else end.date() + timedelta(days=1)
+        filters.append(DailyMovementRollup.day < end_day)
+    if product_id:
+        filters.append(DailyMovementRollup.product_id == product_id)
+    if location_id:
+        filters.append(DailyMovementRollup.location_id == location_id)
+
+    period = _period_start(session, DailyMovementRollup.day, bucket).label("period")
+    rows = (
+        session.query(
+            period,
+            DailyMovementRollup.movement_type,
+            func.sum(DailyMovementRollup.quantity).label("quantity"),
+            func.sum(DailyMovementRollup.value).label("value")
+        )
+        .filter(*filters)
+        .group_by(period, DailyMovementRollup.movement_type)
+        .order_by(period)
+        .all()
+    )
+
+    series = defaultdict(dict)
+    for r in rows:
+        series[r.period][r.movement_type] = {
+            "quantity": int(r.quantity or 0),
+            "value": round(float(r.value or 0), 2)
+        }
+
+    return {
+        "bucket": bucket,
+        "series": [{"period": p, "movements": m} for p, m in series.items()]
+    }
+
+
+@reports_bp.route("/movements/series", methods=["GET"])
+@swag_from({
+    'tags': ['Reports'],
+    'summary': 'Time-bucketed stock movement series',
+    'description': 'Quantity and value moved per period and movement type (PURCHASE, IN, OUT), '
+                   'read from the daily movement rollups.',
+    'parameters': DATE_FILTER_PARAMETERS + [
+        {
+            'name': 'bucket',
+            'in': 'query',
+            'required': False,
+            'description': 'Period size: day (default), week or month',
+            'schema': {'type': 'string', 'enum': ['day', 'week', 'month']}
+        },
+        {
+            'name': 'product_id',
+            'in': 'query',
+            'required': False,
+            'schema': {'type': 'integer'}
+        },
+        {
+            'name': 'location_id',
+            'in': 'query',
+            'required': False,
+            'schema': {'type': 'integer'}
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Movement totals per period',
+            'content': {
+                'application/json': {
+                    'example': {
+                        "bucket": "week",
+                        "series": [
+                            {
+                                "period": "2025-06-23",
+                                "movements": {
+                                    "PURCHASE": {"quantity": 150, "value": 3750.0},
+                                    "OUT": {"quantity": 45, "value": 1125.0}
+                                }
+                            }
+                        ]
+                    }
+                }
+            }
+        },
+        400: {'description': 'Invalid bucket or date filter'}
+    }
+})
+def movement_series():
+    bucket = request.args.get("bucket", "day")
+    if bucket not in ("day", "week", "month"):
+        return jsonify({"error": "bucket must be one of 'day', 'week' or 'month'"}), 400
+
+    try:
+        start, end = _parse_date_range(request.args)
+    except ValueError:
+        return jsonify({"error": "Invalid date. Use ISO format, e.g. 2025-06-30"}), 400
+
+    return jsonify(movement_series_report(
+        db.session, bucket, start, end,
+        product_id=request.args.get("product_id", type=int),
+        location_id=request.args.get("location_id", type=int)
+    )), 200
+
+
+@reports_bp.route("/reorder_suggestions", methods=["GET"])
+@swag_from({
+    'tags': ['Reports'],
+    'summary': 'Forecast-based reorder suggestions',
+    'description': 'Forecasts daily demand from OUT transfer history (moving average and exponential smoothing) '
+                   'and suggests reorder quantities for products whose stock will not cover the lead time plus '
+                   '`cover_days`. Sorted by days of cover, most urgent first.',
+    'parameters': [
+        {'name': 'history_days', 'in': 'query', 'required': False, 'schema': {'type': 'integer'},
+         'description': 'Days of history to forecast from (7-1095, default 365)'},
+        {'name': 'window', 'in': 'query', 'required': False, 'schema': {'type': 'integer'},
+         'description': 'Moving average window in days (default 28)'},
+        {'name': 'alpha', 'in': 'query', 'required': False, 'schema': {'type': 'number'},
+         'description': 'Exponential smoothing factor between 0 and 1 (default 0.3)'},
+        {'name': 'lead_time_days', 'in': 'query', 'required': False, 'schema': {'type': 'integer'},
+         'description': 'Supplier lead time in days (default 7)'},
+        {'name': 'cover_days', 'in': 'query', 'required': False, 'schema': {'type': 'integer'},
+         'description': 'Days of demand a reorder should cover after arrival (default 30)'}
+    ],
+    'responses': {
+        200: {
+            'description': 'Reorder suggestions',
+            'content': {
+                'application/json': {
+                    'example': [
+                        {
+                            "product_id": 3,
+                            "name": "Detergent",
+                            "sku": "CLN-321",
+                            "stock_level": 12,
+                            "reorder_point": 10,
+                            "moving_average": 2.5,
+                            "exponential_smoothing": 2.1,
+                            "daily_demand": 2.3,
+                            "days_of_cover": 5.2,
+                            "suggested_quantity": 73
+                        }
+                    ]
+                }
+            }
+        },
+        400: {'description': 'Invalid forecasting parameter'}
+    }
+})
+def get_reorder_suggestions():
+    history_days = request.args.get("history_days", 365, type=int)
+    window = request.args.get("window", 28, type=int)
+    alpha = request.args.get("alpha", 0.3, type=float)
+    lead_time_days = request.args.get("lead_time_days", 7, type=int)
+    cover_days = request.args.get("cover_days", 30, type=int)
+
+    if not 7 <= history_days <= 1095:
+        return jsonify({"error": "history_days must be between 7 and 1095"}), 400
+    if not 1 <= window <= history_days:
+        return jsonify({"error": "window must be between 1 and history_days"}), 400
+    if not 0 < alpha < 1:
+        return jsonify({"error": "alpha must be between 0 and 1"}), 400
+    if lead_time_days < 0 or cover_days < 0:
+        return jsonify({"error": "lead_time_days and cover_days cannot be negative"}), 400
+
+    from ..forecasting import reorder_suggestions  # deferred: numpy adds ~65ms to every worker boot
+    return jsonify(reorder_suggestions(
+        history_days=history_days,
+        window=window,
+        alpha=alpha,
+        lead_time_days=lead_time_days,
+        cover_days=cover_days
+    )), 200
+
+
+@reports_bp.route("/abc_classification", methods=["GET"])
+@swag_from({
+    'tags': ['Reports'],
+    'summary': 'ABC classification of products',
+    'description': 'Products ranked by annual consumption value (outbound quantity over the last year x latest unit '
+                   'cost). Class A covers the first 80% of total value, B the next 15% and C the rest.',
+    'parameters': [
+        {
+            'name': 'class',
+            'in': 'query',
+            'required': False,
+            'description': 'Only return products in this class',
+            'schema': {'type': 'string', 'enum': ['A', 'B', 'C']}
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Class counts and classified products',
+            'content': {
+                'application/json': {
+                    'example': {
+                        "summary": {"A": 12, "B": 25, "C": 140, "unclassified": 3},
+                        "products": [
+                            {
+                                "product_id": 3,
+                                "name": "Detergent",
+                                "sku": "CLN-321",
+                                "abc_class": "A",
+                                "annual_consumption_value": 125000.0
+                            }
+                        ]
+                    }
+                }
+            }
+        },
+        400: {'description': 'Invalid class filter'}
+    }
+})
+def get_abc_classification():
+    abc_class = request.args.get("class")
+    if abc_class and abc_class not in ("A", "B", "C"):
+        return jsonify({"error": "class must be 'A', 'B' or 'C'"}), 400
+
+    counts = dict(
+        db.session.query(Product.abc_class, func.count(Product.id))
+        .group_by(Product.abc_class)
+        .all()
+    )
+
+    query = (
+        db.session.query(Product.id, Product.name, Product.sku, Product.abc_class, Product.annual_consumption_value)
+        .filter(Product.abc_class.isnot(None))
+        .order_by(Product.annual_consumption_value.desc(), Product.id)
+    )
+    if abc_class:
+        query = query.filter(Product.abc_class == abc_class)
+
+    return jsonify({
+        "summary": {
+            "A": counts.get("A", 0),
+            "B": counts.get("B", 0),
+            "C": counts.get("C", 0),
+            "unclassified": counts.get(None, 0)
+        },
+        "products": [
+            {
+                "product_id": r.id,
+                "name": r.name,
+                "sku": r.sku,
+                "abc_class": r.abc_class,
+                "annual_consumption_value": round(r.annual_consumption_value or 0, 2)
+            } for r in query.all()
+        ]
+    }), 200
+
+
+@reports_bp.route("/abc_classification/recompute", methods=["POST"])
+@swag_from({
+    'tags': ['Reports'],
+    'summary': 'Recompute the ABC classification',
+    'description': 'Refreshes consumption values for products with new movements (or all products with '
+                   '`?full=1`) and re-ranks every product.',
+    'parameters': [
+        {
+            'name': 'full',
+            'in': 'query',
+            'required': False,
+            'description': 'Recompute every product instead of only those with new movements',
+            'schema': {'type': 'boolean'}
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Recompute summary',
+            'content': {
+                'application/json': {
+                    'example': {"refreshed": 42, "reclassified": 5}
+                }
+            }
+        }
+    }
+})
+def recompute_abc_classification():
+    full = request.args.get("full", "").lower() in ("1", "true", "yes")
+    refreshed, reclassified = classify_products(full=full)
+    return jsonify({"refreshed": refreshed, "reclassified": reclassified}), 200
+
+
+@reports_bp.cli.command("rebuild-rollups")
+def rebuild_rollups_command():
+    """Recompute the daily movement rollups and stock balances from the full movement history."""
+    rows = rebuild_movement_rollups()
+    balances = rebuild_stock_balances()
+    print(f"✅ Rebuilt daily movement rollups ({rows} rows) and stock balances ({balances} products).")
+
+
+@reports_bp.cli.command("classify-abc")
+@click.option("--full", is_flag=True, help="Recompute every product, not just those with new movements.")
+def classify_abc_command(full):
+    """Refresh ABC classes for products with new movements."""
+    refreshed, reclassified = classify_products(full=full)
+    print(f"✅ ABC classification refreshed for {refreshed} products ({reclassified} changed class).")
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from ..models import db, StockTransferItem, StockTransfer, Product
 from flasgger import swag_from
+from ..replica import replica_reads
 
 stock_transfer_item_bp = Blueprint("stock_transfer_item_bp", __name__)
 
@@ -27,6 +28,7 @@ stock_transfer_item_bp = Blueprint("stock_transfer_item_bp", __name__)
         }
     }
 })
+@replica_reads
 def get_stock_transfer_items():
     items = StockTransferItem.query.all()
     return jsonify([item.to_dict() for item in items]), 200
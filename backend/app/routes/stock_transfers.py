@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
-from ..models import db, StockTransfer, StockTransferItem, BusinessLocation, Product
+from ..models import db, StockTransfer, StockTransferItem, BusinessLocation, Product, to_dict_loader_options
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from flasgger import swag_from
+from ..replica import replica_reads
 
 stock_transfer_bp = Blueprint("stock_transfer_bp", __name__)
 EAT = ZoneInfo("Africa/Nairobi")
@@ -31,8 +32,13 @@ EAT = ZoneInfo("Africa/Nairobi")
         }
     }
 })
+@replica_reads
 def get_stock_transfers():
-    transfers = StockTransfer.query.filter_by(is_deleted=False).all()
+    transfers = (
+        StockTransfer.query
+        .options(*to_dict_loader_options(StockTransfer))
+        .all()
+    )
     return jsonify([transfer.to_dict() for transfer in transfers]), 200
 
 
@@ -57,7 +63,7 @@ def get_stock_transfers():
 })
 def get_stock_transfer(id):
     transfer = StockTransfer.query.get(id)
-    if not transfer or transfer.is_deleted:
+    if not transfer:
         return jsonify({"error": "Stock transfer not found"}), 404
     return jsonify(transfer.to_dict()), 200
 
@@ -132,7 +138,7 @@ def create_stock_transfer():
                 return jsonify({"error": "Each item must have product_id and quantity"}), 400
 
             product = Product.query.get(product_id)
-            if not product or product.is_deleted:
+            if not product:
                 return jsonify({"error": f"Invalid or deleted product ID {product_id}"}), 400
 
             if not isinstance(quantity, int) or quantity <= 0:
@@ -192,7 +198,7 @@ def create_stock_transfer():
 })
 def update_stock_transfer(id):
     transfer = StockTransfer.query.get(id)
-    if not transfer or transfer.is_deleted:
+    if not transfer:
         return jsonify({"error": "Stock transfer not found"}), 404
 
     data = request.get_json()
@@ -232,11 +238,12 @@ def update_stock_transfer(id):
 })
 def delete_stock_transfer(id):
     transfer = StockTransfer.query.get(id)
-    if not transfer or transfer.is_deleted:
+    if not transfer:
         return jsonify({"error": "Stock transfer not found or already deleted"}), 404
 
     try:
         transfer.is_deleted = True
+        transfer.deleted_at = datetime.utcnow()
         db.session.commit()
         return jsonify({"message": f"Stock transfer #{id} marked as deleted"}), 200
 
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
+from datetime import datetime
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import or_, false
 from flasgger import swag_from
 from ..models import db, Supplier
 
@@ -34,9 +34,7 @@ suppliers_bp = Blueprint("suppliers", __name__, url_prefix="/suppliers")
     }
 })
 def get_suppliers():
-    suppliers = Supplier.query.filter(
-        or_(Supplier.is_deleted == false(), Supplier.is_deleted == None)
-    ).all()
+    suppliers = Supplier.query.all()
     return jsonify([s.to_dict() for s in suppliers]), 200
 
 
@@ -59,9 +57,9 @@ def get_suppliers():
     }
 })
 def get_supplier(id):
-    supplier = Supplier.query.get_or_404(id)
+    supplier = Supplier.query.get(id)
 
-    if supplier.is_deleted:
+    if not supplier:
         return jsonify({"error": f"Supplier #{id} not found"}), 404
 
     return jsonify(supplier.to_dict()), 200
@@ -154,9 +152,9 @@ def update_supplier(id):
     if not data:
         return jsonify({"error": "Missing JSON body"}), 400
 
-    supplier = Supplier.query.get_or_404(id)
+    supplier = Supplier.query.get(id)
 
-    if supplier.is_deleted:
+    if not supplier:
         return jsonify({"error": f"Supplier #{id} not found"}), 404
 
     try:
@@ -193,13 +191,14 @@ def update_supplier(id):
     }
 })
 def delete_supplier(id):
-    supplier = Supplier.query.get_or_404(id)
+    supplier = Supplier.query.execution_options(include_deleted=True).get_or_404(id)
 
     if supplier.is_deleted:
         return jsonify({"message": f"Supplier #{id} already deleted"}), 400
 
     try:
         supplier.is_deleted = True
+        supplier.deleted_at = datetime.utcnow()
         db.session.commit()
         return jsonify({"message": f"Supplier #{id} soft-deleted"}), 200
 
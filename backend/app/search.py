@@ -0,0 +1,176 @@
+"""
+Indexed product search.
+
+SQLite keeps an FTS5 table (`product_search`, rowid = product id) over product
+name, SKU, description and category name, ranked with bm25. Postgres keeps the
+same document in `product_search` with a weighted `tsvector` (GIN indexed) and
+a pg_trgm index for fuzzy matches on misspellings.
+
+The index is updated from an after_flush listener whenever a product or a
+category name changes, in the same transaction as the write.
+"""
+import re
+
+from flask.cli import AppGroup
+from sqlalchemy import event, inspect, text
+
+from .models import db, Product, Category
+
+PRODUCT_FIELDS = ("name", "sku", "description", "category_id", "is_deleted")
+CATEGORY_FIELDS = ("name", "is_deleted")
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS product_search USING fts5(
+        name, sku, description, category,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """
+]
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE TABLE IF NOT EXISTS product_search (
+        product_id INTEGER PRIMARY KEY REFERENCES products (id) ON DELETE CASCADE,
+        document TEXT NOT NULL,
+        search_vector TSVECTOR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_product_search_vector ON product_search USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_product_search_trgm ON product_search USING GIN (document gin_trgm_ops)",
+]
+
+# Only active products in active categories are searchable
+_INDEXABLE = """
+    FROM products p
+    JOIN categories c ON c.id = p.category_id
+    WHERE p.is_deleted = false AND c.is_deleted = false
+"""
+
+SQLITE_INSERT = """
+    INSERT INTO product_search (rowid, name, sku, description, category)
+    SELECT p.id, p.name, COALESCE(p.sku, ''), COALESCE(p.description, ''), c.name
+""" + _INDEXABLE
+
+POSTGRES_INSERT = """
+    INSERT INTO product_search (product_id, document, search_vector)
+    SELECT p.id,
+           concat_ws(' ', p.name, p.sku, p.description, c.name),
+           setweight(to_tsvector('simple', p.name), 'A')
+           || setweight(to_tsvector('simple', COALESCE(p.sku, '')), 'A')
+           || setweight(to_tsvector('simple', c.name), 'B')
+           || setweight(to_tsvector('simple', COALESCE(p.description, '')), 'C')
+""" + _INDEXABLE
+
+SQLITE_SEARCH = """
+    SELECT p.id, p.name, p.sku, p.unit, p.category_id, c.name AS category,
+           COALESCE(b.quantity, 0) AS stock_level,
+           -bm25(product_search, 10.0, 10.0, 1.0, 3.0) AS score
+    FROM product_search
+    JOIN products p ON p.id = product_search.rowid
+    JOIN categories c ON c.id = p.category_id
+    LEFT JOIN stock_balances b ON b.product_id = p.id
+    WHERE product_search MATCH :match
+    ORDER BY bm25(product_search, 10.0, 10.0, 1.0, 3.0)
+    LIMIT :limit OFFSET :offset
+"""
+
+POSTGRES_SEARCH = """
+    SELECT p.id, p.name, p.sku, p.unit, p.category_id, c.name AS category,
+           COALESCE(b.quantity, 0) AS stock_level,
+           ts_rank(s.search_vector, to_tsquery('simple', :match)) + word_similarity(:q, s.document) AS score
+    FROM product_search s
+    JOIN products p ON p.id = s.product_id
+    JOIN categories c ON c.id = p.category_id
+    LEFT JOIN stock_balances b ON b.product_id = p.id
+    WHERE s.search_vector @@ to_tsquery('simple', :match) OR :q <% s.document
+    ORDER BY score DESC, p.id
+    LIMIT :limit OFFSET :offset
+"""
+
+
+def _is_postgres(bind):
+    return bind.dialect.name == "postgresql"
+
+
+def create_search_index(connection):
+    for statement in (POSTGRES_DDL if _is_postgres(connection) else SQLITE_DDL):
+        connection.execute(text(statement))
+
+
+def reindex_products(connection, product_ids=None):
+    """Replace the index rows for `product_ids` (the whole index when None)."""
+    postgres = _is_postgres(connection)
+    key = "product_id" if postgres else "rowid"
+    insert = POSTGRES_INSERT if postgres else SQLITE_INSERT
+
+    if product_ids is None:
+        connection.execute(text("DELETE FROM product_search"))
+        connection.execute(text(insert))
+        return
+
+    ids = ", ".join(str(int(i)) for i in product_ids)
+    connection.execute(text(f"DELETE FROM product_search WHERE {key} IN ({ids})"))
+    connection.execute(text(f"{insert} AND p.id IN ({ids})"))
+
+
+def search_products(q, limit, offset):
+    """Ranked matches for a free-text query; every term is matched as a prefix."""
+    terms = re.findall(r"\w+", q.lower())
+    if not terms:
+        return []
+
+    if _is_postgres(db.engine):
+        sql, match = POSTGRES_SEARCH, " & ".join(f"{t}:*" for t in terms)
+    else:
+        sql, match = SQLITE_SEARCH, " ".join(f'"{t}"*' for t in terms)
+
+    return db.session.execute(
+        text(sql), {"match": match, "q": q, "limit": limit, "offset": offset}
+    ).all()
+
+
+def _changed(obj, fields):
+    state = inspect(obj)
+    return any(state.attrs[f].history.has_changes() for f in fields)
+
+
+@event.listens_for(db.session, "after_flush")
+def sync_search_index(session, flush_context):
+    product_ids = set()
+    category_ids = set()
+
+    for obj in session.new:
+        if isinstance(obj, Product):
+            product_ids.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Product) and _changed(obj, PRODUCT_FIELDS):
+            product_ids.add(obj.id)
+        elif isinstance(obj, Category) and _changed(obj, CATEGORY_FIELDS):
+            category_ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Product):
+            product_ids.add(obj.id)
+
+    if category_ids:
+        product_ids.update(
+            pid for (pid,) in session.query(Product.id).filter(Product.category_id.in_(category_ids))
+            .execution_options(include_deleted=True)
+        )
+
+    if product_ids:
+        reindex_products(session.connection(), product_ids)
+
+
+search_cli = AppGroup("search", help="Product search index commands.")
+
+
+@search_cli.command("rebuild")
+def rebuild_search_command():
+    """Rebuild the product search index from scratch."""
+    with db.engine.begin() as connection:
+        create_search_index(connection)
+        reindex_products(connection)
+    print("✅ Product search index rebuilt.")
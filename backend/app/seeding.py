@@ -0,0 +1,360 @@
+"""
+Bulk synthetic data for benchmarks and load tests.
+
+    flask seed generate --products 5000 --purchases 300000 --transfers 200000 --seed 42
+
+Rows are written with Core bulk inserts (COPY on Postgres) instead of ORM
+objects, so the flush listeners never see them. The daily movement rollups are
+accumulated while generating, valuing transfers at the latest purchase cost as
+`rebuild_movement_rollups` does (that query's per-row cost lookup is too slow
+for millions of rows), and balances, the search index and alerts are rebuilt at
+the end. The same options, seed and end date always produce the same data.
+
+The data is shaped like a real shop's:
+- product popularity is Zipf-like, so a few products account for most movements;
+- dates follow a seasonal curve (a December peak, a mid-year lull, quiet
+  Sundays) and the business grows over the period;
+- a few suppliers and locations get most of the traffic;
+- unit costs drift upward over time around a per-product base cost;
+- OUT transfers never take more than is in stock at that moment;
+- a share of products, suppliers, purchases and transfers is soft-deleted.
+"""
+import csv
+import io
+import itertools
+import math
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, select, delete, text
+
+from .models import (
+    db, Category, Supplier, BusinessLocation, Product, Purchase, PurchaseItem, StockTransfer, StockTransferItem,
+    DailyMovementRollup, AbcStaleProduct, Job
+)
+from .movements import rebuild_stock_balances
+from .search import create_search_index, reindex_products
+from .alerts import evaluate_alerts
+
+CHUNK = 20_000
+UTC_OFFSET_HOURS = 3  # trading hours are East Africa Time; dates are stored in UTC
+
+CATEGORIES = [
+    "Groceries", "Beverages", "Electronics", "Stationery", "Cleaning Supplies", "Agriculture",
+    "Hardware", "Personal Care", "Textiles", "Kitchenware", "Automotive", "Pharmacy",
+]
+PRODUCT_NOUNS = [
+    "Rice", "Maize Flour", "Cooking Oil", "Sugar", "Tea Leaves", "Soap", "Detergent", "Notebook", "Pen",
+    "USB Cable", "LED Bulb", "Battery", "Fertilizer", "Seeds", "Padlock", "Nails", "Paint", "Toothpaste",
+    "Lotion", "Blanket", "Bedsheet", "Sufuria", "Thermos", "Engine Oil", "Brake Pads", "Paracetamol",
+]
+PRODUCT_VARIANTS = ["Premium", "Classic", "Value", "Family", "Mini", "Jumbo", "Eco", "Pro", "Lite", "Select"]
+UNITS = ["pcs", "kg", "ltr", "box", "pack"]
+LOCATION_NAMES = ["Main Store", "Central Warehouse", "Westlands Branch", "Mombasa Depot", "Kisumu Branch"]
+SUPPLIER_WORDS = ["Savannah", "Rift", "Coastal", "Highland", "Lakeside", "Sunrise", "Acacia", "Baobab", "Jambo"]
+
+
+def zipf_weights(n, exponent):
+    return [1 / rank ** exponent for rank in range(1, n + 1)]
+
+
+def seasonal_weights(start, days):
+    """Relative activity per day: a December peak, fewer sales on Sundays and steady growth."""
+    weights = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        season = 1 + 0.35 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 350) / 365.25)
+        weekday = {5: 1.15, 6: 0.45}.get(day.weekday(), 1.0)
+        growth = 1 + 0.5 * offset / days
+        weights.append(season * weekday * growth)
+    return weights
+
+
+def sorted_timestamps(rng, count, start, day_weights):
+    """`count` datetimes during trading hours (08:00-18:00 local), in order, so ids follow dates."""
+    days = rng.choices(range(len(day_weights)), cum_weights=list(itertools.accumulate(day_weights)), k=count)
+    seconds = sorted(day * 86400 + (8 - UTC_OFFSET_HOURS) * 3600 + rng.random() * 36000 for day in days)
+    return [start + timedelta(seconds=s) for s in seconds]
+
+
+class BulkWriter:
+    """
+    Buffers rows per table and writes them in foreign-key order, `CHUNK` rows at a
+    time in short transactions. Postgres (psycopg2) gets COPY, anything else executemany.
+    """
+
+    def __init__(self, session, tables):
+        self.session = session
+        self.tables = tables
+        self.buffers = {table.name: [] for table in tables}
+        self.counts = Counter()
+        dialect = session.get_bind().dialect
+        self.copy = dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+    def add(self, table, row):
+        buffer = self.buffers[table.name]
+        buffer.append(row)
+        if len(buffer) >= CHUNK:
+            self.flush()
+
+    def flush(self):
+        # Parents first, so every child row's foreign key already exists
+        for table in self.tables:
+            rows = self.buffers[table.name]
+            if not rows:
+                continue
+            if self.copy:
+                self._copy(table, rows)
+            else:
+                self.session.execute(table.insert(), rows)
+            self.counts[table.name] += len(rows)
+            rows.clear()
+        self.session.commit()
+
+    def _copy(self, table, rows):
+        columns = list(rows[0])
+        data = io.StringIO()
+        writer = csv.writer(data)
+        for row in rows:
+            writer.writerow(["" if row[c] is None else row[c] for c in columns])
+        data.seek(0)
+        cursor = self.session.connection().connection.driver_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", data)
+        finally:
+            cursor.close()
+
+
+def clear_data():
+    """Delete every row except jobs, children first."""
+    for table in reversed(db.metadata.sorted_tables):
+        if table is not Job.__table__:
+            db.session.execute(delete(table))
+    db.session.commit()
+
+
+def _reset_sequences(tables):
+    if db.session.get_bind().dialect.name != "postgresql":
+        return
+    for table in tables:
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT max(id) FROM {table.name}), 0) + 1, false)"
+        ))
+    db.session.commit()
+
+
+def generate(products, purchases, transfers, seed=0, suppliers=50, locations=5, days=730,
+             end_date=None, deleted_share=0.03, log=print):
+    """
+    Write a synthetic dataset into the (empty) database and rebuild the derived tables.
+    Returns the number of rows written per table.
+    """
+    rng = random.Random(seed)
+    end = datetime.combine(end_date or datetime.utcnow().date(), datetime.min.time()) + timedelta(days=1)
+    start = end - timedelta(days=days)
+    day_weights = seasonal_weights(start, days)
+
+    def deleted():
+        return rng.random() < deleted_share
+
+    tables = [
+        Category.__table__, Supplier.__table__, BusinessLocation.__table__, Product.__table__,
+        Purchase.__table__, PurchaseItem.__table__, StockTransfer.__table__, StockTransferItem.__table__,
+        DailyMovementRollup.__table__, AbcStaleProduct.__table__,
+    ]
+    writer = BulkWriter(db.session, tables)
+
+    log(f"📚 Writing {len(CATEGORIES)} categories, {suppliers} suppliers, {locations} locations, {products} products...")
+    for category_id, name in enumerate(CATEGORIES, start=1):
+        writer.add(Category.__table__, {
+            "id": category_id, "name": name, "description": f"{name} and related stock",
+            "default_reorder_point": 10, "default_reorder_quantity": 50, "is_deleted": False,
+        })
+    for supplier_id in range(1, suppliers + 1):
+        word = SUPPLIER_WORDS[supplier_id % len(SUPPLIER_WORDS)]
+        is_deleted = deleted()
+        writer.add(Supplier.__table__, {
+            "id": supplier_id, "name": f"{word} Traders {supplier_id}", "contact": f"07{rng.randrange(10**8):08d}",
+            "address": f"P.O. Box {rng.randint(100, 99999)}", "notes": None, "created_at": start,
+            "is_deleted": is_deleted, "deleted_at": start if is_deleted else None,
+        })
+    for location_id in range(1, locations + 1):
+        name = LOCATION_NAMES[location_id - 1] if location_id <= len(LOCATION_NAMES) else f"Branch {location_id}"
+        writer.add(BusinessLocation.__table__, {
+            "id": location_id, "name": name, "address": None, "contact_person": None, "phone": None,
+            "notes": None, "is_active": True, "is_deleted": False,
+        })
+
+    base_cost = [0.0]
+    for product_id in range(1, products + 1):
+        noun = PRODUCT_NOUNS[rng.randrange(len(PRODUCT_NOUNS))]
+        variant = PRODUCT_VARIANTS[rng.randrange(len(PRODUCT_VARIANTS))]
+        base_cost.append(round(rng.lognormvariate(4.5, 1.0), 2))
+        tracked = rng.random() < 0.6
+        is_deleted = deleted()
+        writer.add(Product.__table__, {
+            "id": product_id, "name": f"{variant} {noun} {product_id}", "sku": f"GEN-{product_id:07d}",
+            "unit": UNITS[rng.randrange(len(UNITS))], "description": f"{variant} {noun.lower()}",
+            "category_id": rng.randint(1, len(CATEGORIES)), "created_at": start,
+            "is_deleted": is_deleted, "deleted_at": start if is_deleted else None,
+            "reorder_point": rng.randint(5, 50) if tracked else None,
+            "reorder_quantity": rng.randint(20, 200) if tracked else None,
+            "abc_class": None, "annual_consumption_value": None,
+        })
+        # Never classified yet, so queued for the next ABC run
+        writer.add(AbcStaleProduct.__table__, {"product_id": product_id})
+    writer.flush()
+
+    # Popularity ranks are shuffled so the best sellers are spread over ids and categories
+    ranked = list(range(1, products + 1))
+    rng.shuffle(ranked)
+    popularity = dict(zip(ranked, zipf_weights(products, 1.1)))
+    product_ids = list(range(1, products + 1))
+    product_weights = list(itertools.accumulate(popularity[i] for i in product_ids))
+    supplier_weights = list(itertools.accumulate(zipf_weights(suppliers, 0.8)))
+    location_weights = list(itertools.accumulate(zipf_weights(locations, 1.0)))
+
+    def pick_products(count):
+        picked = rng.choices(product_ids, cum_weights=product_weights, k=count)
+        return list(dict.fromkeys(picked))  # a product appears once per document
+
+    log(f"📦 Writing {purchases} purchases and {transfers} transfers...")
+    purchase_times = sorted_timestamps(rng, purchases, start, day_weights)
+    transfer_times = sorted_timestamps(rng, transfers, start, day_weights)
+    stock = [0] * (products + 1)
+    latest_cost = [0.0] * (products + 1)
+    rollups = {}  # (day, product_id, location_id, movement_type) -> [quantity, value]
+    span = (end - start).total_seconds()
+    purchase_id = transfer_id = purchase_item_id = transfer_item_id = 0
+    p = t = 0
+
+    # Walk both streams in date order so OUT transfers only take stock that exists at the time
+    while p < purchases or t < transfers:
+        if t >= transfers or (p < purchases and purchase_times[p] <= transfer_times[t]):
+            when = purchase_times[p]
+            p += 1
+            purchase_id += 1
+            is_deleted = deleted()
+            drift = 1 + 0.15 * (when - start).total_seconds() / span
+            lines = []
+            for product_id in pick_products(1 + min(int(rng.expovariate(0.6)), 7)):
+                quantity = max(1, int(rng.lognormvariate(3.0, 0.8)))
+                unit_cost = round(base_cost[product_id] * drift * rng.uniform(0.9, 1.1), 2)
+                lines.append((product_id, quantity, unit_cost))
+                if not is_deleted:
+                    stock[product_id] += quantity
+                    latest_cost[product_id] = unit_cost
+                    rollup = rollups.setdefault((when.date(), product_id, None, "PURCHASE"), [0, 0.0])
+                    rollup[0] += quantity
+                    rollup[1] += quantity * unit_cost
+
+            writer.add(Purchase.__table__, {
+                "id": purchase_id, "supplier_id": rng.choices(range(1, suppliers + 1), cum_weights=supplier_weights)[0],
+                "total_cost": round(sum(q * c for _, q, c in lines), 2), "purchase_date": when,
+                "notes": None, "is_deleted": is_deleted, "deleted_at": when if is_deleted else None,
+            })
+            for product_id, quantity, unit_cost in lines:
+                purchase_item_id += 1
+                writer.add(PurchaseItem.__table__, {
+                    "id": purchase_item_id, "purchase_id": purchase_id, "product_id": product_id,
+                    "quantity": quantity, "unit_cost": unit_cost,
+                })
+        else:
+            when = transfer_times[t]
+            t += 1
+            transfer_id += 1
+            is_deleted = deleted()
+            transfer_type = "IN" if rng.random() < 0.2 else "OUT"
+            lines = []
+            for product_id in pick_products(1 + min(int(rng.expovariate(1.2)), 4)):
+                if transfer_type == "IN":
+                    quantity = max(1, int(rng.lognormvariate(2.5, 0.7)))
+                else:
+                    quantity = min(max(1, int(rng.lognormvariate(1.8, 0.7))), stock[product_id])
+                    if quantity == 0:
+                        continue
+                lines.append((product_id, quantity))
+                if not is_deleted:
+                    stock[product_id] += quantity if transfer_type == "IN" else -quantity
+            if not lines:
+                # Nothing picked was in stock: record a restock instead
+                product_id = pick_products(1)[0]
+                transfer_type, lines = "IN", [(product_id, max(1, int(rng.lognormvariate(2.5, 0.7))))]
+                if not is_deleted:
+                    stock[product_id] += lines[0][1]
+
+            location_id = rng.choices(range(1, locations + 1), cum_weights=location_weights)[0]
+            writer.add(StockTransfer.__table__, {
+                "id": transfer_id, "date": when, "transfer_type": transfer_type, "location_id": location_id,
+                "notes": None, "is_deleted": is_deleted, "deleted_at": when if is_deleted else None,
+            })
+            for product_id, quantity in lines:
+                if not is_deleted:
+                    rollup = rollups.setdefault((when.date(), product_id, location_id, transfer_type), [0, 0.0])
+                    rollup[0] += quantity
+                    rollup[1] += quantity * latest_cost[product_id]
+                transfer_item_id += 1
+                writer.add(StockTransferItem.__table__, {
+                    "id": transfer_item_id, "stock_transfer_id": transfer_id, "product_id": product_id,
+                    "quantity": quantity,
+                })
+
+    for (day, product_id, location_id, movement_type), (quantity, value) in rollups.items():
+        writer.add(DailyMovementRollup.__table__, {
+            "day": day, "product_id": product_id, "location_id": location_id, "movement_type": movement_type,
+            "quantity": quantity, "value": value,
+        })
+    writer.flush()
+    _reset_sequences(tables[:-1])
+
+    log("🔄 Rebuilding stock balances, search index and alerts...")
+    rebuild_stock_balances()
+    connection = db.session.connection()
+    create_search_index(connection)
+    reindex_products(connection)
+    db.session.commit()
+    evaluate_alerts()
+
+    return dict(writer.counts)
+
+
+seed_cli = AppGroup("seed", help="Synthetic data commands.")
+
+
+@seed_cli.command("generate")
+@click.option("--products", type=int, default=1000, show_default=True)
+@click.option("--purchases", type=int, default=20000, show_default=True)
+@click.option("--transfers", type=int, default=10000, show_default=True)
+@click.option("--seed", type=int, default=0, show_default=True, help="Random seed; same seed, same data.")
+@click.option("--suppliers", type=int, default=50, show_default=True)
+@click.option("--locations", type=int, default=5, show_default=True)
+@click.option("--days", type=int, default=730, show_default=True, help="Days of history.")
+@click.option("--end-date", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Last day of history (default: today); fix it for byte-identical reruns.")
+@click.option("--deleted-share", type=float, default=0.03, show_default=True,
+              help="Share of products, suppliers, purchases and transfers that are soft-deleted.")
+@click.option("--reset", is_flag=True, help="Delete all existing data (except jobs) first.")
+def generate_command(products, purchases, transfers, seed, suppliers, locations, days, end_date,
+                     deleted_share, reset):
+    """Fill the database with a large, realistic synthetic dataset."""
+    if min(products, suppliers, locations, days) < 1 or min(purchases, transfers) < 0:
+        raise click.BadParameter("counts must be positive")
+
+    if reset:
+        print("🔄 Clearing existing data...")
+        clear_data()
+    elif db.session.execute(select(func.count()).select_from(Product.__table__)).scalar():
+        raise click.ClickException("The database already has products; rerun with --reset to replace them.")
+
+    started = time.perf_counter()
+    counts = generate(
+        products, purchases, transfers, seed=seed, suppliers=suppliers, locations=locations, days=days,
+        end_date=end_date.date() if end_date else None, deleted_share=deleted_share
+    )
+    rows = ", ".join(f"{count} {table}" for table, count in counts.items())
+    print(f"✅ Generated {rows} in {time.perf_counter() - started:.1f}s.")
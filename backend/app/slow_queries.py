@@ -0,0 +1,197 @@
+"""
+Slow-query log.
+
+Every statement slower than SLOW_QUERY_MS is logged as a JSON line on the
+`app.slow_queries` logger with its bound parameters, the route that issued it
+and the database's plan for it (EXPLAIN QUERY PLAN on SQLite, EXPLAIN on
+Postgres), and folded into this worker's summary at /debug/slow_queries.
+
+The plan is captured the first time a statement is slow and refreshed every
+PLAN_TTL seconds after that, so a slow hot query does not double its own load.
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.slow_queries")
+
+MAX_STATEMENTS = 200  # distinct statements kept in the summary
+PLAN_TTL = 600
+MAX_PARAM_LENGTH = 200
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+
+_route = contextvars.ContextVar("slow_query_route", default=None)
+_threshold = None
+_stats = {}
+_lock = threading.Lock()
+
+
+def set_route(label):
+    """Label queries with a route outside a Flask request (the ASGI reads); returns a reset token."""
+    return _route.set(label)
+
+
+def reset_route(token):
+    _route.reset(token)
+
+
+def current_route():
+    route = _route.get()
+    if route:
+        return route
+    if has_request_context():
+        rule = request.url_rule
+        return f"{request.method} {rule.rule if rule else request.path}"
+    return "(background)"
+
+
+def _format_params(parameters, executemany):
+    def short(value):
+        text = repr(value)
+        return text if len(text) <= MAX_PARAM_LENGTH else text[:MAX_PARAM_LENGTH] + "..."
+
+    if executemany:
+        return {"executemany": len(parameters), "first": _format_params(parameters[0], False) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: short(value) for key, value in parameters.items()}
+    return [short(value) for value in parameters or ()]
+
+
+def _explain(conn, statement, parameters):
+    if not statement.lstrip().lower().startswith(EXPLAINABLE):
+        return None
+
+    postgres = conn.dialect.name == "postgresql"
+    conn.info["slow_query_explaining"] = True
+    try:
+        # A failed statement aborts a Postgres transaction, so keep the caller's intact
+        if postgres:
+            conn.exec_driver_sql("SAVEPOINT slow_query_explain")
+        try:
+            prefix = "EXPLAIN " if postgres else "EXPLAIN QUERY PLAN "
+            rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        except Exception as e:
+            if postgres:
+                conn.exec_driver_sql("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return [f"EXPLAIN failed: {e}"]
+        if postgres:
+            conn.exec_driver_sql("RELEASE SAVEPOINT slow_query_explain")
+        # SQLite: (id, parent, notused, detail); Postgres: one text column per line
+        return [str(row[-1]) for row in rows]
+    except Exception:
+        logger.debug("Could not capture a query plan", exc_info=True)
+        return None
+    finally:
+        conn.info.pop("slow_query_explaining", None)
+
+
+def record_slow_query(conn, statement, parameters, executemany, elapsed):
+    key = " ".join(statement.split())
+    route = current_route()
+    params = _format_params(parameters, executemany)
+    now = time.time()
+
+    with _lock:
+        entry = _stats.get(key)
+        needs_plan = entry is None or now - entry["plan_captured_at"] > PLAN_TTL
+    plan = _explain(conn, statement, parameters) if needs_plan and not executemany else None
+
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            if len(_stats) >= MAX_STATEMENTS:
+                # Make room by forgetting the statement that has cost the least
+                del _stats[min(_stats, key=lambda k: _stats[k]["total_seconds"])]
+            entry = _stats[key] = {
+                "statement": key, "count": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                "routes": Counter(), "slowest_params": None, "plan": None,
+                "plan_captured_at": 0.0, "last_seen": None,
+            }
+        entry["count"] += 1
+        entry["total_seconds"] += elapsed
+        entry["routes"][route] += 1
+        entry["last_seen"] = now
+        if elapsed >= entry["max_seconds"]:
+            entry["max_seconds"] = elapsed
+            entry["slowest_params"] = params
+        if plan is not None:
+            entry["plan"], entry["plan_captured_at"] = plan, now
+
+    logger.warning(json.dumps({
+        "duration_ms": round(elapsed * 1000, 2),
+        "route": route,
+        "statement": key,
+        "params": params,
+        "plan": plan,
+    }, default=str))
+
+
+def slow_query_summary(sort="total", limit=50):
+    """This worker's slow statements, worst first by total time, max time or count."""
+    sort_key = {"total": "total_seconds", "max": "max_seconds", "count": "count"}[sort]
+    with _lock:
+        entries = sorted(_stats.values(), key=lambda e: e[sort_key], reverse=True)[:limit]
+        return {
+            "threshold_ms": round(_threshold * 1000, 3) if _threshold else None,
+            "worker_pid": os.getpid(),
+            "statements": len(_stats),
+            "queries": [
+                {
+                    "statement": e["statement"],
+                    "count": e["count"],
+                    "total_ms": round(e["total_seconds"] * 1000, 2),
+                    "avg_ms": round(e["total_seconds"] * 1000 / e["count"], 2),
+                    "max_ms": round(e["max_seconds"] * 1000, 2),
+                    "routes": dict(e["routes"].most_common()),
+                    "slowest_params": e["slowest_params"],
+                    "plan": e["plan"],
+                    "last_seen": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(e["last_seen"])),
+                } for e in entries
+            ]
+        }
+
+
+def reset_slow_queries():
+    with _lock:
+        _stats.clear()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("slow_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if elapsed >= _threshold and not conn.info.get("slow_query_explaining"):
+        record_slow_query(conn, statement, parameters, executemany, elapsed)
+
+
+def init_slow_queries(app):
+    global _threshold
+    threshold_ms = app.config.get("SLOW_QUERY_MS", 0)
+    if not threshold_ms:
+        return
+
+    first_app = _threshold is None
+    _threshold = threshold_ms / 1000
+    if first_app:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
@@ -0,0 +1,189 @@
+"""
+Per-request performance breakdown.
+
+For a sampled request (PERF_SAMPLE_RATE) every SQL statement, model `to_dict`
+call and JSON encode is timed. The totals go back in a `Server-Timing` header
+(shown in the browser's network panel) and are logged as one JSON line on the
+`app.timing` logger:
+
+    sql;dur=41.2;desc="17 queries", serialize;dur=12.0, encode;dur=3.1, app;dur=8.4, total;dur=64.7
+
+`sql` is statement execution as seen by the driver; fetching rows and ORM
+hydration fall under `app`, which is whatever is left of the total (along with
+routing and view logic). `serialize` includes any lazy-load SQL it triggers, so
+phases can overlap. Unsampled requests only pay a context-variable lookup per
+query.
+"""
+import contextvars
+import json
+import logging
+import random
+import time
+from functools import wraps
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .models import db
+
+logger = logging.getLogger("app.timing")
+
+_current = contextvars.ContextVar("request_timing", default=None)
+_listeners_installed = False
+
+
+class RequestTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serialize_time = 0.0
+        self.encode_time = 0.0
+        self.orm_objects = 0
+        self.serialize_depth = 0
+
+    def phases(self):
+        """Milliseconds per phase, plus the query and loaded-object counts."""
+        total = time.perf_counter() - self.started
+        app_time = max(total - self.sql_time - self.serialize_time - self.encode_time, 0.0)
+        return {
+            "total_ms": round(total * 1000, 2),
+            "sql_ms": round(self.sql_time * 1000, 2),
+            "sql_count": self.sql_count,
+            "serialize_ms": round(self.serialize_time * 1000, 2),
+            "encode_ms": round(self.encode_time * 1000, 2),
+            "app_ms": round(app_time * 1000, 2),
+            "orm_objects": self.orm_objects,
+        }
+
+    def emit(self, method, path, endpoint, status):
+        """Log the breakdown and return the matching Server-Timing header value."""
+        phases = self.phases()
+        queries = "query" if phases["sql_count"] == 1 else "queries"
+        logger.info(json.dumps({
+            "method": method, "path": path, "endpoint": endpoint, "status": status, **phases
+        }))
+        return (
+            f'sql;dur={phases["sql_ms"]};desc="{phases["sql_count"]} {queries}", '
+            f'serialize;dur={phases["serialize_ms"]}, encode;dur={phases["encode_ms"]}, '
+            f'app;dur={phases["app_ms"]}, total;dur={phases["total_ms"]}'
+        )
+
+
+def start_request_timing(sample_rate):
+    """Start timing the current request (or asyncio task) if it is sampled; returns a reset token."""
+    if not sample_rate or random.random() >= sample_rate:
+        return None
+    return _current.set(RequestTiming())
+
+
+def current_timing():
+    return _current.get()
+
+
+def finish_request_timing(token):
+    if token is not None:
+        _current.reset(token)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        timing = _current.get()
+        if timing is None:
+            return super().dumps(obj, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            timing.encode_time += time.perf_counter() - started
+
+
+def _timed_to_dict(to_dict):
+    @wraps(to_dict)
+    def wrapper(self, *args, **kwargs):
+        timing = _current.get()
+        # Only the outermost call is timed; nested to_dict calls are part of it
+        if timing is None or timing.serialize_depth:
+            return to_dict(self, *args, **kwargs)
+        timing.serialize_depth += 1
+        started = time.perf_counter()
+        try:
+            return to_dict(self, *args, **kwargs)
+        finally:
+            timing.serialize_depth -= 1
+            timing.serialize_time += time.perf_counter() - started
+
+    wrapper.timed = True
+    return wrapper
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("timing_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = _current.get()
+    starts = conn.info.get("timing_query_start")
+    if timing is not None and starts:
+        timing.sql_time += time.perf_counter() - starts.pop()
+        timing.sql_count += 1
+
+
+def _count_loaded(target, context):
+    timing = _current.get()
+    if timing is not None:
+        timing.orm_objects += 1
+
+
+def install_listeners():
+    """Hook SQL, to_dict and ORM load events once per process (every engine, sync and async)."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    _listeners_installed = True
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(db.Model, "load", _count_loaded, propagate=True)
+
+    for mapper in db.Model.registry.mappers:
+        cls = mapper.class_
+        to_dict = getattr(cls, "to_dict", None)
+        if to_dict is not None and not getattr(to_dict, "timed", False):
+            cls.to_dict = _timed_to_dict(to_dict)
+
+
+def init_timing(app):
+    app.json = TimedJSONProvider(app)
+
+    sample_rate = app.config.get("PERF_SAMPLE_RATE", 0)
+    if not sample_rate:
+        return
+    install_listeners()
+
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    @app.before_request
+    def _start_timing():
+        request.environ["app.timing_token"] = start_request_timing(sample_rate)
+
+    @app.after_request
+    def _emit_timing(response):
+        timing = _current.get()
+        if timing is not None:
+            response.headers["Server-Timing"] = timing.emit(
+                request.method, request.path, request.endpoint, response.status_code
+            )
+        return response
+
+    @app.teardown_request
+    def _finish_timing(exc):
+        finish_request_timing(request.environ.pop("app.timing_token", None))
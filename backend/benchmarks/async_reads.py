@@ -0,0 +1,148 @@
+"""
+Compare read throughput of the sync (gunicorn) and ASGI (uvicorn) deployments.
+
+Both servers are started against the same DATABASE_URL with the same number of
+workers, then hammered by `--concurrency` client threads issuing a mix of
+dashboard, list and report requests for `--duration` seconds each.
+
+    cd backend
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/async_reads.py --workers 4 --concurrency 32
+
+Use a populated database; an empty one mostly measures HTTP overhead.
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (path, weight): dashboard opens dominate, with list pages and reports mixed in
+REQUEST_MIX = [
+    ("/dashboard/summary", 4),
+    ("/dashboard/movements", 2),
+    ("/products", 2),
+    ("/purchases/", 1),
+    ("/stock_transfers", 1),
+    ("/reports/inventory_value_by_category", 1),
+    ("/reports/purchases_by_month", 1),
+    ("/reports/movements/series?bucket=week", 1),
+]
+
+SERVERS = {
+    "sync": lambda port, workers: [
+        sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}",
+        "run:create_app()"
+    ],
+    "asgi": lambda port, workers: [
+        sys.executable, "-m", "uvicorn", "asgi:app", "--workers", str(workers),
+        "--port", str(port), "--log-level", "warning"
+    ],
+}
+
+
+def wait_until_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.25)
+    raise RuntimeError(f"Server on port {port} did not start within {timeout}s")
+
+
+def run_load(port, paths, concurrency, duration):
+    latencies = []
+    errors = Counter()
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        mine, failed = [], Counter()
+        i = offset
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed[path] += 1
+            except (OSError, http.client.HTTPException):
+                failed[path] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                continue
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+            errors.update(failed)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors
+
+
+def benchmark(mode, port, args):
+    env = dict(os.environ, ALERT_EVALUATOR_INTERVAL="0")
+    server = subprocess.Popen(
+        SERVERS[mode](port, args.workers), cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(port)
+        run_load(port, args.paths, args.concurrency, min(args.duration, 3))  # warm up caches and pools
+        latencies, errors = run_load(port, args.paths, args.concurrency, args.duration)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "rps": len(latencies) / args.duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        "errors": sum(errors.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds of load per mode")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--paths", nargs="+", help="Request only these paths instead of the default mix")
+    args = parser.parse_args()
+    args.paths = args.paths or [path for path, weight in REQUEST_MIX for _ in range(weight)]
+
+    print(f"🔄 {args.workers} workers, {args.concurrency} concurrent clients, {args.duration:g}s per mode")
+    results = [benchmark(mode, args.port + n, args) for n, mode in enumerate(SERVERS)]
+
+    print(f"{'mode':<6} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    for r in results:
+        print(f"{r['mode']:<6} {r['requests']:>9} {r['rps']:>9.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['errors']:>7}")
+
+    sync, asgi = results
+    if sync["rps"]:
+        print(f"✅ ASGI throughput is {asgi['rps'] / sync['rps']:.2f}x sync")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Synthetic datasets for the benchmarks, sized by the number of movement rows
+(purchase items plus transfer items).
+
+The data comes from the `flask seed generate` generator (app/seeding.py). Each
+dataset is built once per scale and seed into instance/benchmarks/ and copied
+for each run, so benchmarks that write never change the template. History ends
+on the day the dataset is built; `--rebuild` refreshes it.
+"""
+import os
+import shutil
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_DIR = os.path.join(BACKEND_DIR, "instance", "benchmarks")
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def dataset_path(scale, seed):
+    return os.path.join(DATASET_DIR, f"dataset-{scale}-{seed}.db")
+
+
+def populate(movements, seed=0):
+    """Fill the current app's (empty) database with about `movements` movement rows."""
+    from app.seeding import generate
+
+    # `flask seed generate` averages about 2.1 items per purchase and 1.4 per transfer
+    generate(
+        products=max(50, movements // 200),
+        purchases=max(1, int(movements * 0.6 / 2.1)),
+        transfers=max(1, int(movements * 0.4 / 1.4)),
+        seed=seed,
+        log=lambda message: None,
+    )
+
+
+def ensure_dataset(scale, seed=0, rebuild=False):
+    """Path of the template database for `scale`, building it first if needed."""
+    path = dataset_path(scale, seed)
+    if os.path.exists(path) and not rebuild:
+        return path
+
+    os.makedirs(DATASET_DIR, exist_ok=True)
+    building = path + ".building"
+    if os.path.exists(building):
+        os.remove(building)
+    os.environ.update(DATABASE_URL=f"sqlite:///{building}", ALERT_EVALUATOR_INTERVAL="0", JOB_WORKERS="0")
+
+    from app import create_app
+    from app.models import db
+    with create_app().app_context():
+        populate(SCALES[scale], seed)
+        # Closing the connections checkpoints the WAL, leaving a self-contained file
+        db.engine.dispose()
+    os.replace(building, path)
+    return path
+
+
+def working_copy(template, directory):
+    """Copy the template into `directory` and return its database URL."""
+    from sqlalchemy import create_engine
+    from app.models import db
+
+    path = os.path.join(directory, os.path.basename(template))
+    shutil.copyfile(template, path)
+    url = f"sqlite:///{path}"
+
+    # Templates built before a new table was added get it (empty) here instead of a rebuild
+    engine = create_engine(url)
+    db.metadata.create_all(engine)
+    engine.dispose()
+    return url
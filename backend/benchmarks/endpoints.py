@@ -0,0 +1,362 @@
+"""
+Time every route in app/routes/ against a synthetic dataset.
+
+Each route is called through the Flask test client on a fresh copy of the
+dataset for `--scale` (1k, 100k or 1m movement rows, see datasets.py). Per
+route the results record median/p95/min latency over `--repeat` calls, the SQL
+statements one call issues, its peak Python allocation (tracemalloc, on a
+separate call so tracing doesn't skew the timings) and the response size.
+GET routes are discovered from the URL map; writes use the payloads in
+WRITE_CASES, each call on a row created for it outside the timed section.
+
+Results are written as JSON with sorted keys, so two runs can be diffed
+directly or compared with `--compare`:
+
+    cd backend
+    python benchmarks/endpoints.py --scale 100k --output /tmp/before.json
+    git checkout my-branch
+    python benchmarks/endpoints.py --scale 100k --output /tmp/after.json --compare /tmp/before.json
+
+The first run at a scale builds its dataset into instance/benchmarks/ (the 1m
+dataset takes a few minutes); later runs reuse it until `--rebuild`.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.datasets import SCALES, ensure_dataset, working_copy  # noqa: E402
+
+ADMIN_TOKEN = "benchmark"
+HEADERS = {"X-Admin-Token": ADMIN_TOKEN}
+
+# Query strings for GET routes that need one to do real work
+QUERY_STRINGS = {
+    "product_routes.autocomplete_products": lambda ids: {"prefix": ids["product_name"][:4]},
+    "product_routes.search_products_route": lambda ids: {"q": ids["product_name"]},
+    "reports.movement_series": lambda ids: {"bucket": "week"},
+}
+
+# URL variables other than the `id` of the route's own table
+PATH_VALUES = {
+    "product_routes.get_product_by_sku": lambda ids: {"sku": ids["sku"]},
+    "jobs.get_job": lambda ids: {"id": ids["job"]},
+    "jobs.get_job_result": lambda ids: {"id": ids["job"]},
+}
+
+# Blueprint -> key in `ids` for its `<int:id>` routes
+ID_KEYS = {
+    "suppliers": "supplier", "purchases": "purchase", "product_routes": "product",
+    "purchase_item_bp": "purchase_item", "category_bp": "category", "stock_transfer_bp": "stock_transfer",
+    "stock_transfer_item_bp": "stock_transfer_item", "business_location_bp": "location",
+}
+
+
+def _create(client, url, body):
+    response = client.post(url, json=body, headers=HEADERS)
+    assert response.status_code in (200, 201), (url, response.status_code, response.get_data(as_text=True))
+    return response.get_json()["id"]
+
+
+def _purchase_body(ids):
+    return {
+        "supplier_id": ids["supplier"], "total_cost": 150,
+        "items": [{"product_id": ids["product"], "quantity": 5, "unit_cost": 10},
+                  {"product_id": ids["other_product"], "quantity": 10, "unit_cost": 10}]
+    }
+
+
+def _transfer_body(ids, transfer_type):
+    return {"transfer_type": transfer_type, "location_id": ids["location"],
+            "items": [{"product_id": ids["product"], "quantity": 1}]}
+
+
+def _purchase_item_body(ids):
+    return {"purchase_id": ids["purchase"], "product_id": ids["product"], "quantity": 1, "unit_cost": 10}
+
+
+def _transfer_item_body(ids):
+    return {"stock_transfer_id": ids["stock_transfer"], "product_id": ids["product"], "quantity": 1}
+
+
+def _delete_new(url, body):
+    """A DELETE of a row created (untimed) just for it."""
+    return lambda c, ids, n: (f"{url}/{_create(c, url, body(ids, n))}", None)
+
+
+def _patch_new_location(action):
+    return lambda c, ids, n: (
+        f"/business_locations/{_create(c, '/business_locations', {'name': f'{action} location {n}'})}/{action}", None
+    )
+
+
+# endpoint -> (method, setup(client, ids, n) -> (url, json body)); the setup runs before the timed call
+WRITE_CASES = {
+    "suppliers.create_supplier": ("POST", lambda c, ids, n: ("/suppliers", {"name": f"Bench supplier {n}"})),
+    "suppliers.update_supplier": ("PUT", lambda c, ids, n: (f"/suppliers/{ids['supplier']}", {"notes": f"bench {n}"})),
+    "suppliers.delete_supplier": ("DELETE", _delete_new("/suppliers", lambda ids, n: {"name": f"Doomed supplier {n}"})),
+    "category_bp.create_category": ("POST", lambda c, ids, n: ("/categories", {"name": f"Bench category {n}"})),
+    "category_bp.update_category": ("PUT", lambda c, ids, n: (
+        f"/categories/{ids['category']}", {"name": ids["category_name"], "description": f"bench {n}"})),
+    "category_bp.delete_category": ("DELETE", _delete_new("/categories", lambda ids, n: {"name": f"Doomed category {n}"})),
+    "business_location_bp.create_business_location": ("POST", lambda c, ids, n: (
+        "/business_locations", {"name": f"Bench location {n}"})),
+    "business_location_bp.update_business_location": ("PUT", lambda c, ids, n: (
+        f"/business_locations/{ids['location']}", {"notes": f"bench {n}"})),
+    "business_location_bp.toggle_business_location_active": ("PATCH", _patch_new_location("toggle_active")),
+    "business_location_bp.soft_delete_business_location": ("PATCH", _patch_new_location("delete")),
+    "product_routes.create_product": ("POST", lambda c, ids, n: (
+        "/products", {"name": f"Bench product {n}", "sku": f"BENCH-{n}", "category_id": ids["category"]})),
+    "product_routes.update_product": ("PUT", lambda c, ids, n: (
+        f"/products/{ids['product']}", {"description": f"bench {n}"})),
+    "product_routes.delete_product": ("DELETE", _delete_new("/products", lambda ids, n: {
+        "name": f"Doomed product {n}", "sku": f"DOOMED-{n}", "category_id": ids["category"]})),
+    "product_routes.get_products_by_sku": ("POST", lambda c, ids, n: ("/products/by_sku", {"skus": ids["skus"]})),
+    "purchases.create_purchase": ("POST", lambda c, ids, n: ("/purchases", _purchase_body(ids))),
+    # Purchases older than 30 days are read-only, so update one created for the call
+    "purchases.update_purchase": ("PUT", lambda c, ids, n: (
+        f"/purchases/{_create(c, '/purchases', _purchase_body(ids))}", {"notes": f"bench {n}"})),
+    "purchases.delete_purchase": ("DELETE", _delete_new("/purchases", lambda ids, n: _purchase_body(ids))),
+    "purchase_item_bp.create_purchase_item": ("POST", lambda c, ids, n: ("/purchase_items", _purchase_item_body(ids))),
+    "purchase_item_bp.update_purchase_item": ("PUT", lambda c, ids, n: (
+        f"/purchase_items/{ids['purchase_item']}", {"unit_cost": 10 + n % 5})),
+    "purchase_item_bp.delete_purchase_item": ("DELETE", _delete_new(
+        "/purchase_items", lambda ids, n: _purchase_item_body(ids))),
+    "stock_transfer_bp.create_stock_transfer": ("POST", lambda c, ids, n: (
+        "/stock_transfers", _transfer_body(ids, "OUT"))),
+    "stock_transfer_bp.update_stock_transfer": ("PUT", lambda c, ids, n: (
+        f"/stock_transfers/{ids['stock_transfer']}", {"notes": f"bench {n}"})),
+    "stock_transfer_bp.delete_stock_transfer": ("DELETE", _delete_new(
+        "/stock_transfers", lambda ids, n: _transfer_body(ids, "IN"))),
+    "stock_transfer_item_bp.create_stock_transfer_item": ("POST", lambda c, ids, n: (
+        "/stock_transfer_items", _transfer_item_body(ids))),
+    "stock_transfer_item_bp.update_stock_transfer_item": ("PUT", lambda c, ids, n: (
+        f"/stock_transfer_items/{ids['stock_transfer_item']}", {"product_id": ids["product"], "quantity": 1 + n % 5})),
+    "stock_transfer_item_bp.delete_stock_transfer_item": ("DELETE", _delete_new(
+        "/stock_transfer_items", lambda ids, n: _transfer_item_body(ids))),
+    "reports.recompute_abc_classification": ("POST", lambda c, ids, n: ("/reports/abc_classification/recompute", None)),
+    "jobs.create_job": ("POST", lambda c, ids, n: ("/jobs", {"type": "inventory_valuation", "params": {}})),
+    "debug.clear_slow_queries": ("DELETE", lambda c, ids, n: ("/debug/slow_queries", None)),
+}
+
+
+def make_app(database_url):
+    # Background threads and per-request instrumentation off, so only the route itself is measured
+    os.environ.update(
+        DATABASE_URL=database_url, ALERT_EVALUATOR_INTERVAL="0", JOB_WORKERS="0", PERF_SAMPLE_RATE="0",
+        METRICS_ENABLED="0", SLOW_QUERY_MS="0", PROFILING_ENABLED="0", ADMIN_TOKEN=ADMIN_TOKEN
+    )
+    from app import create_app
+    return create_app()
+
+
+def sample_ids(app):
+    """A live row of each table for routes that take an id, plus a queued job for /jobs/<id>."""
+    from sqlalchemy import func
+    from app.models import (
+        db, Supplier, Purchase, PurchaseItem, Product, Category, StockTransfer, StockTransferItem, BusinessLocation
+    )
+    from app.jobs import enqueue_job
+
+    def first(model, *criteria):
+        return db.session.query(func.min(model.id)).filter(*criteria).scalar()
+
+    with app.app_context():
+        products = (
+            Product.query.join(Category).filter(Product.is_deleted == False, Category.is_deleted == False)
+            .order_by(Product.id).limit(20).all()
+        )
+        category = db.session.get(Category, products[0].category_id)
+        ids = {
+            "product": products[0].id,
+            "other_product": products[1].id,
+            "product_name": products[0].name,
+            "sku": products[0].sku,
+            "skus": [p.sku for p in products],
+            "category": category.id,
+            "category_name": category.name,
+            "supplier": first(Supplier, Supplier.is_deleted == False),
+            "purchase": first(Purchase, Purchase.is_deleted == False),
+            "stock_transfer": first(StockTransfer, StockTransfer.is_deleted == False),
+            "location": first(BusinessLocation, BusinessLocation.is_deleted == False),
+            "job": enqueue_job("inventory_valuation", {}).id,
+        }
+        ids["purchase_item"] = first(PurchaseItem, PurchaseItem.purchase_id == ids["purchase"])
+        ids["stock_transfer_item"] = first(StockTransferItem, StockTransferItem.stock_transfer_id == ids["stock_transfer"])
+    return ids
+
+
+def discover_cases(app, ids):
+    """(name, method, setup) for every route defined in app/routes/."""
+    cases, uncovered = [], []
+    adapter = app.url_map.bind("localhost")
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if not app.view_functions[rule.endpoint].__module__.startswith("app.routes."):
+            continue
+        for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+            name = f"{method} {rule.rule}"
+            if method != "GET":
+                if rule.endpoint in WRITE_CASES and WRITE_CASES[rule.endpoint][0] == method:
+                    cases.append((name, method, WRITE_CASES[rule.endpoint][1]))
+                else:
+                    uncovered.append(name)
+                continue
+
+            values = {}
+            if rule.endpoint in PATH_VALUES:
+                values = PATH_VALUES[rule.endpoint](ids)
+            elif rule.arguments:
+                values = {"id": ids[ID_KEYS[rule.endpoint.split(".")[0]]]}
+            query = QUERY_STRINGS.get(rule.endpoint, lambda ids: None)(ids)
+            url = adapter.build(rule.endpoint, values, method="GET", force_external=False, append_unknown=False)
+            if query:
+                url += "?" + "&".join(f"{k}={v.replace(' ', '+')}" for k, v in query.items())
+            cases.append((name, method, lambda c, ids, n, url=url: (url, None)))
+    return cases, uncovered
+
+
+class StatementCounter:
+    def __init__(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        self.count = 0
+        event.listen(Engine, "after_cursor_execute", self.increment)
+
+    def increment(self, *args):
+        self.count += 1
+
+
+def run_case(client, ids, case, repeat, counter, serial):
+    name, method, setup = case
+
+    def call():
+        url, body = setup(client, ids, next(serial))
+        counter.count = 0
+        started = time.perf_counter()
+        response = client.open(url, method=method, json=body, headers=HEADERS)
+        elapsed = time.perf_counter() - started
+        return response, elapsed, counter.count
+
+    call()  # warm caches and compiled statements
+    timings = []
+    for _ in range(repeat):
+        response, elapsed, statements = call()
+        timings.append(elapsed * 1000)
+
+    url, body = setup(client, ids, next(serial))
+    tracemalloc.start()
+    client.open(url, method=method, json=body, headers=HEADERS)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "status": response.status_code,
+        "median_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        "min_ms": round(timings[0], 2),
+        "sql_statements": statements,
+        "peak_memory_kb": round(peak / 1024, 1),
+        "response_bytes": len(response.data),
+    }
+
+
+def table_counts(app):
+    from sqlalchemy import func, select
+    from app.models import db
+    with app.app_context():
+        return {
+            name: db.session.execute(select(func.count()).select_from(table)).scalar()
+            for name, table in sorted(db.metadata.tables.items())
+        }
+
+
+def git_revision():
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip()
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "app"))}
+
+
+def compare(baseline, results):
+    print(f"\n{'route':<58} {'median ms':>20} {'sql':>10} {'peak KiB':>22}")
+    for name, current in results["routes"].items():
+        before = baseline["routes"].get(name)
+        if before is None:
+            print(f"{name:<58} {'(new)':>20}")
+            continue
+        change = (current["median_ms"] / before["median_ms"] - 1) * 100 if before["median_ms"] else 0.0
+        print(
+            f"{name:<58} {before['median_ms']:>8.1f} → {current['median_ms']:>7.1f} {change:+5.0f}%"
+            f" {before['sql_statements']:>4} → {current['sql_statements']:<4}"
+            f" {before['peak_memory_kb']:>9.0f} → {current['peak_memory_kb']:<9.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="1k", help="Movement rows in the dataset")
+    parser.add_argument("--seed", type=int, default=0, help="Dataset random seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per route")
+    parser.add_argument("--only", default="", help="Only routes containing this text, e.g. /products")
+    parser.add_argument("--output", help="JSON results file (default: instance/benchmarks/endpoints-<scale>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--rebuild", action="store_true", help="Regenerate the dataset")
+    args = parser.parse_args()
+
+    template = ensure_dataset(args.scale, args.seed, rebuild=args.rebuild)
+    with tempfile.TemporaryDirectory(prefix="bench-endpoints-") as directory:
+        app = make_app(working_copy(template, directory))
+        ids = sample_ids(app)
+        cases, uncovered = discover_cases(app, ids)
+        counts = table_counts(app)
+
+        client = app.test_client()
+        counter = StatementCounter()
+        serial = iter(range(1, 10**9))
+        routes = {}
+        for case in cases:
+            if args.only not in case[0]:
+                continue
+            routes[case[0]] = result = run_case(client, ids, case, args.repeat, counter, serial)
+            print(f"{case[0]:<58} {result['status']:>4} {result['median_ms']:>10.1f} ms "
+                  f"{result['sql_statements']:>6} sql {result['peak_memory_kb']:>10.0f} KiB")
+
+    for name in uncovered:
+        print(f"⚠️ {name} has no entry in WRITE_CASES and was not benchmarked")
+
+    results = {
+        "meta": {
+            **git_revision(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "movement_rows": counts["purchase_items"] + counts["stock_transfer_items"],
+            "rows": counts,
+            "python": platform.python_version(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "routes": routes,
+    }
+    output = args.output or os.path.join(os.path.dirname(template), f"endpoints-{args.scale}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"\n✅ Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Load tests against a locally started gunicorn.
+
+Simulated users replay weighted scenarios (see scenarios.py): opening the
+dashboard, browsing inventory, recording purchases and issuing OUT transfers.
+For each deployment profile (DB_PROFILE, worker count and sync or ASGI
+workers) the server runs on a fresh copy of a benchmark dataset, and every
+stage reports throughput plus p50/p95/p99 latency and error rates per endpoint.
+
+    cd backend
+    python -m benchmarks.loadtest --scale 100k --users 16 --duration 30
+    python -m benchmarks.loadtest --profiles legacy default production --ramp 4 8 16 32 64 --slo-ms 500
+
+With `--ramp`, the users are stepped up each stage, and the ceiling is the
+highest throughput reached while p95 stays under `--slo-ms` and errors under
+1%.
+
+After each profile, stock is checked for consistency (see consistency.py):
+- every product's materialized balance must equal the initial balance plus the
+  writes the server acknowledged;
+- the balance must match what its movements add up to;
+- no product may end below zero.
+Violations mean the app lost or oversold stock under concurrent writes.
+"""
@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks import loadtest  # noqa: E402
+from benchmarks.datasets import SCALES, ensure_dataset, working_copy  # noqa: E402
+from benchmarks.loadtest.consistency import load_catalog, stock_snapshot, check_consistency  # noqa: E402
+from benchmarks.loadtest.scenarios import SCENARIOS, Client, Ledger, Recorder  # noqa: E402
+
+SERVERS = {
+    "sync": lambda port, args: [
+        sys.executable, "-m", "gunicorn", "-w", str(args.workers), "--threads", str(args.threads),
+        "-b", f"127.0.0.1:{port}", "run:create_app()"
+    ],
+    "asgi": lambda port, args: [
+        sys.executable, "-m", "gunicorn", "-w", str(args.workers), "-k", "uvicorn.workers.UvicornWorker",
+        "-b", f"127.0.0.1:{port}", "asgi:app"
+    ],
+}
+MAX_ERROR_RATE = 0.01
+
+
+def wait_until_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        client = Client(port)
+        try:
+            if client.request("GET", "/", "ready") is not None:
+                return
+        finally:
+            client.close()
+        time.sleep(0.25)
+    raise RuntimeError(f"Server on port {port} did not start within {timeout}s")
+
+
+def percentile(samples, share):
+    return samples[min(len(samples) - 1, int(len(samples) * share))] * 1000 if samples else 0.0
+
+
+def run_stage(port, users, duration, catalog, ledger, seed):
+    recorder = Recorder()
+    weights = [weight for _, weight in SCENARIOS]
+    deadline = time.monotonic() + duration
+
+    def user(n):
+        rng = random.Random(seed * 10_000 + n)
+        client = Client(port)
+        while time.monotonic() < deadline:
+            scenario = rng.choices(SCENARIOS, weights=weights)[0][0]
+            scenario(client, rng, catalog, ledger)
+        client.flush(recorder)
+        client.close()
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(users, recorder, time.monotonic() - started)
+
+
+def summarize(users, recorder, elapsed):
+    endpoints = {}
+    for label in sorted(recorder.attempts):
+        samples = sorted(recorder.latencies[label])
+        attempts = recorder.attempts[label]
+        endpoints[label] = {
+            "requests": len(samples),
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 0.50), 1),
+            "p95_ms": round(percentile(samples, 0.95), 1),
+            "p99_ms": round(percentile(samples, 0.99), 1),
+            "errors": recorder.errors[label],
+            "rejected": recorder.rejections[label],
+            "error_rate": round(recorder.errors[label] / attempts, 4) if attempts else 0.0,
+        }
+
+    everything = sorted(s for samples in recorder.latencies.values() for s in samples)
+    errors = sum(recorder.errors.values())
+    attempts = sum(recorder.attempts.values())
+    return {
+        "users": users,
+        "seconds": round(elapsed, 1),
+        "requests": len(everything),
+        "rps": round(len(everything) / elapsed, 1),
+        "p50_ms": round(percentile(everything, 0.50), 1),
+        "p95_ms": round(percentile(everything, 0.95), 1),
+        "p99_ms": round(percentile(everything, 0.99), 1),
+        "errors": errors,
+        "error_rate": round(errors / attempts, 4) if attempts else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def print_stage(stage, verbose):
+    print(f"  {stage['users']:>4} users {stage['rps']:>8.1f} req/s  p50 {stage['p50_ms']:>7.1f}  "
+          f"p95 {stage['p95_ms']:>7.1f}  p99 {stage['p99_ms']:>7.1f} ms  errors {stage['error_rate']:.2%}")
+    if verbose:
+        for label, e in stage["endpoints"].items():
+            print(f"      {label:<28} {e['rps']:>7.1f}/s  p50 {e['p50_ms']:>7.1f}  p95 {e['p95_ms']:>7.1f}  "
+                  f"p99 {e['p99_ms']:>7.1f} ms  errors {e['errors']:>4}  rejected {e['rejected']:>4}")
+
+
+def find_ceiling(stages, slo_ms):
+    """The best stage that met the latency objective with under 1% errors."""
+    healthy = [s for s in stages if s["p95_ms"] <= slo_ms and s["error_rate"] < MAX_ERROR_RATE]
+    return max(healthy, key=lambda s: s["rps"]) if healthy else None
+
+
+def run_deployment(db_profile, server, template, port, args):
+    name = f"{server}/{db_profile}"
+    print(f"\n🔄 {name}: {args.workers} workers" + (f" x {args.threads} threads" if server == "sync" else ""))
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as directory:
+        database_url = working_copy(template, directory)
+        catalog = load_catalog(database_url)
+        before = stock_snapshot(database_url)
+        ledger = Ledger()
+
+        log_path = os.path.join(directory, "server.log")
+        env = dict(os.environ, DATABASE_URL=database_url, DB_PROFILE=db_profile)
+        with open(log_path, "w") as log:
+            process = subprocess.Popen(SERVERS[server](port, args), cwd=BACKEND_DIR, env=env, stdout=log, stderr=log)
+        try:
+            wait_until_ready(port)
+            run_stage(port, args.users[0], args.warmup, catalog, ledger, seed=0)
+            stages = []
+            for n, users in enumerate(args.users, start=1):
+                stage = run_stage(port, users, args.duration, catalog, ledger, seed=n)
+                print_stage(stage, args.verbose or len(args.users) == 1)
+                stages.append(stage)
+        except Exception:
+            with open(log_path) as log:
+                print(log.read()[-4000:])
+            raise
+        finally:
+            process.terminate()
+            process.wait()
+
+        violations = check_consistency(before, stock_snapshot(database_url), ledger)
+
+    ceiling = find_ceiling(stages, args.slo_ms)
+    if ceiling:
+        print(f"  📈 ceiling: {ceiling['rps']:.1f} req/s at {ceiling['users']} users (p95 ≤ {args.slo_ms:g} ms)")
+    else:
+        print(f"  ⚠️ no stage met p95 ≤ {args.slo_ms:g} ms with under {MAX_ERROR_RATE:.0%} errors")
+    print(f"  OUT transfers refused for lack of stock: {ledger.rejected_outs}")
+    if violations:
+        print(f"  ❌ {len(violations)} stock consistency violations:")
+        for violation in violations[:20]:
+            print(f"      {violation}")
+    else:
+        print("  ✅ stock consistent")
+
+    return {
+        "deployment": name,
+        "db_profile": db_profile,
+        "server": server,
+        "workers": args.workers,
+        "threads": args.threads if server == "sync" else None,
+        "stages": stages,
+        "ceiling_rps": ceiling["rps"] if ceiling else None,
+        "ceiling_users": ceiling["users"] if ceiling else None,
+        "rejected_outs": ledger.rejected_outs,
+        "consistency_violations": violations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.loadtest", description=loadtest.__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", choices=SCALES, default="100k", help="Benchmark dataset to load")
+    parser.add_argument("--seed", type=int, default=0, help="Dataset random seed")
+    parser.add_argument("--profiles", nargs="+", default=["default"], help="DB_PROFILE values to compare")
+    parser.add_argument("--servers", nargs="+", choices=SERVERS, default=["sync"])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=1, help="Threads per sync worker")
+    parser.add_argument("--users", type=int, nargs="+", default=[16], help="Concurrent users per stage")
+    parser.add_argument("--ramp", type=int, nargs="+", dest="users", help="Alias for --users with several stages")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per stage")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of unrecorded load before the stages")
+    parser.add_argument("--slo-ms", type=float, default=500.0, help="p95 latency objective for the ceiling")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Per-endpoint breakdown for every stage")
+    args = parser.parse_args()
+
+    template = ensure_dataset(args.scale, args.seed)
+    results = []
+    for db_profile in args.profiles:
+        for server in args.servers:
+            results.append(run_deployment(db_profile, server, template, args.port + len(results), args))
+
+    print(f"\n{'deployment':<22} {'ceiling req/s':>14} {'at users':>9} {'violations':>11}")
+    for r in results:
+        ceiling = f"{r['ceiling_rps']:.1f}" if r["ceiling_rps"] is not None else "-"
+        print(f"{r['deployment']:<22} {ceiling:>14} {r['ceiling_users'] or '-':>9} "
+              f"{len(r['consistency_violations']):>11}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"scale": args.scale, "slo_ms": args.slo_ms, "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"✅ Results written to {args.output}")
+
+    if any(r["consistency_violations"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Stock consistency checks, read straight from the database around a load test.
+"""
+from sqlalchemy import create_engine, func, select
+
+from app.models import (
+    Product, Category, Supplier, BusinessLocation, Purchase, PurchaseItem, StockTransfer, StockTransferItem,
+    StockBalance, StockBalanceSnapshot
+)
+
+
+class Catalog:
+    """What simulated users pick from: live products weighted by past movements, suppliers and locations."""
+
+    def __init__(self, products, weights, suppliers, locations):
+        self.products = products
+        self.cum_weights = []
+        total = 0
+        for weight in weights:
+            total += weight
+            self.cum_weights.append(total)
+        self.suppliers = suppliers
+        self.locations = locations
+
+    def pick(self, rng):
+        return rng.choices(self.products, cum_weights=self.cum_weights)[0]
+
+
+def load_catalog(database_url):
+    engine = create_engine(database_url)
+    movements = (
+        select(PurchaseItem.product_id, func.count().label("n")).group_by(PurchaseItem.product_id).subquery()
+    )
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(Product.id, Product.name, func.coalesce(movements.c.n, 0))
+            .join(Category, Category.id == Product.category_id)
+            .outerjoin(movements, movements.c.product_id == Product.id)
+            .where(Product.is_deleted == False, Category.is_deleted == False)
+            .order_by(Product.id)
+        ).all()
+        suppliers = conn.execute(select(Supplier.id).where(Supplier.is_deleted == False)).scalars().all()
+        locations = conn.execute(
+            select(BusinessLocation.id).where(BusinessLocation.is_deleted == False, BusinessLocation.is_active == True)
+        ).scalars().all()
+    engine.dispose()
+
+    products = [
+        {"id": product_id, "word": name.split()[-2] if len(name.split()) > 1 else name, "prefix": name[:3]}
+        for product_id, name, _ in rows
+    ]
+    return Catalog(products, [1 + n for _, _, n in rows], suppliers, locations)
+
+
+def stock_snapshot(database_url):
+    """{product_id: (materialized balance, balance recomputed from movements)} for every product."""
+    engine = create_engine(database_url)
+    purchased = (
+        select(PurchaseItem.product_id, func.sum(PurchaseItem.quantity).label("quantity"))
+        .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+        .where(Purchase.is_deleted == False)
+        .group_by(PurchaseItem.product_id)
+    )
+    transferred = (
+        select(StockTransferItem.product_id, StockTransfer.transfer_type, func.sum(StockTransferItem.quantity))
+        .join(StockTransfer, StockTransfer.id == StockTransferItem.stock_transfer_id)
+        .where(StockTransfer.is_deleted == False)
+        .group_by(StockTransferItem.product_id, StockTransfer.transfer_type)
+    )
+    with engine.connect() as conn:
+        materialized = dict(conn.execute(select(StockBalance.product_id, StockBalance.quantity)).all())
+        # Movements archived out of closed periods are carried forward in the snapshots
+        recomputed = dict(conn.execute(select(StockBalanceSnapshot.product_id, StockBalanceSnapshot.quantity)).all())
+        for product_id, quantity in conn.execute(purchased):
+            recomputed[product_id] = recomputed.get(product_id, 0) + quantity
+        for product_id, transfer_type, quantity in conn.execute(transferred):
+            recomputed[product_id] = recomputed.get(product_id, 0) + (quantity if transfer_type == "IN" else -quantity)
+        product_ids = conn.execute(select(Product.id)).scalars().all()
+    engine.dispose()
+    return {pid: (materialized.get(pid, 0), recomputed.get(pid, 0)) for pid in product_ids}
+
+
+def check_consistency(before, after, ledger):
+    """Human-readable violations; an empty list means stock stayed consistent."""
+    violations = []
+    for product_id, (balance, recomputed) in sorted(after.items()):
+        expected = before.get(product_id, (0, 0))[0] + ledger.deltas.get(product_id, 0)
+        if balance != expected:
+            violations.append(
+                f"product {product_id}: balance {balance}, but the acknowledged writes add up to {expected}"
+            )
+        if balance != recomputed:
+            violations.append(f"product {product_id}: balance {balance}, but its movements add up to {recomputed}")
+        if recomputed < 0:
+            violations.append(f"product {product_id}: oversold, movements add up to {recomputed}")
+    return violations
@@ -0,0 +1,151 @@
+"""
+Scripted user scenarios. Each one is a short sequence of requests a real user
+makes, and SCENARIOS weights them into the traffic mix.
+
+Writes report what the server acknowledged to the Ledger, so the consistency
+checks know exactly how much stock each product should have.
+"""
+import http.client
+import json
+import threading
+import time
+from collections import defaultdict
+
+
+class Ledger:
+    """Stock changes the server acknowledged, per product."""
+
+    def __init__(self):
+        self.deltas = defaultdict(int)
+        self.rejected_outs = 0
+        self.lock = threading.Lock()
+
+    def record(self, changes):
+        with self.lock:
+            for product_id, quantity in changes:
+                self.deltas[product_id] += quantity
+
+    def reject_out(self):
+        with self.lock:
+            self.rejected_outs += 1
+
+
+class Recorder:
+    """Latency samples and failures per endpoint for one stage."""
+
+    def __init__(self):
+        self.attempts = defaultdict(int)
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)  # 5xx and connection failures
+        self.rejections = defaultdict(int)  # 4xx: the server refused the request
+        self.lock = threading.Lock()
+
+    def merge(self, attempts, latencies, errors, rejections):
+        with self.lock:
+            for label, count in attempts.items():
+                self.attempts[label] += count
+            for label, samples in latencies.items():
+                self.latencies[label].extend(samples)
+            for label, count in errors.items():
+                self.errors[label] += count
+            for label, count in rejections.items():
+                self.rejections[label] += count
+
+
+class Client:
+    """One simulated user's keep-alive connection; collects samples until flushed to a Recorder."""
+
+    def __init__(self, port):
+        self.port = port
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        self.attempts = defaultdict(int)
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.rejections = defaultdict(int)
+
+    def request(self, method, path, label, body=None):
+        """The decoded JSON response, or None if the request failed or was refused."""
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        payload = json.dumps(body) if body is not None else None
+        self.attempts[label] += 1
+        started = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.errors[label] += 1
+            self.conn.close()
+            self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+            return None
+        self.latencies[label].append(time.perf_counter() - started)
+
+        if response.status >= 500:
+            self.errors[label] += 1
+            return None
+        if response.status >= 400:
+            self.rejections[label] += 1
+            return None
+        return json.loads(data) if data else {}
+
+    def flush(self, recorder):
+        recorder.merge(self.attempts, self.latencies, self.errors, self.rejections)
+        self.attempts, self.latencies = defaultdict(int), defaultdict(list)
+        self.errors, self.rejections = defaultdict(int), defaultdict(int)
+
+    def close(self):
+        self.conn.close()
+
+
+def open_dashboard(client, rng, catalog, ledger):
+    client.request("GET", "/dashboard/summary", "GET /dashboard/summary")
+    client.request("GET", "/dashboard/movements?limit=20", "GET /dashboard/movements")
+    client.request("GET", "/alerts/low_stock", "GET /alerts/low_stock")
+
+
+def browse_inventory(client, rng, catalog, ledger):
+    client.request("GET", "/categories", "GET /categories")
+    product = catalog.pick(rng)
+    client.request("GET", f"/products/autocomplete?prefix={product['prefix']}", "GET /products/autocomplete")
+    client.request("GET", f"/products/search?q={product['word']}", "GET /products/search")
+    for _ in range(rng.randint(1, 3)):
+        client.request("GET", f"/products/{catalog.pick(rng)['id']}", "GET /products/<id>")
+
+
+def record_purchase(client, rng, catalog, ledger):
+    client.request("GET", "/suppliers", "GET /suppliers")
+    lines = {catalog.pick(rng)["id"]: rng.randint(5, 50) for _ in range(rng.randint(1, 4))}
+    body = {
+        "supplier_id": rng.choice(catalog.suppliers),
+        "total_cost": sum(q * 10 for q in lines.values()),
+        "items": [{"product_id": p, "quantity": q, "unit_cost": 10} for p, q in lines.items()],
+    }
+    if client.request("POST", "/purchases", "POST /purchases", body) is not None:
+        ledger.record(lines.items())
+
+
+def issue_out_transfer(client, rng, catalog, ledger):
+    # Check the stock, then take some of it, as the UI does; concurrent users race for the same units
+    product_id = catalog.pick(rng)["id"]
+    product = client.request("GET", f"/products/{product_id}", "GET /products/<id>")
+    if not product or product["stock_level"] <= 0:
+        return
+    quantity = rng.randint(1, max(1, min(product["stock_level"], 10)))
+    body = {
+        "transfer_type": "OUT",
+        "location_id": rng.choice(catalog.locations),
+        "items": [{"product_id": product_id, "quantity": quantity}],
+    }
+    if client.request("POST", "/stock_transfers", "POST /stock_transfers", body) is not None:
+        ledger.record([(product_id, -quantity)])
+    else:
+        ledger.reject_out()
+
+
+# (scenario, weight)
+SCENARIOS = [
+    (open_dashboard, 3),
+    (browse_inventory, 4),
+    (record_purchase, 1),
+    (issue_out_transfer, 2),
+]
@@ -0,0 +1,115 @@
+"""
+Peak memory of the list endpoints against committed budgets.
+
+Every list endpoint loads all its rows as ORM objects and builds their nested
+to_dict() output in one go, so a worker's memory grows with the table. This
+measures the peak Python allocation (tracemalloc) of one call to each route in
+ROUTES on the benchmark datasets (see datasets.py), and compares it with
+memory_budgets.json. Exits non-zero if any route exceeds its budget by more
+than `--tolerance`, so it can gate CI.
+
+    cd backend
+    python benchmarks/memory.py --scales 1k 100k
+
+After an intended change in memory use, record new budgets and commit them:
+
+    python benchmarks/memory.py --scales 1k 100k --update
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.datasets import SCALES, ensure_dataset, working_copy  # noqa: E402
+from benchmarks.endpoints import make_app  # noqa: E402
+
+BUDGETS_PATH = os.path.join(BACKEND_DIR, "benchmarks", "memory_budgets.json")
+
+ROUTES = ["/purchases/", "/products", "/stock_transfer_items", "/dashboard/summary"]
+
+
+def peak_allocation(client, url, runs):
+    """Smallest peak over `runs` traced calls, after an untraced one has warmed the caches."""
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} returned {response.status_code}")
+
+    peaks = []
+    for _ in range(runs):
+        tracemalloc.start()
+        client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+    return min(peaks)
+
+
+def measure(scale, seed, runs):
+    with tempfile.TemporaryDirectory(prefix="memory-") as directory:
+        app = make_app(working_copy(ensure_dataset(scale, seed), directory))
+        client = app.test_client()
+        results = {url: peak_allocation(client, url, runs) for url in ROUTES}
+        with app.app_context():
+            from app.models import db
+            db.engine.dispose()
+    return results
+
+
+def load_budgets():
+    if not os.path.exists(BUDGETS_PATH):
+        return {}
+    with open(BUDGETS_PATH) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check list endpoint memory against committed budgets")
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=["1k", "100k"])
+    parser.add_argument("--seed", type=int, default=0, help="Dataset random seed")
+    parser.add_argument("--runs", type=int, default=1, help="Traced calls per route; the smallest peak counts")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed growth over the budget, 0.10 = 10%%")
+    parser.add_argument("--update", action="store_true", help="Write the measured peaks as the new budgets")
+    args = parser.parse_args()
+
+    budgets = load_budgets()
+    failures = 0
+    for scale in args.scales:
+        print(f"🔄 Measuring at {scale}...")
+        results = measure(scale, args.seed, args.runs)
+        scale_budgets = budgets.get(scale, {})
+
+        for url, peak in results.items():
+            budget = scale_budgets.get(url)
+            if budget is None:
+                verdict = "no budget"
+                failures += not args.update
+            else:
+                change = (peak - budget) / budget
+                over = change > args.tolerance
+                verdict = f"budget {budget / 1024:>10,.0f} KiB  {change:+7.1%}" + ("  ❌" if over else "")
+                failures += over and not args.update
+            print(f"  {url:<24} {peak / 1024:>10,.0f} KiB  {verdict}")
+
+        if args.update:
+            budgets[scale] = results
+
+    if args.update:
+        with open(BUDGETS_PATH, "w") as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"✅ Budgets written to {os.path.relpath(BUDGETS_PATH, BACKEND_DIR)}")
+    elif failures:
+        print(f"❌ {failures} routes over budget (tolerance {args.tolerance:.0%}); "
+              f"if the growth is intended, rerun with --update and commit the budgets")
+        sys.exit(1)
+    else:
+        print("✅ All routes within budget")
+
+
+if __name__ == "__main__":
+    main()
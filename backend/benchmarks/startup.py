@@ -0,0 +1,97 @@
+"""
+Worker cold-start time in development and production STARTUP_MODE.
+
+Each run is a fresh interpreter (like a recycled gunicorn worker) that imports
+the app, calls create_app() and serves its first /apispec_1.json. The spec for
+production mode is built once up front with `flask openapi build`, as the
+deploy build step does. Exits non-zero if the production median boot exceeds
+`--target-ms`, so it can gate CI.
+
+    cd backend
+    python benchmarks/startup.py --runs 10 --target-ms 650
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+app = create_app()
+booted = time.perf_counter()
+response = app.test_client().get("/apispec_1.json")
+assert response.status_code == 200, response.status_code
+print(json.dumps({"boot": booted - started, "first_spec": time.perf_counter() - booted}))
+"""
+
+
+def run_worker(env):
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process"] = time.perf_counter() - started
+    return timings
+
+
+def measure(modes, runs, env):
+    """Median timings per mode; runs alternate between modes so machine noise hits both alike."""
+    envs = {mode: dict(env, STARTUP_MODE=mode) for mode in modes}
+    for mode in modes:
+        run_worker(envs[mode])  # warm the OS file cache
+    samples = {mode: [] for mode in modes}
+    for _ in range(runs):
+        for mode in modes:
+            samples[mode].append(run_worker(envs[mode]))
+    return [
+        {"mode": mode, **{key: statistics.median(s[key] for s in samples[mode]) * 1000
+                          for key in ("boot", "first_spec", "process")}}
+        for mode in modes
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=650.0, help="Max median production boot (import + create_app)")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="startup-bench-")
+    env = dict(
+        os.environ,
+        DATABASE_URL=os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(directory, 'bench.db')}"),
+        OPENAPI_SPEC_PATH=os.path.join(directory, "openapi.json"),
+        ALERT_EVALUATOR_INTERVAL="0",
+        JOB_WORKERS="0",
+    )
+    subprocess.run(
+        [sys.executable, "-m", "flask", "--app", "run", "openapi", "build"],
+        cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL
+    )
+
+    print(f"🔄 {args.runs} cold starts per mode")
+    results = measure(("development", "production"), args.runs, env)
+
+    print(f"{'mode':<12} {'boot ms':>9} {'1st spec ms':>12} {'process ms':>11}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['boot']:>9.0f} {r['first_spec']:>12.1f} {r['process']:>11.0f}")
+
+    production = results[-1]
+    if production["boot"] > args.target_ms:
+        print(f"❌ Production boot {production['boot']:.0f} ms is over the {args.target_ms:.0f} ms target")
+        sys.exit(1)
+    print(f"✅ Production boot {production['boot']:.0f} ms is within the {args.target_ms:.0f} ms target")
+
+
+if __name__ == "__main__":
+    main()
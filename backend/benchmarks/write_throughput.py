@@ -0,0 +1,126 @@
+"""
+Write throughput of concurrent workers under each engine profile.
+
+For every profile a fresh SQLite database is created and `--workers` processes
+(standing in for gunicorn workers) create purchases and IN transfers through
+the API for `--duration` seconds, reading the movements feed between writes.
+Reports writes/s, p50/p95 write latency and how many writes failed with
+"database is locked".
+
+    cd backend
+    python benchmarks/write_throughput.py --workers 4 --duration 15 --profiles legacy default
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PRODUCTS = 50
+
+
+def make_app(database_url, profile):
+    os.environ.update(DATABASE_URL=database_url, DB_PROFILE=profile, ALERT_EVALUATOR_INTERVAL="0")
+    from app import create_app
+    return create_app()
+
+
+def seed(database_url, profile):
+    client = make_app(database_url, profile).test_client()
+    category = client.post("/categories", json={"name": "Bench"}).get_json()
+    client.post("/suppliers", json={"name": "Bench Supplier"})
+    client.post("/business_locations", json={"name": "Bench Location"})
+    for n in range(PRODUCTS):
+        client.post("/products", json={"name": f"Bench {n}", "sku": f"B-{n}", "category_id": category["id"]})
+
+
+def worker(database_url, profile, duration, offset, results):
+    client = make_app(database_url, profile).test_client()
+    latencies, locked, failed = [], 0, 0
+    n = offset
+    deadline = time.monotonic() + duration
+
+    while time.monotonic() < deadline:
+        n += 1
+        product_id = 1 + n % PRODUCTS
+        if n % 2:
+            url, body = "/purchases", {
+                "supplier_id": 1, "total_cost": 50,
+                "items": [{"product_id": product_id, "quantity": 5, "unit_cost": 10}]
+            }
+        else:
+            url, body = "/stock_transfers", {
+                "transfer_type": "IN", "location_id": 1,
+                "items": [{"product_id": product_id, "quantity": 2}]
+            }
+
+        started = time.perf_counter()
+        response = client.post(url, json=body)
+        elapsed = time.perf_counter() - started
+
+        if response.status_code == 201:
+            latencies.append(elapsed)
+        elif "locked" in response.get_data(as_text=True):
+            locked += 1
+        else:
+            failed += 1
+        client.get("/dashboard/movements")
+
+    results.put((latencies, locked, failed))
+
+
+def benchmark(profile, args):
+    directory = tempfile.mkdtemp(prefix="write-bench-")
+    database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+
+    context = multiprocessing.get_context("spawn")
+    setup = context.Process(target=seed, args=(database_url, profile))
+    setup.start()
+    setup.join()
+
+    results = context.Queue()
+    workers = [
+        context.Process(target=worker, args=(database_url, profile, args.duration, n * 1000, results))
+        for n in range(args.workers)
+    ]
+    for w in workers:
+        w.start()
+    collected = [results.get() for _ in workers]
+    for w in workers:
+        w.join()
+
+    latencies = sorted(l for result in collected for l in result[0])
+    return {
+        "profile": profile,
+        "writes": len(latencies),
+        "wps": len(latencies) / args.duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        "locked": sum(result[1] for result in collected),
+        "failed": sum(result[2] for result in collected),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds of load per profile")
+    parser.add_argument("--profiles", nargs="+", default=["legacy", "default", "production"])
+    args = parser.parse_args()
+
+    print(f"🔄 {args.workers} concurrent writers, {args.duration:g}s per profile")
+    results = [benchmark(profile, args) for profile in args.profiles]
+
+    print(f"{'profile':<11} {'writes':>7} {'writes/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'locked':>7} {'failed':>7}")
+    for r in results:
+        print(f"{r['profile']:<11} {r['writes']:>7} {r['wps']:>9.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+              f"{r['locked']:>7} {r['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Gunicorn settings, picked up automatically when gunicorn runs from backend/.
+
+Prometheus metrics (app/metrics.py) are written by each worker to a shared
+PROMETHEUS_MULTIPROC_DIR so /metrics reports totals across all workers rather
+than just the worker that answers the scrape.
+"""
+import glob
+import os
+import shutil
+import tempfile
+
+multiprocess = None
+_created_dir = None
+
+
+def on_starting(server):
+    global multiprocess, _created_dir
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        # Drop samples left over from a previous run
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+    else:
+        _created_dir = tempfile.mkdtemp(prefix="prometheus-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = _created_dir
+
+    # prometheus_client picks its storage when first imported, so only import it once the
+    # directory is set; workers forked from here inherit the multiprocess mode
+    from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    if _created_dir:
+        shutil.rmtree(_created_dir, ignore_errors=True)
@@ -0,0 +1,94 @@
+"""Add reorder thresholds, stock balances and stock alerts
+
+Revision ID: 5e9d2b7c4a13
+Revises: a4c1e7f09b52
+Create Date: 2026-10-19 11:04:52.317240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9d2b7c4a13'
+down_revision = 'a4c1e7f09b52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('categories', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('default_reorder_point', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('default_reorder_quantity', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reorder_point', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('reorder_quantity', sa.Integer(), nullable=True))
+
+    op.create_table('stock_balances',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], name='fk_stock_balances_product_id'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    with op.batch_alter_table('stock_balances', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stock_balances_quantity'), ['quantity'], unique=False)
+
+    op.create_table('stock_alerts',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('stock_level', sa.Integer(), nullable=False),
+    sa.Column('reorder_point', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], name='fk_stock_alerts_product_id'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    with op.batch_alter_table('stock_alerts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stock_alerts_status'), ['status'], unique=False)
+
+    op.create_table('stock_alert_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('from_status', sa.String(length=10), nullable=False),
+    sa.Column('to_status', sa.String(length=10), nullable=False),
+    sa.Column('stock_level', sa.Integer(), nullable=False),
+    sa.Column('reorder_point', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], name='fk_stock_alert_events_product_id'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('stock_alert_events', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stock_alert_events_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_stock_alert_events_product_id'), ['product_id'], unique=False)
+
+    # Backfill balances from the rollups (same rules as `flask reports rebuild-rollups`)
+    op.execute("""
+        INSERT INTO stock_balances (product_id, quantity)
+        SELECT product_id,
+               SUM(CASE WHEN movement_type = 'OUT' THEN -quantity ELSE quantity END)
+        FROM daily_movement_rollups
+        GROUP BY product_id
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('stock_alert_events', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stock_alert_events_product_id'))
+        batch_op.drop_index(batch_op.f('ix_stock_alert_events_created_at'))
+
+    op.drop_table('stock_alert_events')
+    with op.batch_alter_table('stock_alerts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stock_alerts_status'))
+
+    op.drop_table('stock_alerts')
+    with op.batch_alter_table('stock_balances', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stock_balances_quantity'))
+
+    op.drop_table('stock_balances')
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_column('reorder_quantity')
+        batch_op.drop_column('reorder_point')
+
+    with op.batch_alter_table('categories', schema=None) as batch_op:
+        batch_op.drop_column('default_reorder_quantity')
+        batch_op.drop_column('default_reorder_point')
@@ -0,0 +1,61 @@
+"""Add product search index
+
+Revision ID: 7b2e94d0f6a8
+Revises: c83f0a6d21e7
+Create Date: 2026-10-19 13:40:27.115093
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e94d0f6a8'
+down_revision = 'c83f0a6d21e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 on SQLite, tsvector + pg_trgm on Postgres; see app/search.py
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("""
+            CREATE TABLE product_search (
+                product_id INTEGER PRIMARY KEY REFERENCES products (id) ON DELETE CASCADE,
+                document TEXT NOT NULL,
+                search_vector TSVECTOR NOT NULL
+            )
+        """)
+        op.execute("CREATE INDEX ix_product_search_vector ON product_search USING GIN (search_vector)")
+        op.execute("CREATE INDEX ix_product_search_trgm ON product_search USING GIN (document gin_trgm_ops)")
+        op.execute("""
+            INSERT INTO product_search (product_id, document, search_vector)
+            SELECT p.id,
+                   concat_ws(' ', p.name, p.sku, p.description, c.name),
+                   setweight(to_tsvector('simple', p.name), 'A')
+                   || setweight(to_tsvector('simple', COALESCE(p.sku, '')), 'A')
+                   || setweight(to_tsvector('simple', c.name), 'B')
+                   || setweight(to_tsvector('simple', COALESCE(p.description, '')), 'C')
+            FROM products p
+            JOIN categories c ON c.id = p.category_id
+            WHERE p.is_deleted = false AND c.is_deleted = false
+        """)
+    else:
+        op.execute("""
+            CREATE VIRTUAL TABLE product_search USING fts5(
+                name, sku, description, category,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        """)
+        op.execute("""
+            INSERT INTO product_search (rowid, name, sku, description, category)
+            SELECT p.id, p.name, COALESCE(p.sku, ''), COALESCE(p.description, ''), c.name
+            FROM products p
+            JOIN categories c ON c.id = p.category_id
+            WHERE p.is_deleted = false AND c.is_deleted = false
+        """)
+
+
+def downgrade():
+    op.execute("DROP TABLE product_search")
@@ -0,0 +1,76 @@
+"""Add daily movement rollups
+
+Revision ID: a4c1e7f09b52
+Revises: 1335d8a56edd
+Create Date: 2026-10-19 09:12:41.508113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c1e7f09b52'
+down_revision = '1335d8a56edd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_movement_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=True),
+    sa.Column('movement_type', sa.String(length=10), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['location_id'], ['business_locations.id'], name='fk_daily_movement_rollups_location_id'),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], name='fk_daily_movement_rollups_product_id'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'product_id', 'location_id', 'movement_type', name='uq_daily_movement_rollups_key')
+    )
+    with op.batch_alter_table('daily_movement_rollups', schema=None) as batch_op:
+        batch_op.create_index('ix_daily_movement_rollups_day_type', ['day', 'movement_type'], unique=False)
+
+    # Backfill from existing history (same rules as `flask reports rebuild-rollups`, which
+    # counts is_deleted = false only), so older NULL flags are made explicit first
+    for table in ('purchases', 'stock_transfers'):
+        flags = sa.table(table, sa.column('is_deleted', sa.Boolean))
+        op.execute(flags.update().where(flags.c.is_deleted.is_(None)).values(is_deleted=False))
+
+    op.execute("""
+        INSERT INTO daily_movement_rollups (day, product_id, location_id, movement_type, quantity, value)
+        SELECT date(p.purchase_date), pi.product_id, NULL, 'PURCHASE',
+               SUM(pi.quantity), SUM(pi.quantity * pi.unit_cost)
+        FROM purchase_items pi
+        JOIN purchases p ON p.id = pi.purchase_id
+        WHERE p.is_deleted = false
+        GROUP BY date(p.purchase_date), pi.product_id
+    """)
+    op.execute("""
+        INSERT INTO daily_movement_rollups (day, product_id, location_id, movement_type, quantity, value)
+        SELECT date(t.date), ti.product_id, t.location_id, t.transfer_type,
+               SUM(ti.quantity),
+               SUM(ti.quantity * COALESCE((
+                   SELECT pi.unit_cost
+                   FROM purchase_items pi
+                   JOIN purchases p ON p.id = pi.purchase_id
+                   WHERE pi.product_id = ti.product_id
+                     AND p.is_deleted = false
+                     AND p.purchase_date <= t.date
+                   ORDER BY p.purchase_date DESC, pi.id DESC
+                   LIMIT 1
+               ), 0))
+        FROM stock_transfer_items ti
+        JOIN stock_transfers t ON t.id = ti.stock_transfer_id
+        WHERE t.is_deleted = false
+        GROUP BY date(t.date), ti.product_id, t.location_id, t.transfer_type
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('daily_movement_rollups', schema=None) as batch_op:
+        batch_op.drop_index('ix_daily_movement_rollups_day_type')
+
+    op.drop_table('daily_movement_rollups')
@@ -0,0 +1,37 @@
+"""Index foreign keys of purchase and transfer items
+
+Revision ID: b5d81f3c9e20
+Revises: e3a9c5f1b7d2
+Create Date: 2026-10-19 16:40:27.113052
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d81f3c9e20'
+down_revision = 'e3a9c5f1b7d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Item lookups by product (stock levels, rollup costing) and by parent (eager loads)
+    with op.batch_alter_table('purchase_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_purchase_items_purchase_id'), ['purchase_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_purchase_items_product_id'), ['product_id'], unique=False)
+
+    with op.batch_alter_table('stock_transfer_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stock_transfer_items_stock_transfer_id'), ['stock_transfer_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_stock_transfer_items_product_id'), ['product_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stock_transfer_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stock_transfer_items_product_id'))
+        batch_op.drop_index(batch_op.f('ix_stock_transfer_items_stock_transfer_id'))
+
+    with op.batch_alter_table('purchase_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_purchase_items_product_id'))
+        batch_op.drop_index(batch_op.f('ix_purchase_items_purchase_id'))
@@ -0,0 +1,62 @@
+"""Key daily movement rollups on coalesce(location_id, 0)
+
+Revision ID: b83f2d6a1c45
+Revises: d4a8e1c6b2f7
+Create Date: 2026-10-19 18:05:12.730214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b83f2d6a1c45'
+down_revision = 'd4a8e1c6b2f7'
+branch_labels = None
+depends_on = None
+
+KEY = "day, product_id, coalesce(location_id, 0), movement_type"
+
+
+def upgrade():
+    # Purchase rows have a NULL location, which the old unique constraint never matched,
+    # so concurrent flushes could insert the same key twice; merge those into the lowest id
+    op.execute(f"""
+        UPDATE daily_movement_rollups
+        SET quantity = (
+                SELECT SUM(r.quantity) FROM daily_movement_rollups r
+                WHERE r.day = daily_movement_rollups.day
+                  AND r.product_id = daily_movement_rollups.product_id
+                  AND coalesce(r.location_id, 0) = coalesce(daily_movement_rollups.location_id, 0)
+                  AND r.movement_type = daily_movement_rollups.movement_type
+            ),
+            value = (
+                SELECT SUM(r.value) FROM daily_movement_rollups r
+                WHERE r.day = daily_movement_rollups.day
+                  AND r.product_id = daily_movement_rollups.product_id
+                  AND coalesce(r.location_id, 0) = coalesce(daily_movement_rollups.location_id, 0)
+                  AND r.movement_type = daily_movement_rollups.movement_type
+            )
+        WHERE id IN (
+            SELECT MIN(id) FROM daily_movement_rollups GROUP BY {KEY} HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute(f"""
+        DELETE FROM daily_movement_rollups
+        WHERE id NOT IN (SELECT MIN(id) FROM daily_movement_rollups GROUP BY {KEY})
+    """)
+
+    with op.batch_alter_table('daily_movement_rollups', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_daily_movement_rollups_key', type_='unique')
+    op.create_index(
+        'uq_daily_movement_rollups_key', 'daily_movement_rollups',
+        ['day', 'product_id', sa.text('coalesce(location_id, 0)'), 'movement_type'], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('uq_daily_movement_rollups_key', table_name='daily_movement_rollups')
+    with op.batch_alter_table('daily_movement_rollups', schema=None) as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_daily_movement_rollups_key', ['day', 'product_id', 'location_id', 'movement_type']
+        )
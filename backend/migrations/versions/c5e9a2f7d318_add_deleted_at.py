@@ -0,0 +1,35 @@
+"""Record when suppliers, products, purchases and transfers are soft-deleted
+
+Revision ID: c5e9a2f7d318
+Revises: b83f2d6a1c45
+Create Date: 2026-10-19 18:40:27.114903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e9a2f7d318'
+down_revision = 'b83f2d6a1c45'
+branch_labels = None
+depends_on = None
+
+# Archive tables mirror their source's columns, so they get it too
+TABLES = (
+    'suppliers', 'products', 'purchases', 'stock_transfers',
+    'archived_suppliers', 'archived_products', 'archived_purchases', 'archived_stock_transfers',
+)
+
+
+def upgrade():
+    # Left NULL on rows already deleted: when that happened isn't known
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('deleted_at')
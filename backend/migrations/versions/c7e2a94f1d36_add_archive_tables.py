@@ -0,0 +1,136 @@
+"""Add archive tables and carried-forward stock balance snapshots
+
+Revision ID: c7e2a94f1d36
+Revises: b5d81f3c9e20
+Create Date: 2026-10-19 16:48:27.301945
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2a94f1d36'
+down_revision = 'b5d81f3c9e20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_balance_snapshots',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_cost', sa.Float(), nullable=True),
+    sa.Column('unit_cost_date', sa.DateTime(), nullable=True),
+    sa.Column('archived_through', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], name='fk_stock_balance_snapshots_product_id'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_table('archived_suppliers',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('contact', sa.String(length=100), nullable=True),
+    sa.Column('address', sa.String(length=255), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('archive_reason', sa.String(length=10), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('archived_products',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('sku', sa.String(length=50), nullable=True),
+    sa.Column('unit', sa.String(length=20), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('reorder_point', sa.Integer(), nullable=True),
+    sa.Column('reorder_quantity', sa.Integer(), nullable=True),
+    sa.Column('abc_class', sa.String(length=1), nullable=True),
+    sa.Column('annual_consumption_value', sa.Float(), nullable=True),
+    sa.Column('abc_stale', sa.Boolean(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('archive_reason', sa.String(length=10), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('archived_purchases',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('supplier_id', sa.Integer(), nullable=False),
+    sa.Column('total_cost', sa.Float(), nullable=False),
+    sa.Column('purchase_date', sa.DateTime(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('archive_reason', sa.String(length=10), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('archived_purchases', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_archived_purchases_purchase_date'), ['purchase_date'], unique=False)
+
+    op.create_table('archived_purchase_items',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('purchase_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_cost', sa.Float(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('archive_reason', sa.String(length=10), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('archived_purchase_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_archived_purchase_items_product_id'), ['product_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_archived_purchase_items_purchase_id'), ['purchase_id'], unique=False)
+
+    op.create_table('archived_stock_transfers',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=True),
+    sa.Column('transfer_type', sa.String(length=10), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('archive_reason', sa.String(length=10), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('archived_stock_transfers', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_archived_stock_transfers_date'), ['date'], unique=False)
+
+    op.create_table('archived_stock_transfer_items',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('stock_transfer_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('archive_reason', sa.String(length=10), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('archived_stock_transfer_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_archived_stock_transfer_items_product_id'), ['product_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_archived_stock_transfer_items_stock_transfer_id'), ['stock_transfer_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('archived_stock_transfer_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_archived_stock_transfer_items_product_id'))
+        batch_op.drop_index(batch_op.f('ix_archived_stock_transfer_items_stock_transfer_id'))
+
+    op.drop_table('archived_stock_transfer_items')
+    with op.batch_alter_table('archived_stock_transfers', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_archived_stock_transfers_date'))
+
+    op.drop_table('archived_stock_transfers')
+    with op.batch_alter_table('archived_purchase_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_archived_purchase_items_product_id'))
+        batch_op.drop_index(batch_op.f('ix_archived_purchase_items_purchase_id'))
+
+    op.drop_table('archived_purchase_items')
+    with op.batch_alter_table('archived_purchases', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_archived_purchases_purchase_date'))
+
+    op.drop_table('archived_purchases')
+    op.drop_table('archived_products')
+    op.drop_table('archived_suppliers')
+    op.drop_table('stock_balance_snapshots')
@@ -0,0 +1,35 @@
+"""Add ABC classification to products
+
+Revision ID: c83f0a6d21e7
+Revises: 5e9d2b7c4a13
+Create Date: 2026-10-19 12:21:09.882410
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c83f0a6d21e7'
+down_revision = '5e9d2b7c4a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('abc_class', sa.String(length=1), nullable=True))
+        batch_op.add_column(sa.Column('annual_consumption_value', sa.Float(), nullable=True))
+        # Existing products start stale so the first run classifies all of them
+        batch_op.add_column(sa.Column('abc_stale', sa.Boolean(), nullable=False, server_default=sa.true()))
+        batch_op.create_index(batch_op.f('ix_products_abc_class'), ['abc_class'], unique=False)
+        batch_op.create_index(batch_op.f('ix_products_abc_stale'), ['abc_stale'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_products_abc_stale'))
+        batch_op.drop_index(batch_op.f('ix_products_abc_class'))
+        batch_op.drop_column('abc_stale')
+        batch_op.drop_column('annual_consumption_value')
+        batch_op.drop_column('abc_class')
@@ -0,0 +1,47 @@
+"""Backfill NULL is_deleted flags and add partial indexes over live rows
+
+Revision ID: d4a8e1c6b2f7
+Revises: c7e2a94f1d36
+Create Date: 2026-10-19 17:20:41.508316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8e1c6b2f7'
+down_revision = 'c7e2a94f1d36'
+branch_labels = None
+depends_on = None
+
+SOFT_DELETE_TABLES = ('categories', 'suppliers', 'products', 'purchases', 'business_locations', 'stock_transfers')
+
+LIVE_INDEXES = (
+    ('products', 'category_id'),
+    ('purchases', 'purchase_date'),
+    ('purchases', 'supplier_id'),
+    ('stock_transfers', 'date'),
+    ('stock_transfers', 'location_id'),
+)
+
+
+def upgrade():
+    # The session-wide soft-delete filter matches is_deleted = false only, which rows
+    # written before the column had a default (NULL) would fail
+    for table in SOFT_DELETE_TABLES:
+        flags = sa.table(table, sa.column('is_deleted', sa.Boolean))
+        op.execute(flags.update().where(flags.c.is_deleted.is_(None)).values(is_deleted=False))
+
+    # Same predicate as the filter, so queries over live rows are answered from these indexes
+    for table, column in LIVE_INDEXES:
+        live = sa.column('is_deleted', sa.Boolean) == sa.false()
+        op.create_index(
+            f'ix_{table}_live_{column}', table, [column], unique=False,
+            sqlite_where=live, postgresql_where=live
+        )
+
+
+def downgrade():
+    for table, column in reversed(LIVE_INDEXES):
+        op.drop_index(f'ix_{table}_live_{column}', table_name=table)
@@ -0,0 +1,51 @@
+"""Queue products for ABC reclassification in abc_stale_products
+
+Revision ID: d9b4f1a6e273
+Revises: c5e9a2f7d318
+Create Date: 2026-10-19 19:12:50.361742
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9b4f1a6e273'
+down_revision = 'c5e9a2f7d318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('abc_stale_products',
+    sa.Column('product_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+
+    products = sa.table('products', sa.column('id', sa.Integer), sa.column('abc_stale', sa.Boolean))
+    stale = sa.table('abc_stale_products', sa.column('product_id', sa.Integer))
+    op.execute(stale.insert().from_select(
+        ['product_id'], sa.select(products.c.id).where(products.c.abc_stale == sa.true())
+    ))
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_products_abc_stale'))
+        batch_op.drop_column('abc_stale')
+
+    with op.batch_alter_table('archived_products', schema=None) as batch_op:
+        batch_op.drop_column('abc_stale')
+
+
+def downgrade():
+    with op.batch_alter_table('archived_products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('abc_stale', sa.Boolean(), nullable=False, server_default=sa.true()))
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('abc_stale', sa.Boolean(), nullable=False, server_default=sa.true()))
+        batch_op.create_index(batch_op.f('ix_products_abc_stale'), ['abc_stale'], unique=False)
+
+    products = sa.table('products', sa.column('id', sa.Integer), sa.column('abc_stale', sa.Boolean))
+    stale = sa.table('abc_stale_products', sa.column('product_id', sa.Integer))
+    op.execute(products.update().where(~products.c.id.in_(sa.select(stale.c.product_id))).values(abc_stale=False))
+
+    op.drop_table('abc_stale_products')
@@ -19,7 +19,7 @@ import {
 import { Input } from "@/components/ui/input";
 import { Button } from "@/components/ui/button";
 import { X } from "lucide-react";
-import { apiRequest, queryClient } from "@/lib/queryClient";
+import { apiFetch, apiRequest, queryClient } from "@/lib/queryClient";
 import { useToast } from "@/hooks/use-toast";
 import { BASE_URL } from "@/lib/constants";
 
@@ -39,7 +39,7 @@ export default function AddBusinessModal({ isOpen, onClose }) {
 
   const createBusinessMutation = useMutation({
     mutationFn: async (data) => {
-      const response = await fetch(`${BASE_URL}/business_locations`, {
+      const response = await apiFetch(`${BASE_URL}/business_locations`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -1,12 +1,13 @@
 import { useQuery } from "@tanstack/react-query";
 import { Card, CardContent } from "@/components/ui/card";
 import { Package, AlertTriangle } from "lucide-react";
+import { apiFetch } from "@/lib/queryClient";
 
 export default function DashboardSummary() {
   const { data = {}, isLoading } = useQuery({
     queryKey: ["/dashboard/summary"],
     queryFn: async () => {
-      const res = await fetch("http://127.0.0.1:5000/dashboard/summary");
+      const res = await apiFetch("http://127.0.0.1:5000/dashboard/summary");
       if (!res.ok) throw new Error("Failed to fetch summary");
       return res.json();
     },
@@ -25,7 +25,7 @@ import { useForm } from "react-hook-form";
 import { zodResolver } from "@hookform/resolvers/zod";
 import { useMutation, useQuery } from "@tanstack/react-query";
 import { z } from "zod";
-import { apiRequest, queryClient } from "@/lib/queryClient";
+import { apiFetch, apiRequest, queryClient } from "@/lib/queryClient";
 import { useToast } from "@/hooks/use-toast";
 import { BASE_URL } from "@/lib/constants";
 
@@ -52,7 +52,7 @@ export default function AddItemModal({ isOpen, onClose }) {
   const { data: categories = [] } = useQuery({
     queryKey: [`${BASE_URL}/categories`],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/categories`);
+      const res = await apiFetch(`${BASE_URL}/categories`);
       return await res.json();
     },
   });
@@ -15,7 +15,7 @@ import { Input } from "@/components/ui/input";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
 import { Button } from "@/components/ui/button";
 import { useToast } from "@/hooks/use-toast";
-import { apiRequest, queryClient } from "@/lib/queryClient";
+import { apiFetch, apiRequest, queryClient } from "@/lib/queryClient";
 import { z } from "zod";
 import { useQuery } from "@tanstack/react-query";
 import { useEffect } from "react";
@@ -35,7 +35,7 @@ export default function EditItemModal({ isOpen, onClose, item }) {
   const { data: categories = [] } = useQuery({
     queryKey: [`${BASE_URL}/categories`],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/categories`);
+      const res = await apiFetch(`${BASE_URL}/categories`);
       const data = await res.json();
       return Array.isArray(data) ? data : [];
     },
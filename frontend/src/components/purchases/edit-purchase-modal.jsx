@@ -4,7 +4,7 @@ import { zodResolver } from "@hookform/resolvers/zod";
 import { z } from "zod";
 import { useMutation, useQuery } from "@tanstack/react-query";
 
-import { apiRequest, queryClient } from "@/lib/queryClient";
+import { apiFetch, apiRequest, queryClient } from "@/lib/queryClient";
 import { useToast } from "@/hooks/use-toast";
 import { BASE_URL } from "@/lib/constants";
 
@@ -60,7 +60,7 @@ export default function EditPurchaseModal({ isOpen, onClose, purchase }) {
   const { data: suppliers = [] } = useQuery({
     queryKey: [`${BASE_URL}/suppliers`],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/suppliers`);
+      const res = await apiFetch(`${BASE_URL}/suppliers`);
       if (!res.ok) throw new Error("Failed to fetch suppliers");
       return res.json();
     },
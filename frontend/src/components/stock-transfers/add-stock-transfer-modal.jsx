@@ -4,7 +4,7 @@ import { zodResolver } from "@hookform/resolvers/zod";
 import { z } from "zod";
 import { useMutation, useQuery } from "@tanstack/react-query";
 
-import { apiRequest, queryClient } from "@/lib/queryClient";
+import { apiFetch, apiRequest, queryClient } from "@/lib/queryClient";
 import { useToast } from "@/hooks/use-toast";
 import { BASE_URL } from "@/lib/constants";
 
@@ -64,7 +64,7 @@ export default function AddStockTransferModal({ isOpen, onClose }) {
   const { data: locations = [] } = useQuery({
     queryKey: ["business_locations"],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/business_locations`);
+      const res = await apiFetch(`${BASE_URL}/business_locations`);
       if (!res.ok) throw new Error("Failed to fetch locations");
       return res.json();
     },
@@ -75,7 +75,7 @@ export default function AddStockTransferModal({ isOpen, onClose }) {
   const { data: products = [] } = useQuery({
     queryKey: ["products"],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/products`);
+      const res = await apiFetch(`${BASE_URL}/products`);
       if (!res.ok) throw new Error("Failed to fetch products");
       return res.json();
     },
@@ -18,8 +18,26 @@ async function throwIfResNotOk(res) {
   }
 }
 
+// Read-your-writes with the backend's read replica: a write answers with an
+// X-Primary-Until header, and sending it back until then keeps our reads on the
+// primary. (Cookies aren't sent cross-site, so the header carries it.)
+let primaryUntil = 0;
+
+export async function apiFetch(url, options = {}) {
+  const headers = new Headers(options.headers);
+  if (Date.now() / 1000 < primaryUntil) {
+    headers.set("X-Primary-Until", String(primaryUntil));
+  }
+  const res = await fetch(url, { ...options, headers });
+  const until = parseFloat(res.headers.get("X-Primary-Until"));
+  if (until > primaryUntil) {
+    primaryUntil = until;
+  }
+  return res;
+}
+
 export async function apiRequest(method, url, data) {
-  const res = await fetch(url, {
+  const res = await apiFetch(url, {
     method,
     headers: data ? { "Content-Type": "application/json" } : {},
     body: data ? JSON.stringify(data) : undefined,
@@ -33,7 +51,7 @@ export async function apiRequest(method, url, data) {
 
 export function getQueryFn({ on401 }) {
   return async ({ queryKey }) => {
-    const res = await fetch(queryKey[0]); 
+    const res = await apiFetch(queryKey[0]);
 
     if (on401 === "returnNull" && res.status === 401) {
       return null;
@@ -17,6 +17,7 @@ import EditBusinessModal from "@/components/businesses/edit-business-modal";
 import ViewBusinessModal from "@/components/businesses/view-business-modal";
 import { useToast } from "@/hooks/use-toast";
 import { BASE_URL } from "@/lib/constants";
+import { apiFetch } from "@/lib/queryClient";
 
 export default function Businesses() {
   const [isAddModalOpen, setIsAddModalOpen] = useState(false);
@@ -33,7 +34,7 @@ export default function Businesses() {
   } = useQuery({
     queryKey: ["business_locations"],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/business_locations`);
+      const res = await apiFetch(`${BASE_URL}/business_locations`);
       if (!res.ok) throw new Error("Failed to fetch business locations");
       return res.json();
     },
@@ -17,6 +17,7 @@ import { BASE_URL } from "@/lib/constants";
 import AddCategoryModal from "@/components/categories/add-category-modal";
 import EditCategoryModal from "@/components/categories/edit-category-modal";
 import DeleteCategoryModal from "@/components/categories/delete-category-modal";
+import { apiFetch } from "@/lib/queryClient";
 
 export default function Categories() {
   const { toast } = useToast();
@@ -35,7 +36,7 @@ export default function Categories() {
   } = useQuery({
     queryKey: ["categories"],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/categories`);
+      const res = await apiFetch(`${BASE_URL}/categories`);
       if (!res.ok) {
         const text = await res.text();
         throw new Error(`Failed to fetch categories: ${text}`);
@@ -71,7 +72,7 @@ export default function Categories() {
     }
 
     try {
-      const res = await fetch(`${BASE_URL}/categories/${selectedCategory.id}`, {
+      const res = await apiFetch(`${BASE_URL}/categories/${selectedCategory.id}`, {
         method: "DELETE",
       });
       const text = await res.text();
@@ -25,16 +25,17 @@ import {
   History
 } from "lucide-react";
 import { BASE_URL } from "@/lib/constants";
+import { apiFetch } from "@/lib/queryClient";
 
 export default function Dashboard() {
   const { data: stats = {}, isLoading: statsLoading, error: statsError } = useQuery({
     queryKey: ["dashboard-summary"],
-    queryFn: () => fetch(`${BASE_URL}/dashboard/summary`).then((r) => r.json())
+    queryFn: () => apiFetch(`${BASE_URL}/dashboard/summary`).then((r) => r.json())
   });
 
   const { data: movements = [], isLoading: movLoading } = useQuery({
     queryKey: ["dashboard-movements"],
-    queryFn: () => fetch(`${BASE_URL}/dashboard/movements`).then((r) => r.json())
+    queryFn: () => apiFetch(`${BASE_URL}/dashboard/movements`).then((r) => r.json())
   });
 
   const isLoading = statsLoading || movLoading;
@@ -24,7 +24,7 @@ import { Search, Plus, Edit, Trash2, ArrowUpDown } from "lucide-react";
 import AddItemModal from "@/components/inventory/add-item-modal";
 import EditItemModal from "@/components/inventory/edit-item-modal";
 
-import { queryClient, apiRequest } from "@/lib/queryClient";
+import { apiFetch, queryClient, apiRequest } from "@/lib/queryClient";
 import { useToast } from "@/hooks/use-toast";
 import { BASE_URL } from "@/lib/constants";
 
@@ -45,7 +45,7 @@ export default function Inventory() {
   const { data: items = [], isLoading } = useQuery({
     queryKey: [`${BASE_URL}/products`],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/products`);
+      const res = await apiFetch(`${BASE_URL}/products`);
       const data = await res.json();
       return Array.isArray(data) ? data : [];
     },
@@ -54,7 +54,7 @@ export default function Inventory() {
   const { data: categories = [] } = useQuery({
     queryKey: [`${BASE_URL}/categories`],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/categories`);
+      const res = await apiFetch(`${BASE_URL}/categories`);
       const data = await res.json();
       return Array.isArray(data) ? data : data.categories || [];
     },
@@ -17,6 +17,7 @@ import PrintPurchaseModal from "@/components/purchases/print-purchase-modal";
 import { BASE_URL } from "@/lib/constants";
 import { useToast } from "@/hooks/use-toast";
 import { useReactToPrint } from "react-to-print";
+import { apiFetch } from "@/lib/queryClient";
 
 export default function Purchases() {
   const [isAddModalOpen, setIsAddModalOpen] = useState(false);
@@ -48,7 +49,7 @@ export default function Purchases() {
   } = useQuery({
     queryKey: [`${BASE_URL}/purchases`],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/purchases`);
+      const res = await apiFetch(`${BASE_URL}/purchases`);
       if (!res.ok) throw new Error("Failed to fetch purchases");
       return res.json();
     },
@@ -61,7 +62,7 @@ export default function Purchases() {
   } = useQuery({
     queryKey: [`${BASE_URL}/suppliers`],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/suppliers`);
+      const res = await apiFetch(`${BASE_URL}/suppliers`);
       if (!res.ok) throw new Error("Failed to fetch suppliers");
       return res.json();
     },
@@ -71,7 +72,7 @@ export default function Purchases() {
     setViewingLoading(true);
     setCurrentlyViewingId(purchaseId);
     try {
-      const res = await fetch(`${BASE_URL}/purchases/${purchaseId}`);
+      const res = await apiFetch(`${BASE_URL}/purchases/${purchaseId}`);
       if (!res.ok) throw new Error("Failed to fetch purchase details");
       const data = await res.json();
       setViewingPurchase(data);
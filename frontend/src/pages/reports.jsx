@@ -10,77 +10,42 @@ import {
 } from "@/components/ui/table";
 import { Badge } from "@/components/ui/badge";
 import { BarChart3, TrendingUp, Package, DollarSign } from "lucide-react";
+import { BASE_URL } from "@/lib/constants";
+import { apiFetch } from "@/lib/queryClient";
 
 export default function Reports() {
-  const { data: items = [], isLoading: itemsLoading } = useQuery({
-    queryKey: ["/api/inventory"],
+  // Aggregates are computed server-side so the page never downloads full lists
+  const { data: valuation = {}, isLoading: valuationLoading } = useQuery({
+    queryKey: ["reports-inventory-value"],
+    queryFn: () => apiFetch(`${BASE_URL}/reports/inventory_value_by_category`).then((r) => r.json())
   });
 
-  const { data: movements = [], isLoading: movementsLoading } = useQuery({
-    queryKey: ["/api/movements"],
+  const { data: supplierTotals = {}, isLoading: suppliersLoading } = useQuery({
+    queryKey: ["reports-purchases-by-supplier"],
+    queryFn: () => apiFetch(`${BASE_URL}/reports/purchases_by_supplier`).then((r) => r.json())
   });
 
-  const { data: purchases = [], isLoading: purchasesLoading } = useQuery({
-    queryKey: ["/api/purchases"],
+  const { data: monthlyPurchases = [], isLoading: monthlyLoading } = useQuery({
+    queryKey: ["reports-purchases-by-month"],
+    queryFn: () => apiFetch(`${BASE_URL}/reports/purchases_by_month`).then((r) => r.json())
   });
 
-  const { data: stats, isLoading: statsLoading } = useQuery({
-    queryKey: ["/api/dashboard/stats"],
+  const { data: transferTotals = [], isLoading: transfersLoading } = useQuery({
+    queryKey: ["reports-transfers-by-location"],
+    queryFn: () => apiFetch(`${BASE_URL}/reports/transfers_by_location`).then((r) => r.json())
   });
 
-  const isLoading = itemsLoading || movementsLoading || purchasesLoading || statsLoading;
-
-  const formatCurrency = (amount) => {
-    return new Intl.NumberFormat('en-US', {
-      style: 'currency',
-      currency: 'USD'
-    }).format(Number(amount));
-  };
-
-  const formatDate = (date) => {
-    return new Intl.DateTimeFormat('en-US', {
-      year: 'numeric',
-      month: 'short',
-      day: 'numeric'
-    }).format(new Date(date));
-  };
-
-  const getStockStatus = (item) => {
-    if (item.quantity === 0) return 'out-of-stock';
-    if (item.quantity <= (item.minStock || 0)) return 'low-stock';
-    return 'in-stock';
-  };
-
-  const getStockBadge = (status) => {
-    switch (status) {
-      case 'out-of-stock':
-        return <Badge variant="destructive">Out of Stock</Badge>;
-      case 'low-stock':
-        return (
-          <Badge variant="secondary" className="bg-yellow-100 text-yellow-800">
-            Low Stock
-          </Badge>
-        );
-      default:
-        return (
-          <Badge variant="secondary" className="bg-green-100 text-green-800">
-            In Stock
-          </Badge>
-        );
-    }
-  };
-
-  const inventoryValue = items.reduce((total, item) => {
-    return total + item.quantity * Number(item.unitCost || 0);
-  }, 0);
-
-  const totalPurchaseValue = purchases.reduce((total, purchase) => {
-    return total + Number(purchase.totalCost || 0);
-  }, 0);
-
-  const recentMovements = movements
-    .sort((a, b) => new Date(b.movementDate).getTime() - new Date(a.movementDate).getTime())
-    .slice(0, 10);
+  const isLoading = valuationLoading || suppliersLoading || monthlyLoading || transfersLoading;
+
+  const formatCurrency = (amount) =>
+    new Intl.NumberFormat("en-KE", { style: "currency", currency: "KES" }).format(Number(amount || 0));
+
+  const formatMonth = (month) =>
+    new Intl.DateTimeFormat("en-KE", { year: "numeric", month: "short" }).format(new Date(`${month}-01`));
+
+  const { total_value = 0, total_stock = 0, categories = [] } = valuation;
+  const { total_spent = 0, purchase_count = 0 } = supplierTotals;
+  const totalTransfers = transferTotals.reduce((total, row) => total + row.transfer_count, 0);
 
   if (isLoading) {
     return (
@@ -113,7 +78,7 @@ export default function Reports() {
               <div>
                 <p className="text-sm font-medium text-gray-500">Total Inventory Value</p>
                 <p className="text-3xl font-semibold text-gray-900">
-                  {formatCurrency(inventoryValue)}
+                  {formatCurrency(total_value)}
                 </p>
               </div>
               <div className="w-12 h-12 bg-blue-100 rounded-lg flex items-center justify-center">
@@ -129,8 +94,9 @@ export default function Reports() {
               <div>
                 <p className="text-sm font-medium text-gray-500">Total Purchases</p>
                 <p className="text-3xl font-semibold text-gray-900">
-                  {formatCurrency(totalPurchaseValue)}
+                  {formatCurrency(total_spent)}
                 </p>
+                <p className="text-xs text-gray-500">{purchase_count} purchases</p>
               </div>
               <div className="w-12 h-12 bg-green-100 rounded-lg flex items-center justify-center">
                 <TrendingUp className="h-6 w-6 text-green-600" />
@@ -143,9 +109,9 @@ export default function Reports() {
           <CardContent className="p-6">
             <div className="flex items-center justify-between">
               <div>
-                <p className="text-sm font-medium text-gray-500">Total Items</p>
+                <p className="text-sm font-medium text-gray-500">Units in Stock</p>
                 <p className="text-3xl font-semibold text-gray-900">
-                  {items.length}
+                  {total_stock}
                 </p>
               </div>
               <div className="w-12 h-12 bg-purple-100 rounded-lg flex items-center justify-center">
@@ -159,9 +125,9 @@ export default function Reports() {
           <CardContent className="p-6">
             <div className="flex items-center justify-between">
               <div>
-                <p className="text-sm font-medium text-gray-500">Total Movements</p>
+                <p className="text-sm font-medium text-gray-500">Total Transfers</p>
                 <p className="text-3xl font-semibold text-gray-900">
-                  {movements.length}
+                  {totalTransfers}
                 </p>
               </div>
               <div className="w-12 h-12 bg-orange-100 rounded-lg flex items-center justify-center">
@@ -174,36 +140,58 @@ export default function Reports() {
 
       {/* Reports Grid */}
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
-        {/* Inventory Status Report */}
+        {/* Inventory Value by Category */}
         <Card className="bg-white rounded-xl shadow-sm border border-gray-200">
           <CardHeader>
-            <CardTitle>Inventory Status Report</CardTitle>
+            <CardTitle>Inventory Value by Category</CardTitle>
           </CardHeader>
           <CardContent>
             <div className="overflow-x-auto">
               <Table>
                 <TableHeader>
                   <TableRow>
-                    <TableHead>Item</TableHead>
-                    <TableHead>Quantity</TableHead>
-                    <TableHead>Status</TableHead>
+                    <TableHead>Category</TableHead>
+                    <TableHead>Products</TableHead>
+                    <TableHead>Stock</TableHead>
                     <TableHead>Value</TableHead>
                   </TableRow>
                 </TableHeader>
                 <TableBody>
-                  {items.slice(0, 5).map((item) => (
-                    <TableRow key={item.id}>
-                      <TableCell>
-                        <div>
-                          <p className="font-medium">{item.name}</p>
-                          <p className="text-sm text-gray-500">{item.sku}</p>
-                        </div>
-                      </TableCell>
-                      <TableCell>{item.quantity}</TableCell>
-                      <TableCell>{getStockBadge(getStockStatus(item))}</TableCell>
-                      <TableCell>
-                        {formatCurrency(item.quantity * Number(item.unitCost || 0))}
-                      </TableCell>
+                  {categories.map((category) => (
+                    <TableRow key={category.category_id}>
+                      <TableCell className="font-medium">{category.category_name}</TableCell>
+                      <TableCell>{category.product_count}</TableCell>
+                      <TableCell>{category.total_stock}</TableCell>
+                      <TableCell>{formatCurrency(category.inventory_value)}</TableCell>
+                    </TableRow>
+                  ))}
+                </TableBody>
+              </Table>
+            </div>
+          </CardContent>
+        </Card>
+
+        {/* Purchases by Month */}
+        <Card className="bg-white rounded-xl shadow-sm border border-gray-200">
+          <CardHeader>
+            <CardTitle>Purchases by Month</CardTitle>
+          </CardHeader>
+          <CardContent>
+            <div className="overflow-x-auto">
+              <Table>
+                <TableHeader>
+                  <TableRow>
+                    <TableHead>Month</TableHead>
+                    <TableHead>Purchases</TableHead>
+                    <TableHead>Total Spent</TableHead>
+                  </TableRow>
+                </TableHeader>
+                <TableBody>
+                  {monthlyPurchases.map((row) => (
+                    <TableRow key={row.month}>
+                      <TableCell>{formatMonth(row.month)}</TableCell>
+                      <TableCell>{row.purchase_count}</TableCell>
+                      <TableCell>{formatCurrency(row.total_spent)}</TableCell>
                     </TableRow>
                   ))}
                 </TableBody>
@@ -212,31 +200,33 @@ export default function Reports() {
           </CardContent>
         </Card>
 
-        {/* Recent Movement Report */}
+        {/* Transfers by Location */}
         <Card className="bg-white rounded-xl shadow-sm border border-gray-200">
           <CardHeader>
-            <CardTitle>Recent Movement Report</CardTitle>
+            <CardTitle>Transfers by Location</CardTitle>
           </CardHeader>
           <CardContent>
             <div className="overflow-x-auto">
               <Table>
                 <TableHeader>
                   <TableRow>
-                    <TableHead>Date</TableHead>
+                    <TableHead>Location</TableHead>
                     <TableHead>Type</TableHead>
+                    <TableHead>Transfers</TableHead>
                     <TableHead>Quantity</TableHead>
                   </TableRow>
                 </TableHeader>
                 <TableBody>
-                  {recentMovements.slice(0, 5).map((movement) => (
-                    <TableRow key={movement.id}>
-                      <TableCell>{formatDate(movement.movementDate)}</TableCell>
+                  {transferTotals.map((row) => (
+                    <TableRow key={`${row.location_id}-${row.transfer_type}`}>
+                      <TableCell className="font-medium">{row.location_name}</TableCell>
                       <TableCell>
                         <Badge variant="outline" className="text-xs">
-                          {movement.type.replace('_', ' ').toUpperCase()}
+                          {row.transfer_type}
                         </Badge>
                       </TableCell>
-                      <TableCell>{movement.quantity}</TableCell>
+                      <TableCell>{row.transfer_count}</TableCell>
+                      <TableCell>{row.quantity}</TableCell>
                     </TableRow>
                   ))}
                 </TableBody>
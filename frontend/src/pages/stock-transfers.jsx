@@ -15,6 +15,7 @@ import AddStockTransferModal from "@/components/stock-transfers/add-stock-transf
 import ViewStockTransferModal from "@/components/stock-transfers/view-stock-transfer-modal";
 import { BASE_URL } from "@/lib/constants";
 import { useToast } from "@/hooks/use-toast";
+import { apiFetch } from "@/lib/queryClient";
 
 export default function StockTransfers() {
   const [isAddModalOpen, setIsAddModalOpen] = useState(false);
@@ -32,7 +33,7 @@ export default function StockTransfers() {
   const { data: transfers = [] } = useQuery({
     queryKey: ["stock_transfers"],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/stock_transfers`);
+      const res = await apiFetch(`${BASE_URL}/stock_transfers`);
       if (!res.ok) throw new Error("Failed to fetch stock transfers");
       return res.json();
     },
@@ -41,7 +42,7 @@ export default function StockTransfers() {
   const { data: businesses = [] } = useQuery({
     queryKey: ["business_locations"],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/business_locations`);
+      const res = await apiFetch(`${BASE_URL}/business_locations`);
       if (!res.ok) throw new Error("Failed to fetch business locations");
       return res.json();
     },
@@ -83,7 +84,7 @@ export default function StockTransfers() {
   const fetchTransferDetails = async (id) => {
     setCurrentlyViewingId(id);
     try {
-      const res = await fetch(`${BASE_URL}/stock_transfers/${id}`);
+      const res = await apiFetch(`${BASE_URL}/stock_transfers/${id}`);
       if (!res.ok) throw new Error("Failed to fetch stock transfer details");
       const data = await res.json();
       setViewingTransfer(data);
@@ -17,6 +17,7 @@ import EditSupplierModal from "@/components/suppliers/edit-supplier-modal";
 import ViewSupplierModal from "@/components/suppliers/view-supplier-modal";
 import { useToast } from "@/hooks/use-toast";
 import { BASE_URL } from "@/lib/constants";
+import { apiFetch } from "@/lib/queryClient";
 
 export default function Suppliers() {
   const [isAddModalOpen, setIsAddModalOpen] = useState(false);
@@ -33,7 +34,7 @@ export default function Suppliers() {
   } = useQuery({
     queryKey: [`${BASE_URL}/suppliers/`],
     queryFn: async () => {
-      const res = await fetch(`${BASE_URL}/suppliers/`);
+      const res = await apiFetch(`${BASE_URL}/suppliers/`);
       if (!res.ok) throw new Error("Failed to fetch suppliers");
       return res.json();
     },